@@ -1,6 +1,22 @@
 """Init file per il package src"""
 
 from .csv_control import CSVController, CSVAnalysis
+from .config import CSVControlConfig, load_config
+from .report import CSVReport, FileReport
+from .watcher import CSVWatcher
+from .repair import RepairStrategy, make_repair_strategy
+from .rejects import RejectSink
 
-__all__ = ["CSVController", "CSVAnalysis"]
+__all__ = [
+    "CSVController",
+    "CSVAnalysis",
+    "CSVControlConfig",
+    "load_config",
+    "CSVReport",
+    "FileReport",
+    "CSVWatcher",
+    "RepairStrategy",
+    "make_repair_strategy",
+    "RejectSink",
+]
 __version__ = "1.0.0"
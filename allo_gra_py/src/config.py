@@ -0,0 +1,195 @@
+"""
+Config - Caricamento della configurazione di CSV Control da file .ini
+
+Il formato del file è documentato in config.example.ini. Le opzioni assenti
+mantengono i valori di default di CSVControlConfig.
+"""
+
+import configparser
+import io
+import logging
+from dataclasses import dataclass, fields
+from typing import Optional
+
+try:
+    from .repair import REPAIR_STRATEGIES
+except ImportError:  # eseguito come script dalla cartella src
+    from repair import REPAIR_STRATEGIES
+
+# Compressioni supportate per i file di output
+OUTPUT_COMPRESSIONS = ("none", "gzip", "bz2", "zstd")
+
+# Modi di scelta degli headers master
+HEADER_MODES = ("widest", "union")
+
+
+@dataclass
+class CSVControlConfig:
+    """Classe per contenere la configurazione di CSV Control"""
+
+    # [csv]
+    delimiter: str = ";"
+    encoding: str = "utf-8"
+    file_extension: str = ".csv"
+    auto_dialect: bool = False
+
+    # [folders]
+    input_folder: str = "data"
+    output_folder: str = "output"
+
+    # [analysis]
+    max_inconsistent_display: int = 5
+    max_headers_display: int = 10
+
+    # [processing]
+    missing_field_value: str = ""
+    preserve_file_order: bool = True
+    overwrite_existing: bool = True
+    skip_unchanged: bool = False
+    header_mode: str = "widest"
+    repair_strategy: str = "none"
+    merge_column: str = ""
+    reject_folder: str = ""
+
+    # [performance]
+    workers: int = 1
+    read_buffer_size: int = io.DEFAULT_BUFFER_SIZE
+    write_buffer_size: int = io.DEFAULT_BUFFER_SIZE
+    write_batch_size: int = 10000
+    atomic_write: bool = False
+    fast_scan: bool = False
+    output_compression: str = "none"
+
+    # [logging]
+    log_level: str = "INFO"
+    log_to_file: bool = False
+    log_filename: str = "csv_control.log"
+
+
+# Sezione del file .ini di ciascuna opzione
+_SECTIONS = {
+    "delimiter": "csv",
+    "encoding": "csv",
+    "file_extension": "csv",
+    "auto_dialect": "csv",
+    "input_folder": "folders",
+    "output_folder": "folders",
+    "max_inconsistent_display": "analysis",
+    "max_headers_display": "analysis",
+    "missing_field_value": "processing",
+    "preserve_file_order": "processing",
+    "overwrite_existing": "processing",
+    "skip_unchanged": "processing",
+    "header_mode": "processing",
+    "repair_strategy": "processing",
+    "merge_column": "processing",
+    "reject_folder": "processing",
+    "workers": "performance",
+    "read_buffer_size": "performance",
+    "write_buffer_size": "performance",
+    "write_batch_size": "performance",
+    "atomic_write": "performance",
+    "fast_scan": "performance",
+    "output_compression": "performance",
+    "log_level": "logging",
+    "log_to_file": "logging",
+    "log_filename": "logging",
+}
+
+
+def load_config(config_path: str) -> CSVControlConfig:
+    """
+    Carica la configurazione da un file .ini
+
+    Args:
+        config_path: Percorso del file di configurazione
+
+    Returns:
+        CSVControlConfig: Configurazione caricata
+
+    Raises:
+        FileNotFoundError: Se il file non esiste
+        ValueError: Se un valore non è valido
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    with open(config_path, "r", encoding="utf-8") as f:
+        parser.read_file(f)
+
+    values = {}
+    for field in fields(CSVControlConfig):
+        section = _SECTIONS[field.name]
+        if not parser.has_option(section, field.name):
+            continue
+
+        try:
+            if field.type is bool:
+                values[field.name] = parser.getboolean(section, field.name)
+            elif field.type is int:
+                values[field.name] = parser.getint(section, field.name)
+            else:
+                values[field.name] = parser.get(section, field.name)
+        except ValueError as e:
+            raise ValueError(
+                f"Valore non valido per {section}.{field.name} in {config_path}: {e}"
+            )
+
+    config = CSVControlConfig(**values)
+
+    if config.output_compression not in OUTPUT_COMPRESSIONS:
+        raise ValueError(
+            f"output_compression deve essere uno tra {OUTPUT_COMPRESSIONS}, "
+            f"ricevuto: {config.output_compression}"
+        )
+    if config.header_mode not in HEADER_MODES:
+        raise ValueError(
+            f"header_mode deve essere uno tra {HEADER_MODES}, "
+            f"ricevuto: {config.header_mode}"
+        )
+    if config.repair_strategy not in REPAIR_STRATEGIES:
+        raise ValueError(
+            f"repair_strategy deve essere uno tra {REPAIR_STRATEGIES}, "
+            f"ricevuto: {config.repair_strategy}"
+        )
+    if config.write_batch_size < 1:
+        raise ValueError(
+            f"write_batch_size deve essere >= 1, ricevuto: {config.write_batch_size}"
+        )
+    if config.workers < 1:
+        raise ValueError(f"workers deve essere >= 1, ricevuto: {config.workers}")
+
+    return config
+
+
+# Attributo che identifica gli handler installati da configure_logging
+HANDLER_MARKER = "_csv_control_handler"
+
+
+def configure_logging(config: CSVControlConfig, logger_name: Optional[str] = None) -> None:
+    """
+    Applica le opzioni della sezione [logging] a un logger
+
+    La funzione è idempotente: l'handler installato da una chiamata
+    precedente sullo stesso logger viene chiuso e sostituito, così ogni
+    messaggio è scritto una sola volta.
+
+    Args:
+        config: Configurazione
+        logger_name: Nome del logger (default: root logger)
+    """
+    logger = logging.getLogger(logger_name)
+    logger.setLevel(config.log_level.upper())
+
+    for previous in list(logger.handlers):
+        if getattr(previous, HANDLER_MARKER, False):
+            logger.removeHandler(previous)
+            previous.close()
+
+    if config.log_to_file:
+        handler = logging.FileHandler(config.log_filename, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    )
+    setattr(handler, HANDLER_MARKER, True)
+    logger.addHandler(handler)
@@ -12,23 +12,141 @@ Autore: ERDIS SQL Team
 Data: Novembre 2025
 """
 
+import bz2
 import csv
+import gzip
+import hashlib
+import io
+import json
+import logging
+import mmap
 import os
+import sys
+import threading
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, Iterator, Union
+from dataclasses import InitVar, dataclass, replace
 from collections import Counter
+from itertools import islice
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+try:
+    from .report import CSVReport
+    from .repair import RepairStrategy, make_repair_strategy
+    from .rejects import RejectSink, format_raw_record, read_raw_records
+    from .dialect import CSVDialect, detect_dialect, read_sample, resolve_encoding
+    from .config import (
+        CSVControlConfig,
+        HEADER_MODES,
+        OUTPUT_COMPRESSIONS,
+        load_config,
+        configure_logging,
+    )
+except ImportError:  # eseguito come script: python src/csv_control.py
+    from report import CSVReport
+    from repair import RepairStrategy, make_repair_strategy
+    from rejects import RejectSink, format_raw_record, read_raw_records
+    from dialect import CSVDialect, detect_dialect, read_sample, resolve_encoding
+    from config import (
+        CSVControlConfig,
+        HEADER_MODES,
+        OUTPUT_COMPRESSIONS,
+        load_config,
+        configure_logging,
+    )
+
+logger = logging.getLogger(__name__)
+
+# Estensioni dei file compressi letti in streaming -> compressione
+COMPRESSED_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".zst": "zstd"}
+# Compressione -> estensione dei file di output
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "bz2": ".bz2", "zstd": ".zst"}
+
+# Dimensione dei blocchi letti da count_quotes
+_COUNT_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Quota di righe con virgolette nel campione oltre la quale la scansione
+# sequenziale usa csv.reader invece della scansione a byte
+QUOTE_HEAVY_RATIO = 0.5
+
+
+class HeaderRegistry:
+    """
+    Registro degli insiemi di headers condivisi tra le analisi
+
+    File con gli stessi headers condividono una sola tupla di stringhe
+    internate, identificata da un id intero. Ogni CSVController ha il proprio
+    registro, rinnovato a ogni analisi completa della cartella (vedi
+    analyze_all_files): gli id valgono solo per le analisi dello stesso
+    registro.
+    """
+
+    def __init__(self):
+        self._ids: Dict[Tuple[str, ...], int] = {}
+        self._header_sets: List[Tuple[str, ...]] = []
+        self._lock = threading.Lock()
+
+    def intern(self, headers) -> int:
+        """
+        Registra un insieme di headers
+
+        Args:
+            headers: Headers di un file
+
+        Returns:
+            int: Id dell'insieme di headers
+        """
+        key = tuple(headers)
+        header_set_id = self._ids.get(key)
+        if header_set_id is not None:
+            return header_set_id
+
+        with self._lock:
+            header_set_id = self._ids.get(key)
+            if header_set_id is None:
+                key = tuple(sys.intern(header) for header in key)
+                header_set_id = len(self._header_sets)
+                self._header_sets.append(key)
+                self._ids[key] = header_set_id
+        return header_set_id
+
+    def get(self, header_set_id: int) -> Tuple[str, ...]:
+        """Headers registrati con l'id indicato"""
+        return self._header_sets[header_set_id]
+
+    def __len__(self) -> int:
+        return len(self._header_sets)
 
 
 @dataclass
 class CSVAnalysis:
     """Classe per contenere i risultati dell'analisi di un file CSV"""
 
+    __slots__ = (
+        "filename",
+        "num_fields",
+        "headers",
+        "num_records",
+        "inconsistent_records",
+        "header_set_id",
+    )
+
     filename: str
     num_fields: int
-    headers: List[str]
+    headers: Tuple[str, ...]  # tupla condivisa dal registro degli headers
     num_records: int
     inconsistent_records: List[Tuple[int, int]]  # (row_number, num_fields)
+    # registro in cui internare gli headers (senza registro: nessun id)
+    header_registry: InitVar[Optional[HeaderRegistry]] = None
+
+    def __post_init__(self, header_registry: Optional[HeaderRegistry]):
+        # header_set_id non è un campo del dataclass: è derivato dagli headers
+        if header_registry is None:
+            self.header_set_id = None
+            self.headers = tuple(self.headers)
+            return
+        self.header_set_id = header_registry.intern(self.headers)
+        self.headers = header_registry.get(self.header_set_id)
 
     def __str__(self):
         return (
@@ -39,10 +157,369 @@ class CSVAnalysis:
         )
 
 
+def _buffer_lines(buffer, cursor: List[int]) -> Iterator[str]:
+    """
+    Righe di un buffer di byte dall'offset cursor[0], decodificate come
+    latin-1 (un carattere per byte) per csv.reader
+
+    Dopo ogni riga cursor[0] è l'offset della successiva e cursor[1] la fine
+    della riga (a capo escluso). Il chiamante può spostare cursor[0] prima di
+    chiedere il record successivo a csv.reader, che legge solo le righe del
+    record.
+    """
+    size = len(buffer)
+    while cursor[0] < size:
+        line_start = cursor[0]
+        line_end = buffer.find(b"\n", line_start)
+        if line_end == -1:
+            line_end = size
+        cursor[0], cursor[1] = line_end + 1, line_end
+        yield buffer[line_start : line_end + 1].decode("latin-1")
+
+
+def _scan_quoted_record(
+    buffer, pos: int, line_end: int, delimiter: bytes, quotechar: bytes
+) -> Tuple[int, int]:
+    """
+    Conta i campi di un record con virgolette campo per campo, con le regole
+    di csv.reader (virgolette solo a inizio campo, "" come escape, a capo
+    dentro i campi quotati); i salti fino alla virgoletta di chiusura e al
+    delimitatore successivo sono cercati con find
+
+    Args:
+        buffer: Buffer di byte (mmap, bytes)
+        pos: Inizio del record
+        line_end: Fine della prima riga del record (a capo o fine buffer)
+        delimiter: Delimitatore (1 byte)
+        quotechar: Carattere di quoting (1 byte)
+
+    Returns:
+        Tuple[int, int]: (numero campi, fine record)
+    """
+    quote_byte = quotechar[0]
+    size = len(buffer)
+    num_fields = 1
+    i = pos
+    while True:
+        if i < size and buffer[i] == quote_byte:
+            # Campo quotato: fino alla virgoletta di chiusura
+            i = buffer.find(quotechar, i + 1)
+            while i != -1 and buffer[i + 1 : i + 2] == quotechar:
+                i = buffer.find(quotechar, i + 2)
+            if i == -1:
+                return num_fields, size
+            # Dopo la chiusura il campo prosegue come non quotato
+            i += 1
+            if i > line_end:
+                line_end = buffer.find(b"\n", i)
+                if line_end == -1:
+                    line_end = size
+        # Campo non quotato: fino al delimitatore o all'a capo
+        i = buffer.find(delimiter, i, line_end)
+        if i == -1:
+            return num_fields, line_end
+        num_fields += 1
+        i += 1
+
+
+def scan_records(
+    buffer,
+    delimiter: bytes = b";",
+    quotechar: bytes = b'"',
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Scansiona i record di un buffer di byte (es. mmap) contando i campi,
+    senza decodificare il testo né creare stringhe per i campi
+
+    Le righe senza virgolette sono contate con bytes.count; i record con
+    virgolette passano per un csv.reader alimentato direttamente dal buffer
+    (vedi _buffer_lines), o per _scan_quoted_record se csv.reader li rifiuta
+    (es. \r o NUL in un campo non quotato).
+
+    Args:
+        buffer: Buffer di byte (mmap, bytes)
+        delimiter: Delimitatore (1 byte)
+        quotechar: Carattere di quoting (1 byte)
+        start: Offset da cui iniziare (deve essere un inizio record)
+        stop: Scansiona i record che iniziano prima di questo offset
+              (default: fine buffer); l'ultimo può proseguire oltre
+
+    Yields:
+        Tuple[int, int, int]: (inizio record, fine record, numero campi)
+    """
+    size = len(buffer)
+    if stop is None:
+        stop = size
+
+    reader = None
+    cursor = [start, start]
+    pos = start
+    while pos < stop:
+        line_end = buffer.find(b"\n", pos)
+        if line_end == -1:
+            line_end = size
+        line = buffer[pos:line_end]
+
+        if quotechar not in line:
+            # Caso veloce: nessuna virgoletta, il record è la riga
+            if line == b"" or line == b"\r":
+                num_fields = 0  # csv.reader restituisce [] per le righe vuote
+            else:
+                num_fields = line.count(delimiter) + 1
+            record_end = line_end
+        else:
+            if reader is None:
+                reader = csv.reader(
+                    _buffer_lines(buffer, cursor),
+                    delimiter=delimiter.decode("latin-1"),
+                    quotechar=quotechar.decode("latin-1"),
+                )
+            cursor[0] = pos
+            try:
+                num_fields = len(next(reader))
+                record_end = cursor[1]
+            except csv.Error:
+                reader = None
+                num_fields, record_end = _scan_quoted_record(
+                    buffer, pos, line_end, delimiter, quotechar
+                )
+
+        yield pos, record_end, num_fields
+        pos = record_end + 1
+
+
+def count_quotes(filepath: str, start: int, stop: int, quotechar: bytes = b'"') -> int:
+    """
+    Conta le virgolette nell'intervallo di byte [start, stop) di un file
+
+    Args:
+        filepath: Percorso del file
+        start: Offset iniziale
+        stop: Offset finale (escluso)
+        quotechar: Carattere di quoting (1 byte)
+
+    Returns:
+        int: Numero di virgolette
+    """
+    count = 0
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = f.read(min(_COUNT_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            count += chunk.count(quotechar)
+            remaining -= len(chunk)
+    return count
+
+
+def split_record_ranges(
+    filepath: str,
+    start: int,
+    stop: int,
+    parts: int,
+    executor: Executor,
+    quotechar: bytes = b'"',
+) -> List[Tuple[int, int]]:
+    """
+    Divide l'intervallo di byte [start, stop) di un file CSV in circa `parts`
+    intervalli che iniziano e finiscono su confini di record
+
+    Le virgolette di ogni intervallo nominale sono contate in parallelo; la
+    loro parità dice se un punto di taglio cade dentro un campo quotato, e il
+    taglio viene spostato al primo a capo fuori dalle virgolette.
+    `start` deve essere un inizio record fuori dalle virgolette. Le
+    virgolette in mezzo a campi non quotati (che csv.reader tratta come
+    caratteri normali) falsano la parità: per quei file usare la scansione
+    sequenziale.
+
+    Args:
+        filepath: Percorso del file CSV
+        start: Offset del primo record
+        stop: Offset finale (escluso)
+        parts: Numero di intervalli desiderato
+        executor: Executor per il conteggio parallelo delle virgolette
+        quotechar: Carattere di quoting (1 byte)
+
+    Returns:
+        List[Tuple[int, int]]: Intervalli (inizio, fine) non vuoti
+    """
+    cuts = [start + (stop - start) * k // parts for k in range(parts + 1)]
+    quote_counts = list(
+        executor.map(
+            count_quotes,
+            [filepath] * parts,
+            cuts[:-1],
+            cuts[1:],
+            [quotechar] * parts,
+        )
+    )
+
+    boundaries = [start]
+    parity = 0
+    with open(filepath, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        for k in range(1, parts):
+            parity = (parity + quote_counts[k - 1]) % 2
+
+            # Risincronizzazione: primo a capo fuori dalle virgolette
+            pos = cuts[k]
+            line_parity = parity
+            boundary = stop
+            while pos < stop:
+                line_end = mm.find(b"\n", pos, stop)
+                if line_end == -1:
+                    break
+                line_parity ^= mm[pos:line_end].count(quotechar) & 1
+                if line_parity == 0:
+                    boundary = line_end + 1
+                    break
+                pos = line_end + 1
+
+            boundaries.append(max(boundary, boundaries[-1]))
+    boundaries.append(stop)
+
+    return [
+        (range_start, range_stop)
+        for range_start, range_stop in zip(boundaries[:-1], boundaries[1:])
+        if range_start < range_stop
+    ]
+
+
+def scan_range(
+    filepath: str,
+    start: int,
+    stop: int,
+    delimiter: bytes,
+    num_fields: int,
+    quotechar: bytes = b'"',
+) -> Tuple[int, List[Tuple[int, int, int, int]], int]:
+    """
+    Scansiona i record di un intervallo di byte (vedi split_record_ranges)
+
+    Args:
+        filepath: Percorso del file CSV
+        start: Offset del primo record
+        stop: Offset finale (escluso)
+        delimiter: Delimitatore (1 byte)
+        num_fields: Numero di campi atteso
+        quotechar: Carattere di quoting (1 byte)
+
+    Returns:
+        Tuple[int, List[Tuple[int, int, int, int]], int]: (numero record,
+            record non coerenti come (indice del record nell'intervallo,
+            numero campi, offset iniziale, offset finale), offset successivo
+            all'ultimo record: oltre stop se l'ultimo record prosegue
+            nell'intervallo seguente)
+    """
+    num_records = 0
+    inconsistent_records = []
+    records_end = start
+
+    with open(filepath, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        for record_start, record_end, record_fields in scan_records(
+            mm, delimiter, quotechar, start=start, stop=stop
+        ):
+            if record_fields != num_fields:
+                inconsistent_records.append(
+                    (num_records, record_fields, record_start, record_end)
+                )
+            num_records += 1
+            records_end = record_end + 1
+
+    return num_records, inconsistent_records, records_end
+
+
+def get_compression(filepath: Path) -> str:
+    """
+    Compressione di un file in base all'estensione
+
+    Args:
+        filepath: Percorso del file
+
+    Returns:
+        str: 'gzip', 'bz2', 'zstd' o 'none'
+    """
+    return COMPRESSED_SUFFIXES.get(Path(filepath).suffix.lower(), "none")
+
+
+def compute_master_headers(
+    header_sets: List[Tuple[str, ...]], header_mode: str = "widest"
+) -> List[str]:
+    """
+    Calcola gli headers master da un insieme di righe di header
+
+    Args:
+        header_sets: Headers di ciascun file
+        header_mode: 'widest' (file con più campi) o 'union' (headers del
+            file più largo seguiti dai campi nuovi degli altri file)
+
+    Returns:
+        List[str]: Lista degli headers master
+    """
+    # Trova il file con il maggior numero di campi
+    max_headers = max(header_sets, key=len)
+    if header_mode == "widest":
+        return list(max_headers)
+
+    master_headers = list(max_headers)
+    seen = set(master_headers)
+    for headers in header_sets:
+        for header in headers:
+            if header not in seen:
+                seen.add(header)
+                master_headers.append(header)
+    return master_headers
+
+
+def _import_zstandard():
+    """Importa zstandard (dipendenza opzionale, solo per i file .zst)"""
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "Per i file compressi zstd installare il pacchetto 'zstandard'"
+        )
+    return zstandard
+
+
 class CSVController:
     """Classe principale per il controllo e la correzione di file CSV"""
 
-    def __init__(self, folder_path: str, delimiter: str = ";", encoding: str = "utf-8"):
+    # Manifest dei file processati, salvato nella cartella di output
+    MANIFEST_FILENAME = ".csv_control_manifest.json"
+
+    def __init__(
+        self,
+        folder_path: str,
+        delimiter: str = ";",
+        encoding: str = "utf-8",
+        fast_scan: bool = False,
+        workers: int = 1,
+        file_extension: str = ".csv",
+        missing_field_value: str = "",
+        preserve_file_order: bool = True,
+        overwrite_existing: bool = True,
+        max_inconsistent_display: int = 5,
+        max_headers_display: int = 10,
+        read_buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+        write_buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+        output_compression: str = "none",
+        skip_unchanged: bool = False,
+        header_mode: str = "widest",
+        write_batch_size: int = 10000,
+        atomic_write: bool = False,
+        repair_strategy: Union[str, RepairStrategy] = "none",
+        merge_column: Optional[str] = None,
+        reject_folder: Optional[str] = None,
+        auto_dialect: bool = False,
+    ):
         """
         Inizializza il controller CSV
 
@@ -50,18 +527,137 @@ class CSVController:
             folder_path: Percorso della cartella contenente i file CSV
             delimiter: Delimitatore utilizzato nei CSV (default: ';')
             encoding: Codifica dei file (default: 'utf-8')
+            fast_scan: Analizza i file a livello di byte con mmap
+                (vedi analyze_csv_file_fast, default: False)
+            workers: Processi per l'analisi di un singolo file; con più di
+                un processo il file è diviso in intervalli di byte
+                (vedi analyze_csv_file_parallel, default: 1)
+            file_extension: Estensione dei file da processare (default: '.csv')
+            missing_field_value: Valore per i campi mancanti (default: '')
+            preserve_file_order: Processa i file in ordine di nome (default: True)
+            overwrite_existing: Sovrascrive i file già presenti in output (default: True)
+            max_inconsistent_display: Record inconsistenti mostrati nel report (default: 5)
+            max_headers_display: Headers mostrati nel report (default: 10)
+            read_buffer_size: Buffer di lettura in byte
+            write_buffer_size: Buffer di scrittura in byte
+            output_compression: Compressione dei file di output
+                ('none', 'gzip', 'bz2', 'zstd', default: 'none')
+            skip_unchanged: Non riscrive i file il cui input e il cui formato
+                di output non sono cambiati dall'ultima esecuzione, secondo il
+                manifest nella cartella di output (default: False)
+            header_mode: Scelta degli headers master: 'widest' (file con più
+                campi) o 'union' (unione di tutti gli headers, default: 'widest')
+            write_batch_size: Record scritti per ogni writerows (default: 10000)
+            atomic_write: Scrive in un file temporaneo e lo rinomina alla
+                fine (default: False)
+            repair_strategy: Riparazione dei record con troppi campi: 'none',
+                'merge', 'truncate', 'quarantine' o un RepairStrategy
+                (vedi repair.py, default: 'none')
+            merge_column: Colonna che riceve i campi in eccesso con la
+                strategia 'merge' (default: ultima colonna)
+            reject_folder: Cartella in cui l'analisi scrive i record non
+                coerenti con il loro testo originale, un file
+                <nome>.inconsistent.csv per file (default: nessuna)
+            auto_dialect: Rileva delimitatore, quoting e codifica di ogni file
+                da un campione iniziale (vedi dialect.py) e li usa per leggerlo;
+                i file di output usano comunque delimiter ed encoding
+                (default: False)
         """
         self.folder_path = Path(folder_path)
         self.delimiter = delimiter
         self.encoding = encoding
+        self.fast_scan = fast_scan
+        self.workers = workers
+        self.file_extension = file_extension
+        self.missing_field_value = missing_field_value
+        self.preserve_file_order = preserve_file_order
+        self.overwrite_existing = overwrite_existing
+        self.max_inconsistent_display = max_inconsistent_display
+        self.max_headers_display = max_headers_display
+        self.read_buffer_size = read_buffer_size
+        self.write_buffer_size = write_buffer_size
+        self.output_compression = output_compression
+        self.skip_unchanged = skip_unchanged
+        self.header_mode = header_mode
+        self.write_batch_size = write_batch_size
+        self.atomic_write = atomic_write
+        if isinstance(repair_strategy, str):
+            repair_strategy = make_repair_strategy(
+                repair_strategy, merge_column, delimiter
+            )
+        self.repair_strategy = repair_strategy
+        self.reject_folder = Path(reject_folder) if reject_folder else None
+        self.auto_dialect = auto_dialect
         self.analyses: List[CSVAnalysis] = []
+        # insiemi di headers delle analisi (vedi HeaderRegistry)
+        self.header_registry = HeaderRegistry()
+        # filename -> record corretti per strategia ('pad' per i campi mancanti)
+        self.repair_counts: Dict[str, Counter] = {}
 
         if not self.folder_path.exists():
             raise ValueError(f"La cartella {folder_path} non esiste")
+        if header_mode not in HEADER_MODES:
+            raise ValueError(
+                f"header_mode deve essere uno tra {HEADER_MODES}, ricevuto: {header_mode}"
+            )
+        if output_compression not in OUTPUT_COMPRESSIONS:
+            raise ValueError(
+                f"output_compression deve essere uno tra {OUTPUT_COMPRESSIONS}, "
+                f"ricevuto: {output_compression}"
+            )
+
+    @classmethod
+    def from_config(
+        cls, config: CSVControlConfig, folder_path: Optional[str] = None
+    ) -> "CSVController":
+        """
+        Crea un controller dalla configurazione (vedi config.load_config)
+
+        Args:
+            config: Configurazione
+            folder_path: Cartella dei file CSV (default: config.input_folder)
+
+        Returns:
+            CSVController: Controller configurato
+        """
+        return cls(
+            folder_path if folder_path is not None else config.input_folder,
+            delimiter=config.delimiter,
+            encoding=config.encoding,
+            fast_scan=config.fast_scan,
+            workers=config.workers,
+            file_extension=config.file_extension,
+            missing_field_value=config.missing_field_value,
+            preserve_file_order=config.preserve_file_order,
+            overwrite_existing=config.overwrite_existing,
+            max_inconsistent_display=config.max_inconsistent_display,
+            max_headers_display=config.max_headers_display,
+            read_buffer_size=config.read_buffer_size,
+            write_buffer_size=config.write_buffer_size,
+            output_compression=config.output_compression,
+            skip_unchanged=config.skip_unchanged,
+            header_mode=config.header_mode,
+            write_batch_size=config.write_batch_size,
+            atomic_write=config.atomic_write,
+            repair_strategy=config.repair_strategy,
+            merge_column=config.merge_column or None,
+            reject_folder=config.reject_folder or None,
+            auto_dialect=config.auto_dialect,
+        )
 
     def get_csv_files(self) -> List[Path]:
-        """Ottiene la lista di tutti i file CSV nella cartella"""
-        return sorted(self.folder_path.glob("*.csv"))
+        """
+        Ottiene la lista di tutti i file CSV nella cartella,
+        compresi quelli compressi (.csv.gz, .csv.bz2, .csv.zst)
+        """
+        csv_files = [
+            filepath
+            for suffix in [""] + list(COMPRESSED_SUFFIXES)
+            for filepath in self.folder_path.glob("*" + self.file_extension + suffix)
+        ]
+        if self.preserve_file_order:
+            return sorted(csv_files)
+        return list(csv_files)
 
     def analyze_csv_file(self, filepath: Path) -> CSVAnalysis:
         """
@@ -73,8 +669,31 @@ class CSVController:
         Returns:
             CSVAnalysis: Oggetto contenente i risultati dell'analisi
         """
-        with open(filepath, "r", encoding=self.encoding, newline="") as f:
-            reader = csv.reader(f, delimiter=self.delimiter)
+        dialect = self.get_input_dialect(filepath)
+        if dialect.delimiter != self.delimiter:
+            logger.warning(
+                "Delimitatore rilevato in %s: %r invece di %r",
+                filepath.name,
+                dialect.delimiter,
+                self.delimiter,
+            )
+
+        # La scansione a byte richiede file non compressi (mmap)
+        byte_scan = get_compression(filepath) == "none" and self.supports_fast_scan(
+            dialect
+        )
+        if self.workers > 1 and byte_scan:
+            return self.analyze_csv_file_parallel(filepath)
+        if self.fast_scan and byte_scan and not self.is_quote_heavy(filepath, dialect):
+            return self.analyze_csv_file_fast(filepath)
+
+        if self.reject_folder is not None:
+            return self.analyze_csv_file_with_rejects(filepath)
+
+        with self.open_input(filepath) as f:
+            reader = csv.reader(
+                f, delimiter=dialect.delimiter, quotechar=dialect.quotechar
+            )
 
             # Leggi l'header
             headers = next(reader)
@@ -97,81 +716,438 @@ class CSVController:
                 headers=headers,
                 num_records=num_records,
                 inconsistent_records=inconsistent_records,
+                header_registry=self.header_registry,
+            )
+
+    def analyze_csv_file_with_rejects(self, filepath: Path) -> CSVAnalysis:
+        """
+        Analizza un singolo file CSV come analyze_csv_file, scrivendo in
+        streaming i record non coerenti con il loro testo originale nel file
+        degli scarti (vedi get_reject_filepath)
+
+        Args:
+            filepath: Percorso del file CSV
+
+        Returns:
+            CSVAnalysis: Oggetto contenente i risultati dell'analisi
+        """
+        reject_filepath = self.get_reject_filepath(
+            self.reject_folder, filepath, "inconsistent"
+        )
+
+        with self.open_input(filepath) as f, RejectSink(
+            reject_filepath, self.delimiter, self.encoding
+        ) as sink:
+            dialect = self.get_input_dialect(filepath)
+            records = read_raw_records(f, dialect.delimiter, dialect.quotechar)
+
+            headers = next(records)[0]
+            num_fields = len(headers)
+
+            inconsistent_records = []
+            num_records = 0
+
+            for row_num, (row, raw) in enumerate(records, start=2):
+                num_records += 1
+                if len(row) != num_fields:
+                    inconsistent_records.append((row_num, len(row)))
+                    sink.write(row_num, f"{len(row)} campi invece di {num_fields}", raw)
+
+        if sink.count:
+            logger.info("Record non coerenti salvati in %s", reject_filepath)
+
+        return CSVAnalysis(
+            filename=filepath.name,
+            num_fields=num_fields,
+            headers=headers,
+            num_records=num_records,
+            inconsistent_records=inconsistent_records,
+            header_registry=self.header_registry,
+        )
+
+    def write_scan_rejects(
+        self,
+        filepath: Path,
+        num_fields: int,
+        inconsistent_records: List[Tuple[int, int, int, int]],
+    ) -> None:
+        """
+        Scrive nel file degli scarti i record non coerenti trovati dalla
+        scansione a byte, leggendone il testo dagli offset
+
+        Args:
+            filepath: Percorso del file CSV
+            num_fields: Numero di campi dell'header
+            inconsistent_records: (numero di riga, numero campi, offset
+                iniziale, offset finale) dei record non coerenti
+        """
+        reject_filepath = self.get_reject_filepath(
+            self.reject_folder, filepath, "inconsistent"
+        )
+        input_encoding = self.get_input_dialect(filepath).encoding
+        with open(filepath, "rb") as f, RejectSink(
+            reject_filepath, self.delimiter, self.encoding
+        ) as sink:
+            for row_num, fields, record_start, record_end in inconsistent_records:
+                f.seek(record_start)
+                raw = f.read(record_end - record_start).decode(
+                    input_encoding, errors="replace"
+                )
+                sink.write(row_num, f"{fields} campi invece di {num_fields}", raw)
+
+        if sink.count:
+            logger.info("Record non coerenti salvati in %s", reject_filepath)
+
+    def supports_fast_scan(self, dialect: Optional[CSVDialect] = None) -> bool:
+        """
+        Verifica che la codifica sia compatibile con la scansione a byte
+        (delimitatore, virgolette e a capo codificati su un solo byte ASCII)
+
+        Args:
+            dialect: Formato del file di input (default: quello configurato)
+        """
+        if dialect is None:
+            dialect = CSVDialect(self.delimiter, '"', True, self.encoding)
+        try:
+            return all(
+                len(char.encode(dialect.encoding)) == 1
+                for char in (dialect.delimiter, dialect.quotechar, "\n")
+            )
+        except (LookupError, UnicodeEncodeError):
+            return False
+
+    def is_quote_heavy(self, filepath: Path, dialect: CSVDialect) -> bool:
+        """
+        Verifica se la maggior parte delle righe del campione iniziale ha
+        virgolette: quei record passano comunque da csv.reader dentro
+        scan_records, quindi in sequenziale csv.reader da solo è più veloce
+
+        Args:
+            filepath: Percorso del file CSV
+            dialect: Formato del file (vedi get_input_dialect)
+
+        Returns:
+            bool: True se le righe con virgolette superano QUOTE_HEAVY_RATIO
+        """
+        lines = read_sample(filepath).splitlines()
+        quotechar = dialect.quotechar.encode(dialect.encoding)
+        quoted = sum(quotechar in line for line in lines)
+        return quoted > len(lines) * QUOTE_HEAVY_RATIO
+
+    def read_header_fast(self, filepath: Path) -> Tuple[List[str], int, int]:
+        """
+        Legge l'header di un file mappato in memoria
+
+        Args:
+            filepath: Percorso del file CSV
+
+        Returns:
+            Tuple[List[str], int, int]: (headers, numero campi, offset del
+                primo record dopo l'header)
+        """
+        dialect = self.get_input_dialect(filepath)
+        if os.path.getsize(filepath) == 0:
+            # mmap non supporta file vuoti
+            with self.open_input(filepath) as f:
+                next(csv.reader(f, delimiter=dialect.delimiter))
+
+        delimiter = dialect.delimiter.encode(dialect.encoding)
+        quotechar = dialect.quotechar.encode(dialect.encoding)
+
+        with open(filepath, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            header_start, header_end, num_fields = next(
+                scan_records(mm, delimiter, quotechar)
+            )
+            header_line = mm[header_start:header_end].decode(dialect.encoding)
+
+        headers = next(
+            csv.reader(
+                io.StringIO(header_line, newline=""),
+                delimiter=dialect.delimiter,
+                quotechar=dialect.quotechar,
+            ),
+            [],
+        )
+        return headers, num_fields, header_end + 1
+
+    def analyze_csv_file_fast(self, filepath: Path) -> CSVAnalysis:
+        """
+        Analizza un singolo file CSV mappandolo in memoria e contando i
+        delimitatori a livello di byte (vedi scan_records).
+        Solo l'header viene decodificato.
+
+        Args:
+            filepath: Percorso del file CSV
+
+        Returns:
+            CSVAnalysis: Oggetto contenente i risultati dell'analisi
+        """
+        headers, num_fields, body_start = self.read_header_fast(filepath)
+        dialect = self.get_input_dialect(filepath)
+        num_records, range_inconsistent, _ = scan_range(
+            str(filepath),
+            body_start,
+            os.path.getsize(filepath),
+            dialect.delimiter.encode(dialect.encoding),
+            num_fields,
+            dialect.quotechar.encode(dialect.encoding),
+        )
+
+        # start=2 perché row 1 è l'header
+        inconsistent_records = [
+            (index + 2, fields, record_start, record_end)
+            for index, fields, record_start, record_end in range_inconsistent
+        ]
+        if self.reject_folder is not None:
+            self.write_scan_rejects(filepath, num_fields, inconsistent_records)
+
+        return CSVAnalysis(
+            filename=filepath.name,
+            num_fields=num_fields,
+            headers=headers,
+            num_records=num_records,
+            inconsistent_records=[
+                (row_num, fields) for row_num, fields, _, _ in inconsistent_records
+            ],
+            header_registry=self.header_registry,
+        )
+
+    def analyze_csv_file_parallel(
+        self, filepath: Path, workers: Optional[int] = None
+    ) -> CSVAnalysis:
+        """
+        Analizza un singolo file CSV dividendolo in intervalli di byte allineati
+        ai record (vedi split_record_ranges), scansionati da un pool di processi.
+        I numeri di riga dei risultati parziali vengono riallineati.
+
+        Se l'ultimo record di un intervallo prosegue oltre la sua fine (un
+        taglio caduto nel posto sbagliato, es. per una virgoletta spaiata in
+        un campo non quotato) il file viene riscansionato in sequenziale.
+        Se ogni intervallo finisce esattamente sul proprio confine, i record
+        coincidono con quelli della scansione sequenziale.
+
+        Args:
+            filepath: Percorso del file CSV
+            workers: Numero di processi (default: self.workers)
+
+        Returns:
+            CSVAnalysis: Oggetto contenente i risultati dell'analisi
+        """
+        if workers is None:
+            workers = self.workers
+
+        headers, num_fields, body_start = self.read_header_fast(filepath)
+        size = os.path.getsize(filepath)
+        dialect = self.get_input_dialect(filepath)
+        delimiter = dialect.delimiter.encode(dialect.encoding)
+        quotechar = dialect.quotechar.encode(dialect.encoding)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            ranges = split_record_ranges(
+                str(filepath), body_start, size, workers, executor, quotechar
             )
+            results = list(
+                executor.map(
+                    scan_range,
+                    [str(filepath)] * len(ranges),
+                    [range_start for range_start, _ in ranges],
+                    [range_stop for _, range_stop in ranges],
+                    [delimiter] * len(ranges),
+                    [num_fields] * len(ranges),
+                    [quotechar] * len(ranges),
+                )
+            )
+
+        for (_, range_stop), (_, _, records_end) in zip(ranges[:-1], results):
+            if records_end != range_stop:
+                logger.warning(
+                    "Intervalli di %s non allineati ai record, "
+                    "scansione sequenziale",
+                    filepath.name,
+                )
+                return self.analyze_csv_file_fast(filepath)
+
+        num_records = 0
+        inconsistent_records = []
+        for range_records, range_inconsistent, _ in results:
+            # start=2 perché row 1 è l'header
+            inconsistent_records.extend(
+                (num_records + index + 2, fields, record_start, record_end)
+                for index, fields, record_start, record_end in range_inconsistent
+            )
+            num_records += range_records
+
+        if self.reject_folder is not None:
+            self.write_scan_rejects(filepath, num_fields, inconsistent_records)
+
+        return CSVAnalysis(
+            filename=filepath.name,
+            num_fields=num_fields,
+            headers=headers,
+            num_records=num_records,
+            inconsistent_records=[
+                (row_num, fields) for row_num, fields, _, _ in inconsistent_records
+            ],
+            header_registry=self.header_registry,
+        )
 
     def analyze_all_files(self) -> List[CSVAnalysis]:
         """
         Analizza tutti i file CSV nella cartella
 
+        Le analisi precedenti sono sostituite, insieme al registro degli
+        headers: contiene solo gli headers dei file correnti.
+
         Returns:
             List[CSVAnalysis]: Lista delle analisi per ciascun file
         """
         csv_files = self.get_csv_files()
+        self.header_registry = HeaderRegistry()
         self.analyses = [self.analyze_csv_file(f) for f in csv_files]
         return self.analyses
 
+    def get_input_dialect(self, filepath: Path) -> CSVDialect:
+        """
+        Formato con cui leggere un file di input: quello rilevato dal
+        campione iniziale con auto_dialect (memorizzato per file), altrimenti
+        delimiter ed encoding configurati con le virgolette doppie.
+        La codifica rilevata sostituisce encoding solo se il campione ne dà
+        evidenza (vedi dialect.resolve_encoding)
+
+        Args:
+            filepath: Percorso del file CSV
+
+        Returns:
+            CSVDialect: Delimitatore, quoting ed encoding del file
+        """
+        if not self.auto_dialect:
+            return CSVDialect(self.delimiter, '"', True, self.encoding)
+        dialect = detect_dialect(filepath)
+        return replace(
+            dialect, encoding=resolve_encoding(dialect.encoding, self.encoding)
+        )
+
+    def read_headers(self, filepath: Path) -> List[str]:
+        """
+        Legge solo la riga di header di un file CSV
+
+        Args:
+            filepath: Percorso del file CSV
+
+        Returns:
+            List[str]: Headers del file
+        """
+        dialect = self.get_input_dialect(filepath)
+        with self.open_input(filepath) as f:
+            return next(
+                csv.reader(f, delimiter=dialect.delimiter, quotechar=dialect.quotechar)
+            )
+
     def get_master_headers(self) -> List[str]:
         """
         Determina l'insieme completo di headers da utilizzare
-        Sceglie il file con il maggior numero di campi
+
+        Con header_mode 'widest' sceglie il file con il maggior numero di
+        campi; con 'union' unisce gli headers di tutti i file, nell'ordine
+        del file più largo seguito dai campi nuovi degli altri file.
+        Se i file non sono ancora stati analizzati legge solo le righe di header.
+        I file con gli stessi headers sono considerati una sola volta (per id
+        del registro degli headers).
 
         Returns:
             List[str]: Lista degli headers master
         """
-        if not self.analyses:
-            self.analyze_all_files()
+        if self.analyses:
+            header_set_ids = dict.fromkeys(
+                analysis.header_set_id for analysis in self.analyses
+            )
+            header_sets = [self.header_registry.get(i) for i in header_set_ids]
+        else:
+            header_sets = [self.read_headers(f) for f in self.get_csv_files()]
 
-        if not self.analyses:
+        if not header_sets:
             raise ValueError("Nessun file CSV trovato nella cartella")
 
-        # Trova il file con il maggior numero di campi
-        max_analysis = max(self.analyses, key=lambda a: a.num_fields)
-        return max_analysis.headers
+        return compute_master_headers(header_sets, self.header_mode)
+
+    def get_column_mapping(
+        self, expected_headers: List[str], current_headers: List[str]
+    ) -> List[int]:
+        """
+        Indice header -> posizione, calcolato una volta per file: per ogni
+        header atteso la posizione del campo nel file corrente (-1 se assente)
+
+        Args:
+            expected_headers: Headers attesi (master)
+            current_headers: Headers del file corrente
+
+        Returns:
+            List[int]: Posizioni nel record corrente, nell'ordine dei master headers
+        """
+        positions = {header: i for i, header in enumerate(current_headers)}
+        return [positions.get(header, -1) for header in expected_headers]
 
     def fix_record_length(
-        self, row: List[str], expected_headers: List[str], current_headers: List[str]
+        self,
+        row: List[str],
+        expected_headers: List[str],
+        current_headers: List[str],
+        column_mapping: Optional[List[int]] = None,
+        same_headers: Optional[bool] = None,
     ) -> List[str]:
         """
         Corregge la lunghezza di un record aggiungendo campi mancanti
 
+        Il record è restituito invariato solo se ha la lunghezza attesa e gli
+        headers del file coincidono con i master (mappatura identità); in
+        tutti gli altri casi i campi sono riportati nell'ordine dei master,
+        anche se il numero di campi è già quello atteso.
+
         Args:
             row: Record da correggere
             expected_headers: Headers attesi (master)
             current_headers: Headers del file corrente
+            column_mapping: Mappatura precalcolata (vedi get_column_mapping)
+            same_headers: Confronto precalcolato degli headers del file con i
+                master, per non ripeterlo a ogni record
 
         Returns:
             List[str]: Record corretto
         """
-        if len(row) == len(expected_headers):
+        if same_headers is None:
+            same_headers = list(current_headers) == list(expected_headers)
+        if same_headers and len(row) == len(expected_headers):
             return row
 
-        # Crea un dizionario con i valori attuali
-        current_dict = {}
-        for i, value in enumerate(row):
-            if i < len(current_headers):
-                current_dict[current_headers[i]] = value
+        if column_mapping is None:
+            column_mapping = self.get_column_mapping(expected_headers, current_headers)
 
         # Costruisci il record corretto nell'ordine dei master headers
-        fixed_row = []
-        for header in expected_headers:
-            if header in current_dict:
-                fixed_row.append(current_dict[header])
-            else:
-                fixed_row.append("")  # Campo mancante
-
-        return fixed_row
+        row_length = len(row)
+        missing = self.missing_field_value  # Campo mancante
+        return [
+            row[i] if 0 <= i < row_length else missing for i in column_mapping
+        ]
 
     def process_and_save(self, output_folder: Optional[str] = None) -> Dict[str, str]:
         """
         Processa tutti i file CSV e salva le versioni corrette
 
+        Con skip_unchanged, se i file non sono già stati analizzati, gli
+        headers master sono ricavati dalle sole righe di header e vengono
+        analizzati solo i file da riscrivere: una nuova esecuzione su file
+        invariati non li scansiona.
+
         Args:
             output_folder: Cartella di output (default: output/ nella stessa directory)
 
         Returns:
             Dict[str, str]: Mappa filename -> output_path
         """
-        if not self.analyses:
+        analyze_changed = not self.analyses and self.skip_unchanged
+        if not self.analyses and not self.skip_unchanged:
             self.analyze_all_files()
 
         # Determina la cartella di output
@@ -189,113 +1165,455 @@ class CSVController:
         output_files = {}
         csv_files = self.get_csv_files()
 
-        for filepath, analysis in zip(csv_files, self.analyses):
-            output_filepath = output_path / filepath.name
+        if self.skip_unchanged:
+            manifest = self.load_manifest(output_path)
+            layout_hash = self.get_layout_hash(master_headers)
+
+        for filepath in csv_files:
+            output_filepath = self.get_output_filepath(output_path, filepath)
+
+            if output_filepath.exists() and not self.overwrite_existing:
+                logger.info("File già presente, non sovrascritto: %s", output_filepath)
+                output_files[filepath.name] = str(output_filepath)
+                continue
+
+            if self.skip_unchanged:
+                entry = self.check_manifest_entry(
+                    manifest.get(filepath.name), filepath, output_filepath, layout_hash
+                )
+                if entry is not None:
+                    logger.info("File non modificato, saltato: %s", filepath.name)
+                    manifest[filepath.name] = entry
+                    output_files[filepath.name] = str(output_filepath)
+                    continue
+
+            if analyze_changed:
+                self.analyses.append(self.analyze_csv_file(filepath))
+            self.write_corrected_file(filepath, output_filepath, master_headers)
+
+            logger.info("File corretto salvato: %s", output_filepath)
+            if self.repair_counts.get(filepath.name):
+                logger.info(
+                    "Record corretti in %s: %s",
+                    filepath.name,
+                    dict(self.repair_counts[filepath.name]),
+                )
+            output_files[filepath.name] = str(output_filepath)
+
+            if self.skip_unchanged:
+                manifest[filepath.name] = self.get_manifest_entry(
+                    filepath, output_filepath, layout_hash
+                )
+
+        if self.skip_unchanged:
+            self.save_manifest(output_path, manifest)
+
+        return output_files
+
+    def write_corrected_file(
+        self, filepath: Path, output_filepath: Path, master_headers: List[str]
+    ) -> None:
+        """
+        Riscrive un file CSV con gli headers master, correggendo i record
+
+        I record sono scritti a blocchi di write_batch_size con writerows;
+        a ogni blocco è applicata la strategia di riparazione dei record con
+        troppi campi, poi il riempimento dei campi mancanti. I record scartati
+        dalla strategia finiscono nel file degli scarti (vedi
+        get_reject_filepath) e i conteggi in repair_counts[filepath.name].
+        Con atomic_write il file viene scritto in un file temporaneo nella
+        stessa cartella e rinominato alla fine: chi legge l'output non vede
+        mai un file scritto a metà.
+
+        Args:
+            filepath: File CSV di input
+            output_filepath: File di output
+            master_headers: Headers master
+        """
+        if self.atomic_write:
+            target_filepath = output_filepath.with_name(output_filepath.name + ".tmp")
+        else:
+            target_filepath = output_filepath
+
+        dialect = self.get_input_dialect(filepath)
+        # merge ricompone i campi con il delimitatore del file di input
+        repair_strategy = self.repair_strategy.for_input(dialect.delimiter)
+        counts = Counter()
+        self.repair_counts[filepath.name] = counts
+        reject_sink = RejectSink(
+            self.get_reject_filepath(output_filepath.parent, filepath),
+            self.delimiter,
+            self.encoding,
+        )
 
-            with open(filepath, "r", encoding=self.encoding, newline="") as infile:
-                reader = csv.reader(infile, delimiter=self.delimiter)
+        try:
+            with self.open_input(filepath) as infile:
+                reader = csv.reader(
+                    infile, delimiter=dialect.delimiter, quotechar=dialect.quotechar
+                )
 
                 # Salta l'header originale
                 current_headers = next(reader)
+                num_fields = len(current_headers)
+                column_mapping = self.get_column_mapping(master_headers, current_headers)
+                same_headers = current_headers == list(master_headers)
 
-                with open(
-                    output_filepath, "w", encoding=self.encoding, newline=""
-                ) as outfile:
+                with self.open_output(target_filepath) as outfile:
                     writer = csv.writer(outfile, delimiter=self.delimiter)
 
                     # Scrivi l'header master
                     writer.writerow(master_headers)
 
-                    # Processa e scrivi i record
-                    for row in reader:
-                        fixed_row = self.fix_record_length(
-                            row, master_headers, current_headers
+                    # Processa e scrivi i record a blocchi
+                    row_number = 2  # la riga 1 è l'header
+                    while True:
+                        batch = list(islice(reader, self.write_batch_size))
+                        if not batch:
+                            break
+
+                        rows, rejected, repaired = repair_strategy.repair_batch(
+                            batch, current_headers
+                        )
+                        if repaired:
+                            counts[repair_strategy.name] += repaired
+                        for index, row in rejected:
+                            reject_sink.write(
+                                row_number + index,
+                                f"{len(row)} campi invece di {num_fields}",
+                                format_raw_record(row, self.delimiter),
+                            )
+                        row_number += len(batch)
+
+                        counts["pad"] += sum(len(row) < num_fields for row in rows)
+                        writer.writerows(
+                            [
+                                self.fix_record_length(
+                                    row,
+                                    master_headers,
+                                    current_headers,
+                                    column_mapping,
+                                    same_headers,
+                                )
+                                for row in rows
+                            ]
                         )
-                        writer.writerow(fixed_row)
 
-            output_files[filepath.name] = str(output_filepath)
+            if self.atomic_write:
+                os.replace(target_filepath, output_filepath)
+        except BaseException:
+            if self.atomic_write and target_filepath.exists():
+                target_filepath.unlink()
+            raise
+        finally:
+            reject_sink.close()
+            if not counts["pad"]:
+                del counts["pad"]
+
+    def get_reject_filepath(
+        self, folder: Path, filepath: Path, kind: str = "rejected"
+    ) -> Path:
+        """
+        File degli scarti (non compresso) di un file di input
 
-        return output_files
+        Es.: (output, data/dati.csv.gz) -> output/dati.rejected.csv
 
-    def generate_report(self) -> str:
-        """
-        Genera un report testuale dell'analisi
+        Args:
+            folder: Cartella del file degli scarti
+            filepath: File di input
+            kind: Tipo di scarto: 'rejected' (strategia quarantine) o
+                'inconsistent' (analisi)
 
         Returns:
-            str: Report formattato
+            Path: Percorso del file degli scarti
         """
-        if not self.analyses:
-            self.analyze_all_files()
+        name = filepath.name
+        if Path(name).suffix.lower() in COMPRESSED_SUFFIXES:
+            name = Path(name).stem
+        return Path(folder) / f"{Path(name).stem}.{kind}.csv"
 
-        report_lines = [
-            "=" * 70,
-            "REPORT ANALISI FILE CSV",
-            "=" * 70,
-            f"\nCartella analizzata: {self.folder_path}",
-            f"Numero file CSV trovati: {len(self.analyses)}",
-            "\n" + "-" * 70,
+    def get_layout_hash(self, master_headers: List[str]) -> str:
+        """
+        Hash del formato dei file di output: headers master e opzioni che
+        cambiano il contenuto scritto
+
+        Args:
+            master_headers: Headers master
+
+        Returns:
+            str: Digest esadecimale
+        """
+        layout = [
+            master_headers,
+            self.delimiter,
+            self.encoding,
+            self.missing_field_value,
+            self.output_compression,
+            self.repair_strategy.get_layout(),
+            self.auto_dialect,
         ]
+        return hashlib.sha256(json.dumps(layout).encode("utf-8")).hexdigest()
 
-        # Analisi dettagliata per file
-        for analysis in self.analyses:
-            report_lines.append(f"\n{analysis}")
-            if analysis.inconsistent_records:
-                report_lines.append(f"  Record non coerenti:")
-                for row_num, num_fields in analysis.inconsistent_records[
-                    :5
-                ]:  # mostra primi 5
-                    report_lines.append(f"    - Riga {row_num}: {num_fields} campi")
-                if len(analysis.inconsistent_records) > 5:
-                    report_lines.append(
-                        f"    ... e altri {len(analysis.inconsistent_records) - 5}"
-                    )
-
-        # Riepilogo
-        report_lines.extend(
-            [
-                "\n" + "-" * 70,
-                "\nRIEPILOGO:",
-            ]
-        )
+    def get_file_hash(self, filepath: Path) -> str:
+        """
+        Hash del contenuto di un file, letto a blocchi
 
-        master_headers = self.get_master_headers()
-        report_lines.append(
-            f"Numero di campi standard (massimo): {len(master_headers)}"
+        Args:
+            filepath: Percorso del file
+
+        Returns:
+            str: Digest esadecimale
+        """
+        file_hash = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
+    def get_manifest_entry(
+        self, filepath: Path, output_filepath: Path, layout_hash: str
+    ) -> Dict:
+        """
+        Voce del manifest per un file di input appena processato
+
+        Args:
+            filepath: File CSV di input
+            output_filepath: File di output
+            layout_hash: Hash del formato di output (vedi get_layout_hash)
+
+        Returns:
+            Dict: size, mtime_ns, sha256, layout_hash, output
+        """
+        stat = filepath.stat()
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": self.get_file_hash(filepath),
+            "layout_hash": layout_hash,
+            "output": output_filepath.name,
+        }
+
+    def check_manifest_entry(
+        self,
+        entry: Optional[Dict],
+        filepath: Path,
+        output_filepath: Path,
+        layout_hash: str,
+    ) -> Optional[Dict]:
+        """
+        Verifica se un file può essere saltato: stesso formato di output,
+        file di output presente e input invariato. Se size e mtime coincidono
+        il contenuto non viene riletto; se cambia solo mtime si confronta l'hash.
+
+        Args:
+            entry: Voce del manifest dell'esecuzione precedente (o None)
+            filepath: File CSV di input
+            output_filepath: File di output
+            layout_hash: Hash del formato di output corrente
+
+        Returns:
+            Optional[Dict]: Voce aggiornata se il file è invariato, altrimenti None
+        """
+        if (
+            entry is None
+            or entry.get("layout_hash") != layout_hash
+            or entry.get("output") != output_filepath.name
+            or not output_filepath.exists()
+        ):
+            return None
+
+        stat = filepath.stat()
+        if stat.st_size != entry.get("size"):
+            return None
+        if stat.st_mtime_ns == entry.get("mtime_ns"):
+            return entry
+        if self.get_file_hash(filepath) != entry.get("sha256"):
+            return None
+
+        return dict(entry, mtime_ns=stat.st_mtime_ns)
+
+    def load_manifest(self, output_path: Path) -> Dict[str, Dict]:
+        """
+        Carica il manifest dalla cartella di output
+
+        Args:
+            output_path: Cartella di output
+
+        Returns:
+            Dict[str, Dict]: Mappa filename -> voce (vuota se assente o illeggibile)
+        """
+        manifest_path = output_path / self.MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return {}
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Manifest non leggibile, ignorato: %s (%s)", manifest_path, e)
+            return {}
+
+    def save_manifest(self, output_path: Path, manifest: Dict[str, Dict]) -> None:
+        """
+        Salva il manifest nella cartella di output
+
+        Args:
+            output_path: Cartella di output
+            manifest: Mappa filename -> voce
+        """
+        with open(output_path / self.MANIFEST_FILENAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    def get_output_filepath(self, output_path: Path, filepath: Path) -> Path:
+        """
+        Percorso del file corretto, con l'estensione della compressione
+        di output al posto di quella dell'input
+
+        Args:
+            output_path: Cartella di output
+            filepath: File CSV di input
+
+        Returns:
+            Path: Percorso del file di output
+        """
+        name = filepath.name
+        if get_compression(filepath) != "none":
+            name = filepath.stem
+        return output_path / (name + COMPRESSION_SUFFIXES[self.output_compression])
+
+    def open_input(self, filepath: Path):
+        """
+        Apre in lettura (testo) un file di input, decompresso in streaming
+        in base all'estensione (.gz, .bz2, .zst), con l'encoding del suo
+        formato (vedi get_input_dialect)
+
+        Args:
+            filepath: Percorso del file di input
+
+        Returns:
+            File di testo aperto in lettura
+        """
+        encoding = self.get_input_dialect(filepath).encoding
+        compression = get_compression(filepath)
+        if compression == "gzip":
+            binary = gzip.open(filepath, "rb")
+        elif compression == "bz2":
+            binary = bz2.open(filepath, "rb")
+        elif compression == "zstd":
+            zstandard = _import_zstandard()
+            binary = zstandard.ZstdDecompressor().stream_reader(
+                open(filepath, "rb"), closefd=True
+            )
+        else:
+            return open(
+                filepath,
+                "r",
+                encoding=encoding,
+                newline="",
+                buffering=self.read_buffer_size,
+            )
+
+        return io.TextIOWrapper(
+            io.BufferedReader(binary, buffer_size=self.read_buffer_size),
+            encoding=encoding,
+            newline="",
         )
 
-        files_needing_fix = [
-            a
-            for a in self.analyses
-            if a.inconsistent_records or a.num_fields != len(master_headers)
-        ]
-        report_lines.append(
-            f"File che necessitano correzione: {len(files_needing_fix)}"
+    def open_output(self, output_filepath: Path):
+        """
+        Apre in scrittura (testo) un file di output, compresso se richiesto
+
+        Args:
+            output_filepath: Percorso del file di output
+
+        Returns:
+            File di testo aperto in scrittura
+        """
+        if self.output_compression == "gzip":
+            binary = gzip.open(output_filepath, "wb")
+        elif self.output_compression == "bz2":
+            binary = bz2.open(output_filepath, "wb")
+        elif self.output_compression == "zstd":
+            zstandard = _import_zstandard()
+            binary = zstandard.ZstdCompressor().stream_writer(
+                open(output_filepath, "wb"), closefd=True
+            )
+        else:
+            return open(
+                output_filepath,
+                "w",
+                encoding=self.encoding,
+                newline="",
+                buffering=self.write_buffer_size,
+            )
+
+        return io.TextIOWrapper(
+            io.BufferedWriter(binary, buffer_size=self.write_buffer_size),
+            encoding=self.encoding,
+            newline="",
         )
 
-        report_lines.append("\nCampi master (primi 10):")
-        for i, header in enumerate(master_headers[:10], 1):
-            report_lines.append(f"  {i}. {header}")
-        if len(master_headers) > 10:
-            report_lines.append(f"  ... e altri {len(master_headers) - 10} campi")
+    def build_report(self) -> CSVReport:
+        """
+        Costruisce il report strutturato dell'analisi (un solo passaggio
+        sulle analisi, headers master calcolati una volta)
+
+        Returns:
+            CSVReport: Report, esportabile in testo, JSON o HTML
+        """
+        if not self.analyses:
+            self.analyze_all_files()
 
-        report_lines.append("\n" + "=" * 70)
+        return CSVReport.from_analyses(
+            self.folder_path,
+            self.analyses,
+            self.get_master_headers(),
+            max_inconsistent_display=self.max_inconsistent_display,
+            max_headers_display=self.max_headers_display,
+        )
+
+    def generate_report(self) -> str:
+        """
+        Genera un report testuale dell'analisi
 
-        return "\n".join(report_lines)
+        Returns:
+            str: Report formattato
+        """
+        return self.build_report().to_text()
 
 
 def main():
     """Funzione principale per l'esecuzione da riga di comando"""
     import sys
 
-    if len(sys.argv) < 2:
-        print("Uso: python csv_control.py <cartella_csv> [cartella_output]")
-        sys.exit(1)
+    usage = "Uso: python csv_control.py <cartella_csv> [cartella_output] [--config file.ini]"
+
+    args = sys.argv[1:]
+    config_path = None
+    if "--config" in args:
+        position = args.index("--config")
+        if position + 1 >= len(args):
+            print(usage)
+            sys.exit(1)
+        config_path = args[position + 1]
+        del args[position : position + 2]
 
-    input_folder = sys.argv[1]
-    output_folder = sys.argv[2] if len(sys.argv) > 2 else None
+    if not args and config_path is None:
+        print(usage)
+        sys.exit(1)
 
     try:
-        controller = CSVController(input_folder)
+        if config_path is not None:
+            config = load_config(config_path)
+            configure_logging(config)
+
+            # Le cartelle da riga di comando hanno la precedenza
+            input_folder = args[0] if args else config.input_folder
+            output_folder = args[1] if len(args) > 1 else config.output_folder
+            controller = CSVController.from_config(config, input_folder)
+        else:
+            input_folder = args[0]
+            output_folder = args[1] if len(args) > 1 else None
+            controller = CSVController(input_folder)
 
         # Analizza i file
         print("Analisi dei file CSV in corso...")
@@ -0,0 +1,174 @@
+"""
+Repair - Strategie di riparazione dei record con troppi campi
+
+Un record con più campi dell'header nasce di solito da un delimitatore non
+protetto da virgolette dentro un campo di testo. Le strategie lavorano su
+blocchi di record (quelli scritti con un writerows) e restituiscono i record
+riparati, quelli scartati e il numero di record modificati.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+# Strategie disponibili per i record con troppi campi
+REPAIR_STRATEGIES = ("none", "merge", "truncate", "quarantine")
+
+# (record riparati, [(posizione nel blocco, record scartato)], record riparati)
+RepairResult = Tuple[List[List[str]], List[Tuple[int, List[str]]], int]
+
+
+class RepairStrategy:
+    """Strategia base: lascia invariati i record con troppi campi"""
+
+    name = "none"
+
+    def repair_batch(
+        self, rows: List[List[str]], headers: Sequence[str]
+    ) -> RepairResult:
+        """
+        Ripara i record di un blocco che hanno più campi degli headers
+
+        Args:
+            rows: Blocco di record
+            headers: Headers del file
+
+        Returns:
+            RepairResult: (record da scrivere, record scartati con la loro
+                posizione nel blocco, numero di record riparati)
+        """
+        return rows, [], 0
+
+    def get_layout(self) -> list:
+        """
+        Opzioni della strategia che cambiano il contenuto dei file di output
+        (incluse nell'hash del formato, vedi CSVController.get_layout_hash)
+        """
+        return [self.name]
+
+    def for_input(self, delimiter: str) -> "RepairStrategy":
+        """
+        Strategia da usare per un file di input con il delimitatore indicato
+        (può essere diverso da quello configurato con auto_dialect)
+
+        Args:
+            delimiter: Delimitatore del file di input
+
+        Returns:
+            RepairStrategy: Strategia (self se non dipende dal delimitatore)
+        """
+        return self
+
+
+class MergeOverflowStrategy(RepairStrategy):
+    """
+    Unisce i campi in eccesso nella colonna di testo indicata, rimettendo il
+    delimitatore tra i pezzi
+    """
+
+    name = "merge"
+
+    def __init__(self, column: Optional[str] = None, delimiter: str = ";"):
+        """
+        Args:
+            column: Header della colonna che riceve i campi in eccesso
+                (default: ultima colonna)
+            delimiter: Delimitatore usato per ricomporre il campo
+        """
+        self.column = column
+        self.delimiter = delimiter
+
+    def get_layout(self) -> list:
+        return [self.name, self.column, self.delimiter]
+
+    def for_input(self, delimiter: str) -> RepairStrategy:
+        if delimiter == self.delimiter:
+            return self
+        return MergeOverflowStrategy(self.column, delimiter)
+
+    def get_column_index(self, headers: Sequence[str]) -> int:
+        """Posizione della colonna di testo negli headers del file"""
+        if self.column is not None and self.column in headers:
+            return list(headers).index(self.column)
+        return len(headers) - 1
+
+    def repair_batch(
+        self, rows: List[List[str]], headers: Sequence[str]
+    ) -> RepairResult:
+        num_fields = len(headers)
+        column = self.get_column_index(headers)
+        join = self.delimiter.join
+        repaired = 0
+        result = []
+
+        for row in rows:
+            extra = len(row) - num_fields
+            if extra > 0:
+                end = column + extra + 1
+                row = row[:column] + [join(row[column:end])] + row[end:]
+                repaired += 1
+            result.append(row)
+
+        return result, [], repaired
+
+
+class TruncateStrategy(RepairStrategy):
+    """Scarta i campi oltre il numero di headers"""
+
+    name = "truncate"
+
+    def repair_batch(
+        self, rows: List[List[str]], headers: Sequence[str]
+    ) -> RepairResult:
+        num_fields = len(headers)
+        repaired = sum(len(row) > num_fields for row in rows)
+        if not repaired:
+            return rows, [], 0
+        return [row[:num_fields] for row in rows], [], repaired
+
+
+class QuarantineStrategy(RepairStrategy):
+    """Sposta i record con troppi campi nel file degli scarti"""
+
+    name = "quarantine"
+
+    def repair_batch(
+        self, rows: List[List[str]], headers: Sequence[str]
+    ) -> RepairResult:
+        num_fields = len(headers)
+        kept = []
+        rejected = []
+        for index, row in enumerate(rows):
+            if len(row) > num_fields:
+                rejected.append((index, row))
+            else:
+                kept.append(row)
+        return kept, rejected, len(rejected)
+
+
+def make_repair_strategy(
+    name: str, column: Optional[str] = None, delimiter: str = ";"
+) -> RepairStrategy:
+    """
+    Crea una strategia dal suo nome
+
+    Args:
+        name: Uno tra REPAIR_STRATEGIES
+        column: Colonna di testo per la strategia 'merge'
+        delimiter: Delimitatore dei file CSV
+
+    Returns:
+        RepairStrategy: Strategia
+
+    Raises:
+        ValueError: Se il nome non è valido
+    """
+    if name == "none":
+        return RepairStrategy()
+    if name == "merge":
+        return MergeOverflowStrategy(column, delimiter)
+    if name == "truncate":
+        return TruncateStrategy()
+    if name == "quarantine":
+        return QuarantineStrategy()
+    raise ValueError(
+        f"repair_strategy deve essere uno tra {REPAIR_STRATEGIES}, ricevuto: {name}"
+    )
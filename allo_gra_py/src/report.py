@@ -0,0 +1,219 @@
+"""
+Report - Modello strutturato del report di analisi dei file CSV
+
+Il report viene calcolato una sola volta dalle analisi (CSVReport.from_analyses)
+e reso come testo, JSON o HTML solo quando richiesto.
+"""
+
+import html
+import json
+from dataclasses import dataclass, field, asdict
+from typing import List, Tuple, Dict, Any
+
+
+@dataclass
+class FileReport:
+    """Riepilogo dell'analisi di un singolo file"""
+
+    filename: str
+    num_fields: int
+    num_records: int
+    num_inconsistent: int
+    inconsistent_sample: List[Tuple[int, int]]  # primi N (row_number, num_fields)
+    needs_fix: bool
+
+
+@dataclass
+class CSVReport:
+    """Report dell'analisi di una cartella di file CSV"""
+
+    folder: str
+    files: List[FileReport]
+    master_headers: List[str]
+    files_needing_fix: int
+    max_headers_display: int = 10
+    total_records: int = field(default=0)
+    total_inconsistent: int = field(default=0)
+
+    @classmethod
+    def from_analyses(
+        cls,
+        folder: str,
+        analyses: List,
+        master_headers: List[str],
+        max_inconsistent_display: int = 5,
+        max_headers_display: int = 10,
+    ) -> "CSVReport":
+        """
+        Costruisce il report con un solo passaggio sulle analisi
+
+        Args:
+            folder: Cartella analizzata
+            analyses: Lista di CSVAnalysis
+            master_headers: Headers master
+            max_inconsistent_display: Record inconsistenti conservati per file
+            max_headers_display: Headers master mostrati nel testo e in HTML
+
+        Returns:
+            CSVReport: Report
+        """
+        num_master_fields = len(master_headers)
+        files = []
+        files_needing_fix = 0
+        total_records = 0
+        total_inconsistent = 0
+
+        for analysis in analyses:
+            num_inconsistent = len(analysis.inconsistent_records)
+            needs_fix = bool(num_inconsistent) or analysis.num_fields != num_master_fields
+            files.append(
+                FileReport(
+                    filename=analysis.filename,
+                    num_fields=analysis.num_fields,
+                    num_records=analysis.num_records,
+                    num_inconsistent=num_inconsistent,
+                    inconsistent_sample=list(
+                        analysis.inconsistent_records[:max_inconsistent_display]
+                    ),
+                    needs_fix=needs_fix,
+                )
+            )
+            files_needing_fix += needs_fix
+            total_records += analysis.num_records
+            total_inconsistent += num_inconsistent
+
+        return cls(
+            folder=str(folder),
+            files=files,
+            master_headers=list(master_headers),
+            files_needing_fix=files_needing_fix,
+            max_headers_display=max_headers_display,
+            total_records=total_records,
+            total_inconsistent=total_inconsistent,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report come dizionario serializzabile"""
+        return asdict(self)
+
+    def to_json(self, **kwargs) -> str:
+        """
+        Report in formato JSON
+
+        Args:
+            **kwargs: Argomenti per json.dumps (es. indent=2)
+
+        Returns:
+            str: JSON
+        """
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    def to_text(self) -> str:
+        """
+        Report testuale (formato di CSVController.generate_report)
+
+        Returns:
+            str: Report formattato
+        """
+        report_lines = [
+            "=" * 70,
+            "REPORT ANALISI FILE CSV",
+            "=" * 70,
+            f"\nCartella analizzata: {self.folder}",
+            f"Numero file CSV trovati: {len(self.files)}",
+            "\n" + "-" * 70,
+        ]
+
+        # Analisi dettagliata per file
+        for file_report in self.files:
+            report_lines.append(
+                f"\nFile: {file_report.filename}\n"
+                f"  Headers: {file_report.num_fields}\n"
+                f"  Records: {file_report.num_records}\n"
+                f"  Inconsistent: {file_report.num_inconsistent}"
+            )
+            if file_report.num_inconsistent:
+                report_lines.append("  Record non coerenti:")
+                for row_num, num_fields in file_report.inconsistent_sample:
+                    report_lines.append(f"    - Riga {row_num}: {num_fields} campi")
+                not_shown = file_report.num_inconsistent - len(
+                    file_report.inconsistent_sample
+                )
+                if not_shown > 0:
+                    report_lines.append(f"    ... e altri {not_shown}")
+
+        # Riepilogo
+        report_lines.extend(
+            [
+                "\n" + "-" * 70,
+                "\nRIEPILOGO:",
+                f"Numero di campi standard (massimo): {len(self.master_headers)}",
+                f"File che necessitano correzione: {self.files_needing_fix}",
+            ]
+        )
+
+        max_headers = self.max_headers_display
+        report_lines.append(f"\nCampi master (primi {max_headers}):")
+        for i, header in enumerate(self.master_headers[:max_headers], 1):
+            report_lines.append(f"  {i}. {header}")
+        if len(self.master_headers) > max_headers:
+            report_lines.append(
+                f"  ... e altri {len(self.master_headers) - max_headers} campi"
+            )
+
+        report_lines.append("\n" + "=" * 70)
+
+        return "\n".join(report_lines)
+
+    def to_html(self) -> str:
+        """
+        Report in formato HTML (pagina autonoma)
+
+        Returns:
+            str: HTML
+        """
+        rows = []
+        for file_report in self.files:
+            sample = ", ".join(
+                f"riga {row_num}: {num_fields} campi"
+                for row_num, num_fields in file_report.inconsistent_sample
+            )
+            rows.append(
+                "<tr{cls}><td>{filename}</td><td>{num_fields}</td><td>{num_records}</td>"
+                "<td>{num_inconsistent}</td><td>{sample}</td></tr>".format(
+                    cls=' class="needs-fix"' if file_report.needs_fix else "",
+                    filename=html.escape(file_report.filename),
+                    num_fields=file_report.num_fields,
+                    num_records=file_report.num_records,
+                    num_inconsistent=file_report.num_inconsistent,
+                    sample=html.escape(sample),
+                )
+            )
+
+        headers = "".join(
+            f"<li>{html.escape(header)}</li>"
+            for header in self.master_headers[: self.max_headers_display]
+        )
+
+        return "\n".join(
+            [
+                "<!DOCTYPE html>",
+                '<html lang="it">',
+                '<head><meta charset="utf-8"><title>Report analisi file CSV</title></head>',
+                "<body>",
+                "<h1>Report analisi file CSV</h1>",
+                f"<p>Cartella analizzata: {html.escape(self.folder)}</p>",
+                f"<p>Numero file CSV trovati: {len(self.files)}</p>",
+                "<table>",
+                "<tr><th>File</th><th>Headers</th><th>Records</th>"
+                "<th>Inconsistent</th><th>Record non coerenti</th></tr>",
+                *rows,
+                "</table>",
+                "<h2>Riepilogo</h2>",
+                f"<p>Numero di campi standard (massimo): {len(self.master_headers)}</p>",
+                f"<p>File che necessitano correzione: {self.files_needing_fix}</p>",
+                f"<ol>{headers}</ol>",
+                "</body>",
+                "</html>",
+            ]
+        )
@@ -0,0 +1,289 @@
+"""
+Watcher - Servizio che processa i file CSV man mano che arrivano nella cartella
+
+La cartella di input viene controllata a intervalli (polling). Un file è
+considerato completo quando dimensione e data di modifica restano invariate
+per settle_time secondi; viene quindi analizzato e corretto da un pool di
+thread di dimensione limitata. Gli headers master sono aggiornati a ogni
+nuovo file: se cambiano, i file già processati vengono riscritti.
+
+Le scritture di uno stesso file di output sono serializzate da un lock per
+file; le richieste di riscrittura arrivate durante una scrittura sono
+accorpate in un'unica riscrittura con gli headers master più recenti.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    from .csv_control import CSVController, HeaderRegistry, compute_master_headers
+except ImportError:  # eseguito come script: python src/watcher.py
+    from csv_control import CSVController, HeaderRegistry, compute_master_headers
+
+logger = logging.getLogger(__name__)
+
+
+class CSVWatcher:
+    """Classe per il processamento continuo dei file CSV di una cartella"""
+
+    def __init__(
+        self,
+        controller: CSVController,
+        output_folder: str,
+        max_workers: int = 2,
+        settle_time: float = 2.0,
+        poll_interval: float = 1.0,
+    ):
+        """
+        Inizializza il watcher
+
+        Args:
+            controller: Controller configurato sulla cartella di input
+            output_folder: Cartella dei file corretti
+            max_workers: Numero massimo di file processati in parallelo
+            settle_time: Secondi di stabilità prima di processare un file
+            poll_interval: Secondi tra due controlli della cartella
+        """
+        self.controller = controller
+        self.output_path = Path(output_folder)
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+
+        # path -> ((size, mtime_ns), istante in cui è stato visto così)
+        self.pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        # path -> (size, mtime_ns) dell'ultimo processamento
+        self.processed: Dict[Path, Tuple[int, int]] = {}
+        self.futures: List[Future] = []
+
+        # path -> headers del file (tupla del registro del controller)
+        self.file_headers: Dict[Path, Tuple[str, ...]] = {}
+        self.master_headers: List[str] = []
+        self.output_files: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+
+        # file di output -> lock che ne serializza le scritture
+        self.file_locks: Dict[Path, threading.Lock] = {}
+        # file di input da riscrivere con gli headers master correnti
+        self.needs_rewrite: Set[Path] = set()
+
+    def poll_once(self) -> List[Path]:
+        """
+        Controlla la cartella e mette in coda i file nuovi o modificati
+        che hanno smesso di cambiare
+
+        Returns:
+            List[Path]: File messi in coda
+        """
+        now = time.monotonic()
+        ready = []
+
+        for filepath in self.controller.get_csv_files():
+            try:
+                stat = filepath.stat()
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+
+            if self.processed.get(filepath) == signature:
+                continue
+
+            seen = self.pending.get(filepath)
+            if seen is None or seen[0] != signature:
+                # Nuovo o ancora in scrittura: aspetta che si stabilizzi
+                self.pending[filepath] = (signature, now)
+                continue
+            if now - seen[1] < self.settle_time:
+                continue
+
+            del self.pending[filepath]
+            self.processed[filepath] = signature
+            ready.append(filepath)
+
+        for filepath in ready:
+            self.submit(filepath)
+        return ready
+
+    def submit(self, filepath: Path) -> Future:
+        """Mette in coda un file nel pool di processamento"""
+        future = self.executor.submit(self.process_file, filepath)
+        self.futures.append(future)
+        return future
+
+    def process_file(self, filepath: Path) -> Optional[str]:
+        """
+        Analizza un file, aggiorna gli headers master e scrive il file corretto
+
+        Args:
+            filepath: File CSV di input
+
+        Returns:
+            Optional[str]: Percorso del file corretto (None in caso di errore)
+        """
+        try:
+            analysis = self.controller.analyze_csv_file(filepath)
+
+            with self.lock:
+                self.file_headers[filepath] = analysis.headers
+                header_sets = list(dict.fromkeys(self.file_headers.values()))
+                # Il registro del controller vive quanto il servizio: quando
+                # contiene headers non più usati da nessun file lo rinnova
+                if len(self.controller.header_registry) > len(header_sets):
+                    self.controller.header_registry = HeaderRegistry()
+                master_headers = compute_master_headers(
+                    header_sets, self.controller.header_mode
+                )
+                changed = master_headers != self.master_headers
+                self.master_headers = master_headers
+                to_rewrite = [
+                    other for other in self.file_headers if other != filepath
+                ] if changed else []
+
+            output_filepath = self.write_output(filepath)
+
+            with self.lock:
+                self.output_files[filepath.name] = str(output_filepath)
+                self.errors.pop(filepath.name, None)
+            logger.info("File corretto salvato: %s", output_filepath)
+
+            # I file già scritti hanno headers master superati
+            for other in to_rewrite:
+                logger.info("Headers master cambiati, riscrittura di %s", other.name)
+                self.submit_rewrite(other)
+
+            return str(output_filepath)
+
+        except Exception as e:
+            logger.error("Errore nel processamento di %s: %s", filepath.name, e)
+            with self.lock:
+                self.errors[filepath.name] = str(e)
+            return None
+
+    def get_file_lock(self, output_filepath: Path) -> threading.Lock:
+        """Lock che serializza le scritture di un file di output"""
+        with self.lock:
+            return self.file_locks.setdefault(output_filepath, threading.Lock())
+
+    def write_output(self, filepath: Path, only_if_needed: bool = False) -> Optional[Path]:
+        """
+        Scrive il file corretto con gli headers master letti al momento della
+        scrittura, sotto il lock del file di output. Se durante la scrittura
+        gli headers master cambiano (richiesta di riscrittura), il file viene
+        riscritto subito dopo.
+
+        Args:
+            filepath: File CSV di input
+            only_if_needed: Scrive solo se è richiesta una riscrittura non
+                ancora eseguita da un'altra scrittura
+
+        Returns:
+            Optional[Path]: File di output (None se non è stato necessario scriverlo)
+        """
+        output_filepath = self.controller.get_output_filepath(self.output_path, filepath)
+        written = False
+        with self.get_file_lock(output_filepath):
+            while True:
+                with self.lock:
+                    # Dopo la prima scrittura ripete solo se nel frattempo è
+                    # arrivata una richiesta di riscrittura
+                    if (only_if_needed or written) and filepath not in self.needs_rewrite:
+                        break
+                    self.needs_rewrite.discard(filepath)
+                    master_headers = list(self.master_headers)
+
+                self.controller.write_corrected_file(
+                    filepath, output_filepath, master_headers
+                )
+                written = True
+
+        return output_filepath if written else None
+
+    def submit_rewrite(self, filepath: Path) -> Optional[Future]:
+        """
+        Mette in coda la riscrittura di un file con gli headers master correnti
+
+        Le richieste per un file con una riscrittura già in attesa sono accorpate.
+
+        Returns:
+            Optional[Future]: None se la riscrittura era già in coda
+        """
+        with self.lock:
+            if filepath in self.needs_rewrite:
+                return None
+            self.needs_rewrite.add(filepath)
+        future = self.executor.submit(self.rewrite_file, filepath)
+        self.futures.append(future)
+        return future
+
+    def rewrite_file(self, filepath: Path) -> None:
+        """Riscrive un file già analizzato con gli headers master correnti"""
+        try:
+            self.write_output(filepath, only_if_needed=True)
+        except Exception as e:
+            logger.error("Errore nella riscrittura di %s: %s", filepath.name, e)
+            with self.lock:
+                self.errors[filepath.name] = str(e)
+
+    def wait(self) -> None:
+        """Attende la fine di tutti i processamenti in coda"""
+        while self.futures:
+            self.futures.pop(0).result()
+
+    def run(self, stop_event: Optional[threading.Event] = None) -> None:
+        """
+        Controlla la cartella ogni poll_interval secondi fino a stop_event
+        (o a Ctrl+C)
+
+        Args:
+            stop_event: Evento che ferma il servizio
+        """
+        if stop_event is None:
+            stop_event = threading.Event()
+
+        logger.info("Watcher avviato su %s", self.controller.folder_path)
+        try:
+            while not stop_event.is_set():
+                self.poll_once()
+                self.futures = [f for f in self.futures if not f.done()]
+                stop_event.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+        logger.info("Watcher fermato")
+
+    def close(self) -> None:
+        """Attende i processamenti in corso e chiude il pool"""
+        self.executor.shutdown(wait=True)
+
+
+def main():
+    """Funzione principale per l'esecuzione da riga di comando"""
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Uso: python watcher.py <cartella_csv> <cartella_output> [max_workers]")
+        sys.exit(1)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    watcher = CSVWatcher(
+        CSVController(sys.argv[1], atomic_write=True),
+        sys.argv[2],
+        max_workers=max_workers,
+    )
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()
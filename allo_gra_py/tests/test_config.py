@@ -0,0 +1,133 @@
+"""
+Test unitari per il modulo config
+"""
+
+import pytest
+import csv
+import gzip
+import logging
+from pathlib import Path
+from src.config import CSVControlConfig, configure_logging, load_config
+from src.csv_control import CSVController
+
+EXAMPLE_CONFIG = Path(__file__).parent.parent / "config.example.ini"
+
+
+class TestLoadConfig:
+    """Test per load_config"""
+
+    def test_load_example_config(self):
+        """Test che config.example.ini corrisponda ai valori di default"""
+        assert load_config(str(EXAMPLE_CONFIG)) == CSVControlConfig()
+
+    def test_load_custom_config(self, tmp_path):
+        """Test caricamento opzioni personalizzate"""
+        config_file = tmp_path / "config.ini"
+        config_file.write_text(
+            "[csv]\n"
+            "delimiter = ,\n"
+            "[processing]\n"
+            "missing_field_value = N/D\n"
+            "overwrite_existing = false\n"
+            "repair_strategy = merge\n"
+            "merge_column = NOTE\n"
+            "[performance]\n"
+            "workers = 4\n"
+            "write_buffer_size = 1048576\n"
+            "output_compression = gzip\n",
+            encoding="utf-8",
+        )
+
+        config = load_config(str(config_file))
+
+        assert config.delimiter == ","
+        assert config.missing_field_value == "N/D"
+        assert config.overwrite_existing is False
+        assert config.repair_strategy == "merge"
+        assert config.merge_column == "NOTE"
+        assert config.workers == 4
+        assert config.write_buffer_size == 1048576
+        assert config.output_compression == "gzip"
+        assert config.encoding == "utf-8"  # default
+
+    def test_load_invalid_config(self, tmp_path):
+        """Test valori non validi"""
+        config_file = tmp_path / "config.ini"
+        config_file.write_text(
+            "[performance]\noutput_compression = rar\n", encoding="utf-8"
+        )
+
+        with pytest.raises(ValueError):
+            load_config(str(config_file))
+
+
+class TestConfigureLogging:
+    """Test per configure_logging"""
+
+    def test_configure_logging_idempotent(self, tmp_path):
+        """Test chiamate ripetute: un solo handler, messaggi scritti una volta"""
+        log_file = tmp_path / "csv_control.log"
+        config = CSVControlConfig(log_to_file=True, log_filename=str(log_file))
+        logger = logging.getLogger("test_configure_logging")
+        external = logging.NullHandler()
+        logger.addHandler(external)
+
+        try:
+            configure_logging(config, logger.name)
+            configure_logging(config, logger.name)
+            configure_logging(config, logger.name)
+            logger.info("messaggio")
+
+            assert len(logger.handlers) == 2
+            assert external in logger.handlers
+            assert log_file.read_text(encoding="utf-8").count("messaggio") == 1
+        finally:
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+
+
+class TestControllerFromConfig:
+    """Test per CSVController.from_config"""
+
+    @pytest.fixture
+    def csv_folder(self, tmp_path):
+        """Crea una cartella con due file CSV di larghezza diversa"""
+        folder = tmp_path / "data"
+        folder.mkdir()
+        with open(folder / "a.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["ID", "NOME"])
+            writer.writerow(["1", "Mario"])
+        with open(folder / "b.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["ID", "NOME", "CITTA"])
+            writer.writerow(["2", "Anna", "Roma"])
+        return folder
+
+    def test_missing_field_value_and_compression(self, csv_folder, tmp_path):
+        """Test valore per campi mancanti e output compresso"""
+        config = CSVControlConfig(missing_field_value="N/D", output_compression="gzip")
+        controller = CSVController.from_config(config, str(csv_folder))
+
+        output_files = controller.process_and_save(str(tmp_path / "output"))
+
+        assert output_files["a.csv"].endswith("a.csv.gz")
+        with gzip.open(output_files["a.csv"], "rt", encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f, delimiter=";"))
+        assert rows == [["ID", "NOME", "CITTA"], ["1", "Mario", "N/D"]]
+
+    def test_overwrite_existing(self, csv_folder, tmp_path):
+        """Test che i file esistenti non vengano sovrascritti"""
+        output_folder = tmp_path / "output"
+        output_folder.mkdir()
+        (output_folder / "a.csv").write_text("esistente", encoding="utf-8")
+
+        config = CSVControlConfig(overwrite_existing=False)
+        CSVController.from_config(config, str(csv_folder)).process_and_save(
+            str(output_folder)
+        )
+
+        assert (output_folder / "a.csv").read_text(encoding="utf-8") == "esistente"
+        assert (output_folder / "b.csv").exists()
+
@@ -4,8 +4,9 @@ Test unitari per il modulo csv_control
 
 import pytest
 import csv
+import gzip
 from pathlib import Path
-from src.csv_control import CSVController, CSVAnalysis
+from src.csv_control import CSVController, CSVAnalysis, HeaderRegistry, scan_records
 
 
 class TestCSVAnalysis:
@@ -43,6 +44,23 @@ class TestCSVAnalysis:
         assert "5" in output
         assert "2" in output  # 2 record inconsistenti
 
+    def test_csv_analysis_shared_headers(self):
+        """Test condivisione degli headers tra analisi con gli stessi campi"""
+        registry = HeaderRegistry()
+        first = CSVAnalysis("a.csv", 2, ["X", "Y"], 1, [], registry)
+        second = CSVAnalysis("b.csv", 2, ["X", "Y"], 3, [], registry)
+        other = CSVAnalysis("c.csv", 1, ["X"], 3, [], registry)
+
+        assert first.headers is second.headers
+        assert first.header_set_id == second.header_set_id
+        assert other.header_set_id != first.header_set_id
+        assert len(registry) == 2
+        assert not hasattr(first, "__dict__")
+
+        standalone = CSVAnalysis("d.csv", 2, ["X", "Y"], 1, [])
+        assert standalone.headers == ("X", "Y")
+        assert standalone.header_set_id is None
+
 
 class TestCSVController:
     """Test per la classe CSVController"""
@@ -140,6 +158,43 @@ class TestCSVController:
         assert len(master_headers) == 5
         assert master_headers == ["CAMPO_A", "CAMPO_B", "CAMPO_C", "CAMPO_D", "CAMPO_E"]
 
+    def test_get_master_headers_union(self, tmp_path):
+        """Test headers master in modalità unione: nessun campo perso"""
+        with open(tmp_path / "a.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["ID", "NOME", "COGNOME"])
+            writer.writerow(["1", "Mario", "Rossi"])
+        with open(tmp_path / "b.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["ID", "EMAIL"])
+            writer.writerow(["2", "anna@test.it"])
+
+        controller = CSVController(str(tmp_path), header_mode="union")
+
+        assert controller.get_master_headers() == ["ID", "NOME", "COGNOME", "EMAIL"]
+        assert controller.analyses == []  # solo righe di header lette
+
+        output_files = controller.process_and_save(str(tmp_path / "output"))
+        with open(output_files["b.csv"], encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f, delimiter=";"))
+        assert rows[1] == ["2", "", "", "anna@test.it"]
+
+    def test_header_registry_per_controller(self, temp_csv_folder):
+        """Test registro degli headers per controller, rinnovato a ogni analisi"""
+        controller = CSVController(str(temp_csv_folder))
+        other = CSVController(str(temp_csv_folder))
+
+        controller.analyze_all_files()
+        registry = controller.header_registry
+        assert len(registry) == len(
+            {analysis.headers for analysis in controller.analyses}
+        )
+        assert len(other.header_registry) == 0
+
+        controller.analyze_all_files()
+        assert controller.header_registry is not registry
+        assert len(controller.header_registry) == len(registry)
+
     def test_fix_record_length_same_length(self, temp_csv_folder):
         """Test correzione record con lunghezza corretta"""
         controller = CSVController(str(temp_csv_folder))
@@ -184,6 +239,71 @@ class TestCSVController:
         assert fixed_row[2] == ""  # Campo mancante
         assert fixed_row[3] == "val_D"
 
+    def test_fix_record_length_reordering_same_length(self, temp_csv_folder):
+        """Test riordinamento anche con il numero di campi atteso"""
+        controller = CSVController(str(temp_csv_folder))
+
+        fixed_row = controller.fix_record_length(
+            ["3", "1", "2"], ["A", "B", "C"], ["C", "A", "B"]
+        )
+
+        assert fixed_row == ["1", "2", "3"]
+
+    def test_fix_record_length_precomputed(self, temp_csv_folder):
+        """Test mappatura e confronto headers calcolati una volta per file"""
+        controller = CSVController(str(temp_csv_folder))
+        expected_headers = ["A", "B", "C"]
+        current_headers = ("A", "B", "C")
+        column_mapping = controller.get_column_mapping(expected_headers, current_headers)
+
+        row = ["1", "2", "3"]
+        assert (
+            controller.fix_record_length(
+                row, expected_headers, current_headers, column_mapping, True
+            )
+            is row
+        )
+        assert controller.fix_record_length(
+            ["1", "2"], expected_headers, current_headers, column_mapping, True
+        ) == ["1", "2", ""]
+
+    def test_process_and_save_reordered_headers(self, tmp_path):
+        """Test file con headers riordinati in modalità widest"""
+        for name, headers, row in (
+            ("a.csv", ["A", "B", "C"], ["1", "2", "3"]),
+            ("b.csv", ["C", "A", "B"], ["3", "1", "2"]),
+        ):
+            with open(tmp_path / name, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f, delimiter=";")
+                writer.writerow(headers)
+                writer.writerow(row)
+
+        controller = CSVController(str(tmp_path))
+        output_files = controller.process_and_save(str(tmp_path / "output"))
+
+        with open(output_files["b.csv"], encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f, delimiter=";"))
+        assert rows == [["A", "B", "C"], ["1", "2", "3"]]
+
+    def test_process_and_save_union_overflow_row(self, tmp_path):
+        """Test record con un campo in più in modalità union: campi mappati per nome"""
+        with open(tmp_path / "a.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["A", "B", "C", "D"])
+            writer.writerow(["1", "2", "3", "4"])
+        with open(tmp_path / "b.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["A", "B", "D"])
+            writer.writerow(["1", "2", "4", "9"])
+
+        controller = CSVController(str(tmp_path), header_mode="union")
+        output_files = controller.process_and_save(str(tmp_path / "output"))
+
+        with open(output_files["b.csv"], encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f, delimiter=";"))
+        assert rows[0] == ["A", "B", "C", "D"]
+        assert rows[1] == ["1", "2", "", "4"]
+
     def test_process_and_save(self, temp_csv_folder):
         """Test processamento e salvataggio file corretti"""
         controller = CSVController(str(temp_csv_folder))
@@ -209,6 +329,162 @@ class TestCSVController:
                 for row in reader:
                     assert len(row) == 5
 
+    def test_analyze_csv_file_fast(self, temp_csv_folder):
+        """Test analisi veloce (mmap): stesso risultato dell'analisi standard"""
+        controller = CSVController(str(temp_csv_folder))
+        fast_controller = CSVController(str(temp_csv_folder), fast_scan=True)
+
+        for file_path in controller.get_csv_files():
+            assert fast_controller.analyze_csv_file(
+                file_path
+            ) == controller.analyze_csv_file(file_path)
+
+    def test_analyze_csv_file_fast_quoted_fields(self, tmp_path):
+        """Test analisi veloce con campi quotati, delimitatori e a capo interni"""
+        file_path = tmp_path / "quoted.csv"
+        with open(file_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["A", "B;C", "D"])
+            writer.writerow(["1", "riga\ncon a capo", 'virgolette "interne"'])
+            writer.writerow(["2", "x;y"])  # Record più corto
+            writer.writerow(["3", "", "z"])
+
+        controller = CSVController(str(tmp_path), fast_scan=True)
+        # File con virgolette su quasi tutte le righe: analisi con csv.reader
+        assert controller.is_quote_heavy(
+            file_path, controller.get_input_dialect(file_path)
+        )
+        assert controller.analyze_csv_file(file_path) == CSVController(
+            str(tmp_path)
+        ).analyze_csv_file(file_path)
+
+        analysis = controller.analyze_csv_file_fast(file_path)
+
+        assert analysis.headers == ("A", "B;C", "D")
+        assert analysis.num_records == 3
+        assert analysis.inconsistent_records == [(3, 2)]
+
+    def test_scan_records_quoted(self):
+        """Test scansione a byte dei record con virgolette (csv.reader e ripiego)"""
+        buffer = b'A;B\n"x;\ny";"a""b"\n1;2"3\n"p"q;r\nu\rv;"w"\n'
+        records = list(scan_records(buffer))
+
+        assert [fields for _, _, fields in records] == [2, 2, 2, 2, 2]
+        # "u\rv" è rifiutato da csv.reader: contato campo per campo
+        assert buffer[records[4][0] : records[4][1]] == b'u\rv;"w"'
+        assert records[-1][1] == len(buffer) - 1
+
+    def test_analyze_csv_file_parallel(self, tmp_path):
+        """Test analisi parallela per intervalli di byte: righe riallineate"""
+        file_path = tmp_path / "big.csv"
+        with open(file_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["A", "B", "C"])
+            for i in range(300):
+                if i % 50 == 7:
+                    writer.writerow([str(i), "corto"])
+                else:
+                    writer.writerow([str(i), "testo\n;quotato", '"x"'])
+
+        controller = CSVController(str(tmp_path))
+        parallel_controller = CSVController(str(tmp_path), workers=4)
+
+        analysis = parallel_controller.analyze_csv_file(file_path)
+
+        assert analysis == controller.analyze_csv_file(file_path)
+        assert analysis.num_records == 300
+        assert [row for row, _ in analysis.inconsistent_records] == [
+            9, 59, 109, 159, 209, 259,
+        ]
+
+    def test_analyze_csv_file_parallel_stray_quote(self, tmp_path, caplog):
+        """Test virgoletta spaiata: taglio sbagliato rilevato, scansione sequenziale"""
+        file_path = tmp_path / "stray.csv"
+        with open(file_path, "w", encoding="utf-8", newline="") as f:
+            f.write("A;B;C\n1;ab\"c;x\n")  # virgoletta letterale: falsa la parità
+            for i in range(200):
+                f.write(f'{i};"testo\na capo";z\n')
+
+        parallel_controller = CSVController(str(tmp_path), workers=2)
+        analysis = parallel_controller.analyze_csv_file_parallel(file_path)
+
+        assert "non allineati" in caplog.text
+        assert analysis == CSVController(str(tmp_path)).analyze_csv_file(file_path)
+        assert analysis.num_records == 201
+
+    def test_process_and_save_batches_atomic(self, temp_csv_folder, tmp_path):
+        """Test scrittura a blocchi con rinomina atomica: stesso output"""
+        output_folder = tmp_path / "output_default"
+        atomic_folder = tmp_path / "output_atomic"
+
+        CSVController(str(temp_csv_folder)).process_and_save(str(output_folder))
+        CSVController(
+            str(temp_csv_folder), write_batch_size=1, atomic_write=True
+        ).process_and_save(str(atomic_folder))
+
+        for output_file in output_folder.glob("*.csv"):
+            assert (atomic_folder / output_file.name).read_bytes() == output_file.read_bytes()
+        assert not list(atomic_folder.glob("*.tmp"))
+
+    def test_process_and_save_skip_unchanged(self, temp_csv_folder, tmp_path):
+        """Test manifest: i file invariati non vengono riscritti"""
+        output_folder = tmp_path / "output_skip"
+        controller = CSVController(str(temp_csv_folder), skip_unchanged=True)
+        controller.process_and_save(str(output_folder))
+
+        assert (output_folder / CSVController.MANIFEST_FILENAME).exists()
+
+        # Marca i file di output per capire quali vengono riscritti
+        for output_file in output_folder.glob("*.csv"):
+            output_file.write_text("non riscritto", encoding="utf-8")
+
+        # file1: stesso contenuto ma mtime diverso; file3: contenuto modificato
+        file1 = temp_csv_folder / "file1.csv"
+        file1.write_bytes(file1.read_bytes())
+        with open(temp_csv_folder / "file3.csv", "a", encoding="utf-8", newline="") as f:
+            f.write("d1;d2;d3;d4\r\n")
+
+        controller = CSVController(str(temp_csv_folder), skip_unchanged=True)
+        analyzed = []
+        analyze_csv_file = controller.analyze_csv_file
+        controller.analyze_csv_file = lambda path: analyzed.append(path.name) or (
+            analyze_csv_file(path)
+        )
+        controller.process_and_save(str(output_folder))
+
+        assert (output_folder / "file1.csv").read_text(encoding="utf-8") == "non riscritto"
+        assert (output_folder / "file2.csv").read_text(encoding="utf-8") == "non riscritto"
+        assert (output_folder / "file3.csv").read_text(encoding="utf-8") != "non riscritto"
+        # Solo il file modificato viene scansionato
+        assert analyzed == ["file3.csv"]
+        assert [a.filename for a in controller.analyses] == ["file3.csv"]
+
+        # Un nuovo file più largo cambia gli headers master: tutto riscritto
+        with open(temp_csv_folder / "file4.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["CAMPO_A", "CAMPO_B", "CAMPO_C", "CAMPO_D", "CAMPO_E", "CAMPO_F"])
+
+        controller = CSVController(str(temp_csv_folder), skip_unchanged=True)
+        controller.process_and_save(str(output_folder))
+
+        assert (output_folder / "file1.csv").read_text(encoding="utf-8") != "non riscritto"
+
+    def test_layout_hash_includes_merge_column(self, temp_csv_folder):
+        """Test la colonna di unione cambia l'output e quindi l'hash del formato"""
+        headers = ["A", "B", "C"]
+        hashes = {
+            CSVController(
+                str(temp_csv_folder), repair_strategy="merge", merge_column=column
+            ).get_layout_hash(headers)
+            for column in (None, "B", "C")
+        }
+        assert len(hashes) == 3
+
+        auto = CSVController(str(temp_csv_folder), auto_dialect=True)
+        assert auto.get_layout_hash(headers) != CSVController(
+            str(temp_csv_folder)
+        ).get_layout_hash(headers)
+
     def test_generate_report(self, temp_csv_folder):
         """Test generazione report"""
         controller = CSVController(str(temp_csv_folder))
@@ -222,6 +498,56 @@ class TestCSVController:
         assert "RIEPILOGO" in report
 
 
+class TestCompressedFiles:
+    """Test per file di input e output compressi"""
+
+    @pytest.fixture
+    def compressed_folder(self, tmp_path):
+        """Crea una cartella con un CSV normale e uno compresso gzip"""
+        folder = tmp_path / "data"
+        folder.mkdir()
+        with open(folder / "a.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["ID", "NOME", "CITTA"])
+            writer.writerow(["1", "Mario", "Roma"])
+        with gzip.open(folder / "b.csv.gz", "wt", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(["ID", "NOME"])
+            writer.writerow(["2", "Anna"])
+            writer.writerow(["3"])
+        return folder
+
+    def test_compressed_input(self, compressed_folder, tmp_path):
+        """Test lettura in streaming dei file .csv.gz"""
+        controller = CSVController(str(compressed_folder))
+
+        analyses = controller.analyze_all_files()
+        output_files = controller.process_and_save(str(tmp_path / "output"))
+
+        assert [a.filename for a in analyses] == ["a.csv", "b.csv.gz"]
+        assert analyses[1].inconsistent_records == [(3, 1)]
+        assert output_files["b.csv.gz"].endswith("b.csv")
+        with open(output_files["b.csv.gz"], encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f, delimiter=";"))
+        assert rows == [["ID", "NOME", "CITTA"], ["2", "Anna", ""], ["3", "", ""]]
+
+    def test_zstd_output(self, compressed_folder, tmp_path):
+        """Test output compresso zstd"""
+        zstandard = pytest.importorskip("zstandard")
+        controller = CSVController(str(compressed_folder), output_compression="zstd")
+
+        output_files = controller.process_and_save(str(tmp_path / "output"))
+
+        assert output_files["a.csv"].endswith("a.csv.zst")
+        assert output_files["b.csv.gz"].endswith("b.csv.zst")
+
+        # I file di output compressi vengono riletti dal controller
+        output_controller = CSVController(str(tmp_path / "output"))
+        analyses = output_controller.analyze_all_files()
+        assert [a.num_fields for a in analyses] == [3, 3]
+        assert all(not a.inconsistent_records for a in analyses)
+
+
 class TestIntegration:
     """Test di integrazione end-to-end"""
 
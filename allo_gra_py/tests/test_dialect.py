@@ -0,0 +1,125 @@
+"""
+Test unitari per il modulo dialect
+"""
+
+import csv
+import os
+from src.csv_control import CSVController
+from src.dialect import detect_dialect, sniff_sample
+
+
+class TestSniffSample:
+    """Test per il rilevamento del formato da un campione"""
+
+    def test_comma(self):
+        """Test file separato da virgole con campi quotati"""
+        dialect = sniff_sample(b'ID,NOME,NOTE\n1,Mario,"a; b"\n2,Anna,c\n', False)
+
+        assert dialect.delimiter == ","
+        assert dialect.quotechar == '"'
+        assert dialect.has_header is True
+        # Campione solo ASCII: nessuna evidenza sulla codifica
+        assert dialect.encoding is None
+
+    def test_semicolon_with_decimal_comma(self):
+        """Test ';' con virgola decimale nei valori"""
+        dialect = sniff_sample(b"ID;PREZZO\n1;1,50\n2;20\n3;3,75\n", False)
+
+        assert dialect.delimiter == ";"
+
+    def test_no_header_and_windows1252(self):
+        """Test file senza header in windows-1252 (campione breve per chardet)"""
+        dialect = sniff_sample("1;città;2\n2;però;3\n".encode("windows-1252"), False)
+
+        assert dialect.has_header is False
+        assert dialect.encoding == "windows-1252"
+
+    def test_single_quote(self):
+        """Test quoting con apici"""
+        dialect = sniff_sample(b"A|B\n'x|y'|1\n'z'|2\n", False)
+
+        assert dialect.delimiter == "|"
+        assert dialect.quotechar == "'"
+
+    def test_truncated_multibyte(self):
+        """Test campione che taglia un carattere UTF-8"""
+        sample = "A;B\ncittà;1\n".encode("utf-8")
+        assert sniff_sample(sample[:-4], True).encoding == "utf-8"
+
+
+class TestDetectDialect:
+    """Test per detect_dialect e l'uso in CSVController"""
+
+    def test_cached_per_file(self, tmp_path):
+        """Il formato è riletto solo se il file cambia"""
+        path = tmp_path / "dati.csv"
+        path.write_text("A;B\n1;2\n", encoding="utf-8")
+        first = detect_dialect(path)
+        assert detect_dialect(path) is first
+
+        path.write_text("A,B,C\n1,2,3\n", encoding="utf-8")
+        os.utime(path, ns=(0, 0))
+        assert detect_dialect(path).delimiter == ","
+
+    def test_controller_auto_dialect(self, tmp_path):
+        """Un file con ',' tra file con ';' viene letto e riscritto con ';'"""
+        data = tmp_path / "data"
+        data.mkdir()
+        (data / "a.csv").write_text("ID;NOME\n1;Mario\n", encoding="utf-8")
+        (data / "b.csv").write_text("ID,NOME,CITTA\n2,Anna,Roma\n", encoding="utf-8")
+
+        controller = CSVController(str(data), auto_dialect=True)
+        analyses = controller.analyze_all_files()
+        assert [a.num_fields for a in analyses] == [2, 3]
+
+        controller.process_and_save(str(tmp_path / "output"))
+        with open(tmp_path / "output" / "b.csv", newline="", encoding="utf-8") as f:
+            assert list(csv.reader(f, delimiter=";")) == [
+                ["ID", "NOME", "CITTA"],
+                ["2", "Anna", "Roma"],
+            ]
+
+    def test_controller_uses_detected_encoding_and_quotechar(self, tmp_path):
+        """Encoding e apici rilevati valgono per analisi, scansione a byte e riscrittura"""
+        data = tmp_path / "data"
+        data.mkdir()
+        (data / "a.csv").write_bytes(
+            "ID,NOME,NOTE\n1,'Città, centro',ok\n2,Anna,a,b\n".encode("windows-1252")
+        )
+
+        for fast_scan in (False, True):
+            controller = CSVController(
+                str(data), auto_dialect=True, fast_scan=fast_scan
+            )
+            analysis = controller.analyze_csv_file(data / "a.csv")
+            assert list(analysis.headers) == ["ID", "NOME", "NOTE"]
+            assert analysis.inconsistent_records == [(3, 4)]
+
+        controller = CSVController(
+            str(data), auto_dialect=True, repair_strategy="merge"
+        )
+        controller.process_and_save(str(tmp_path / "output"))
+        with open(tmp_path / "output" / "a.csv", newline="", encoding="utf-8") as f:
+            assert list(csv.reader(f, delimiter=";")) == [
+                ["ID", "NOME", "NOTE"],
+                ["1", "Città, centro", "ok"],
+                # i campi in eccesso sono ricomposti con il delimitatore di input
+                ["2", "Anna", "a,b"],
+            ]
+
+    def test_controller_keeps_configured_encoding_for_ascii_sample(self, tmp_path):
+        """Un campione solo ASCII non sostituisce la codifica configurata"""
+        data = tmp_path / "data"
+        data.mkdir()
+        rows = ["ID;NOME"] + [f"{i};Mario" for i in range(2000)] + ["2000;Niccolò"]
+        (data / "a.csv").write_bytes("\n".join(rows).encode("windows-1252") + b"\n")
+
+        controller = CSVController(
+            str(data), encoding="windows-1252", auto_dialect=True
+        )
+        assert controller.get_input_dialect(data / "a.csv").encoding == "windows-1252"
+        assert controller.analyze_all_files()[0].num_records == 2001
+
+        controller.process_and_save(str(tmp_path / "output"))
+        text = (tmp_path / "output" / "a.csv").read_text(encoding="windows-1252")
+        assert text.splitlines()[-1] == "2000;Niccolò"
@@ -0,0 +1,57 @@
+"""
+Test unitari per il modulo rejects
+"""
+
+import csv
+import io
+import pytest
+from src.csv_control import CSVController
+from src.rejects import RejectSink, read_raw_records
+
+CONTENT = 'ID;NOTE\n1;ok\n2;a;b\n3;"multi\nriga";x\n4\n'
+
+
+class TestRejectSink:
+    """Test per la classe RejectSink"""
+
+    def test_no_file_without_rejects(self, tmp_path):
+        """Il file degli scarti è creato solo al primo record scartato"""
+        with RejectSink(tmp_path / "scarti.csv") as sink:
+            pass
+        assert sink.count == 0
+        assert not (tmp_path / "scarti.csv").exists()
+
+    def test_read_raw_records(self):
+        """Test testo originale dei record su più righe"""
+        records = list(read_raw_records(io.StringIO(CONTENT, newline="")))
+
+        assert records[3] == (["3", "multi\nriga", "x"], '3;"multi\nriga";x\n')
+        assert records[4] == (["4"], "4\n")
+
+
+class TestControllerRejects:
+    """Test dei record non coerenti scritti durante l'analisi"""
+
+    @pytest.fixture
+    def csv_folder(self, tmp_path):
+        folder = tmp_path / "data"
+        folder.mkdir()
+        with open(folder / "dati.csv", "w", encoding="utf-8", newline="") as f:
+            f.write(CONTENT)
+        return folder
+
+    @pytest.mark.parametrize("options", [{}, {"fast_scan": True}, {"workers": 2}])
+    def test_analysis_rejects(self, csv_folder, tmp_path, options):
+        """Stesso file degli scarti con analisi csv, mmap e parallela"""
+        controller = CSVController(
+            str(csv_folder), reject_folder=str(tmp_path / "scarti"), **options
+        )
+        analysis = controller.analyze_all_files()[0]
+
+        with open(tmp_path / "scarti" / "dati.inconsistent.csv", newline="") as f:
+            rejects = list(csv.reader(f, delimiter=";"))
+
+        assert [row[0] for row in rejects[1:]] == ["3", "4", "5"]
+        assert rejects[1] == ["3", "3 campi invece di 2", "2;a;b"]
+        assert rejects[2][2] == '3;"multi\nriga";x'
+        assert [row_num for row_num, _ in analysis.inconsistent_records] == [3, 4, 5]
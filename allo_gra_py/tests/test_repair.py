@@ -0,0 +1,95 @@
+"""
+Test unitari per il modulo repair
+"""
+
+import csv
+import pytest
+from src.csv_control import CSVController
+from src.repair import (
+    MergeOverflowStrategy,
+    QuarantineStrategy,
+    TruncateStrategy,
+    make_repair_strategy,
+)
+
+HEADERS = ["ID", "NOTE", "CITTA"]
+ROWS = [["1", "ok", "Roma"], ["2", "a", "b", "c", "Bari"], ["3", "x"]]
+
+
+class TestRepairStrategies:
+    """Test per le strategie di riparazione"""
+
+    def test_merge(self):
+        """Test unione dei campi in eccesso nella colonna di testo"""
+        rows, rejected, repaired = MergeOverflowStrategy("NOTE").repair_batch(
+            ROWS, HEADERS
+        )
+
+        assert rows[1] == ["2", "a;b;c", "Bari"]
+        assert rows[0] == ROWS[0] and rows[2] == ROWS[2]
+        assert rejected == []
+        assert repaired == 1
+
+    def test_truncate(self):
+        """Test taglio dei campi in eccesso"""
+        rows, _, repaired = TruncateStrategy().repair_batch(ROWS, HEADERS)
+
+        assert rows[1] == ["2", "a", "b"]
+        assert repaired == 1
+
+    def test_quarantine(self):
+        """Test scarto dei record con troppi campi"""
+        rows, rejected, repaired = QuarantineStrategy().repair_batch(ROWS, HEADERS)
+
+        assert rows == [ROWS[0], ROWS[2]]
+        assert rejected == [(1, ROWS[1])]
+        assert repaired == 1
+
+    def test_invalid_strategy(self):
+        """Test nome di strategia non valido"""
+        with pytest.raises(ValueError):
+            make_repair_strategy("guess")
+
+
+class TestControllerRepair:
+    """Test della riparazione durante la riscrittura dei file"""
+
+    @pytest.fixture
+    def csv_folder(self, tmp_path):
+        """Cartella con un file con un record troppo lungo e uno troppo corto"""
+        folder = tmp_path / "data"
+        folder.mkdir()
+        with open(folder / "dati.csv", "w", encoding="utf-8", newline="") as f:
+            csv.writer(f, delimiter=";").writerows([HEADERS] + ROWS)
+        return folder
+
+    def read_output(self, path):
+        with open(path, encoding="utf-8", newline="") as f:
+            return list(csv.reader(f, delimiter=";"))
+
+    def test_merge_in_rewrite(self, csv_folder, tmp_path):
+        """Test strategia merge in process_and_save con i conteggi"""
+        controller = CSVController(
+            str(csv_folder), repair_strategy="merge", merge_column="NOTE"
+        )
+        controller.process_and_save(str(tmp_path / "output"))
+
+        output = self.read_output(tmp_path / "output" / "dati.csv")
+        assert output[2] == ["2", "a;b;c", "Bari"]
+        assert output[3] == ["3", "x", ""]
+        assert controller.repair_counts["dati.csv"] == {"merge": 1, "pad": 1}
+
+    def test_quarantine_in_rewrite(self, csv_folder, tmp_path):
+        """Test strategia quarantine: record nel file degli scarti"""
+        controller = CSVController(
+            str(csv_folder), repair_strategy="quarantine", write_batch_size=1
+        )
+        controller.process_and_save(str(tmp_path / "output"))
+
+        output = self.read_output(tmp_path / "output" / "dati.csv")
+        assert [row[0] for row in output[1:]] == ["1", "3"]
+
+        rejected = self.read_output(tmp_path / "output" / "dati.rejected.csv")
+        assert rejected[0] == ["LINE", "REASON", "RAW"]
+        assert rejected[1][0] == "3"
+        assert rejected[1][2] == "2;a;b;c;Bari"
@@ -0,0 +1,68 @@
+"""
+Test unitari per il modulo report
+"""
+
+import json
+from src.csv_control import CSVAnalysis
+from src.report import CSVReport
+
+
+class TestCSVReport:
+    """Test per la classe CSVReport"""
+
+    def build_report(self):
+        """Report di due file, uno con 7 record inconsistenti"""
+        analyses = [
+            CSVAnalysis(
+                filename="a.csv",
+                num_fields=3,
+                headers=["A", "B", "C"],
+                num_records=10,
+                inconsistent_records=[(row, 2) for row in range(2, 9)],
+            ),
+            CSVAnalysis(
+                filename="b<1>.csv",
+                num_fields=3,
+                headers=["A", "B", "C"],
+                num_records=4,
+                inconsistent_records=[],
+            ),
+        ]
+        return CSVReport.from_analyses("data", analyses, ["A", "B", "C"])
+
+    def test_from_analyses(self):
+        """Test calcolo del report"""
+        report = self.build_report()
+
+        assert report.files_needing_fix == 1
+        assert report.total_records == 14
+        assert report.total_inconsistent == 7
+        assert report.files[0].num_inconsistent == 7
+        assert len(report.files[0].inconsistent_sample) == 5
+        assert report.files[1].needs_fix is False
+
+    def test_to_json(self):
+        """Test serializzazione JSON"""
+        data = json.loads(self.build_report().to_json())
+
+        assert data["folder"] == "data"
+        assert data["files"][0]["filename"] == "a.csv"
+        assert data["files"][0]["inconsistent_sample"][0] == [2, 2]
+        assert data["master_headers"] == ["A", "B", "C"]
+
+    def test_to_text(self):
+        """Test report testuale"""
+        text = self.build_report().to_text()
+
+        assert "REPORT ANALISI FILE CSV" in text
+        assert "    - Riga 2: 2 campi" in text
+        assert "    ... e altri 2" in text
+        assert "File che necessitano correzione: 1" in text
+
+    def test_to_html(self):
+        """Test report HTML con escape dei nomi"""
+        page = self.build_report().to_html()
+
+        assert page.startswith("<!DOCTYPE html>")
+        assert "b&lt;1&gt;.csv" in page
+        assert 'class="needs-fix"' in page
@@ -0,0 +1,134 @@
+"""
+Test unitari per il modulo watcher
+"""
+
+import csv
+import threading
+import time
+from src.csv_control import CSVController
+from src.watcher import CSVWatcher
+
+
+def write_csv(path, rows):
+    """Scrive un file CSV con delimitatore ';'"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, delimiter=";").writerows(rows)
+
+
+def read_csv(path):
+    """Legge un file CSV con delimitatore ';'"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f, delimiter=";"))
+
+
+class TestCSVWatcher:
+    """Test per la classe CSVWatcher"""
+
+    def make_watcher(self, tmp_path):
+        """Watcher senza attesa di stabilità sulla cartella data"""
+        data = tmp_path / "data"
+        data.mkdir()
+        watcher = CSVWatcher(
+            CSVController(str(data)), str(tmp_path / "output"), settle_time=0
+        )
+        return data, watcher
+
+    def test_file_processed_when_stable(self, tmp_path):
+        """Un file è processato solo al secondo controllo con stat invariato"""
+        data, watcher = self.make_watcher(tmp_path)
+        write_csv(data / "a.csv", [["A", "B"], ["1", "2"], ["3"]])
+
+        assert watcher.poll_once() == []
+        assert watcher.poll_once() == [data / "a.csv"]
+        watcher.wait()
+
+        output = read_csv(tmp_path / "output" / "a.csv")
+        assert output == [["A", "B"], ["1", "2"], ["3", ""]]
+        assert watcher.poll_once() == []
+        watcher.close()
+
+    def test_rewrite_on_master_headers_change(self, tmp_path):
+        """Un file più largo aggiorna gli headers dei file già scritti"""
+        data, watcher = self.make_watcher(tmp_path)
+        write_csv(data / "a.csv", [["A", "B"], ["1", "2"]])
+        watcher.poll_once()
+        watcher.poll_once()
+        watcher.wait()
+
+        write_csv(data / "b.csv", [["A", "B", "C"], ["4", "5", "6"]])
+        watcher.poll_once()
+        watcher.poll_once()
+        watcher.wait()
+        watcher.close()
+
+        assert read_csv(tmp_path / "output" / "a.csv") == [
+            ["A", "B", "C"],
+            ["1", "2", ""],
+        ]
+        assert watcher.master_headers == ["A", "B", "C"]
+        assert watcher.errors == {}
+
+    def test_header_registry_bounded(self, tmp_path):
+        """Il registro degli headers non conserva gli headers superati"""
+        data, watcher = self.make_watcher(tmp_path)
+        for width in range(1, 6):
+            headers = [f"H{i}" for i in range(width)]
+            write_csv(data / "a.csv", [headers, ["x"] * width])
+            watcher.poll_once()
+            watcher.poll_once()
+            watcher.wait()
+        watcher.close()
+
+        assert watcher.master_headers == ["H0", "H1", "H2", "H3", "H4"]
+        assert len(watcher.controller.header_registry) <= len(watcher.file_headers)
+
+    def test_concurrent_writes_serialized_per_file(self, tmp_path):
+        """Una riscrittura che arriva durante una scrittura lenta non viene persa"""
+
+        class SlowController(CSVController):
+            """Controller con la prima scrittura di a.csv rallentata"""
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.calls = 0
+                self.active = 0
+                self.max_active = 0
+                self.counter_lock = threading.Lock()
+
+            def write_corrected_file(self, filepath, output_filepath, master_headers):
+                with self.counter_lock:
+                    self.calls += 1
+                    first = self.calls == 1
+                    if filepath.name == "a.csv":
+                        self.active += 1
+                        self.max_active = max(self.max_active, self.active)
+                try:
+                    if first:
+                        time.sleep(0.3)
+                    super().write_corrected_file(filepath, output_filepath, master_headers)
+                finally:
+                    if filepath.name == "a.csv":
+                        with self.counter_lock:
+                            self.active -= 1
+
+        data = tmp_path / "data"
+        data.mkdir()
+        write_csv(data / "a.csv", [["A", "B"], ["1", "2"]])
+        write_csv(data / "b.csv", [["A", "B", "C"], ["4", "5", "6"]])
+        controller = SlowController(str(data), atomic_write=True)
+        watcher = CSVWatcher(controller, str(tmp_path / "output"), max_workers=4)
+
+        watcher.submit(data / "a.csv")
+        time.sleep(0.1)
+        watcher.submit(data / "b.csv")
+        watcher.wait()
+        watcher.close()
+
+        assert watcher.master_headers == ["A", "B", "C"]
+        assert read_csv(tmp_path / "output" / "a.csv") == [
+            ["A", "B", "C"],
+            ["1", "2", ""],
+        ]
+        assert controller.max_active == 1
+        assert watcher.errors == {}
+        assert not list((tmp_path / "output").glob("*.tmp"))
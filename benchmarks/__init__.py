@@ -0,0 +1 @@
+"""Benchmark per le funzioni della cartella library"""
@@ -0,0 +1,224 @@
+"""
+Benchmark of the library hot paths on synthetic data
+
+Usage:
+    python -m benchmarks.library_benchmarks --rows 20000 --rooms 500
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from library import pandas_days_for_month
+from library import pandas_join_tables
+
+DATE_IN = "ASSE. DATA_ING"
+DATE_OUT = "ASSE. DATA_UN"
+
+
+def make_assignments(
+    rows: int,
+    rooms: int = 500,
+    mean_days: float = 120.0,
+    distribution: str = "exponential",
+    start: str = "2023-09-01",
+    span_days: int = 365,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Generate a DataFrame that mimics an assignment export
+
+    :rows:          number of assignments
+    :rooms:         number of distinct rooms
+    :mean_days:     mean length of the intervals in days
+    :distribution:  interval length distribution ('exponential', 'uniform', 'fixed')
+    :start:         first possible check-in date
+    :span_days:     check-in dates are spread over this number of days
+    :seed:          random seed
+
+    :return:        DataFrame with ID, room and date columns (strings, like read_csv)
+    """
+    rng = np.random.default_rng(seed)
+
+    if distribution == "exponential":
+        lengths = rng.exponential(mean_days, rows)
+    elif distribution == "uniform":
+        lengths = rng.uniform(1, 2 * mean_days, rows)
+    elif distribution == "fixed":
+        lengths = np.full(rows, mean_days)
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+
+    date_start = pd.Timestamp(start) + pd.to_timedelta(
+        rng.integers(0, span_days, rows), unit="D"
+    )
+    date_end = date_start + pd.to_timedelta(np.maximum(lengths, 1).astype(int), unit="D")
+
+    return pd.DataFrame(
+        {
+            "ASSE. ID": np.arange(1, rows + 1),
+            "ROOM": rng.integers(0, rooms, rows).astype(str),
+            DATE_IN: date_start.strftime("%Y-%m-%d"),
+            DATE_OUT: date_end.strftime("%Y-%m-%d"),
+        }
+    )
+
+
+def make_passy_domus(
+    events: int,
+    rooms: int = 500,
+    intervals_per_room: int = 4,
+    interval_days: int = 60,
+    start: str = "2023-01-01",
+    seed: int = 0,
+):
+    """
+    Generate passy (events) and domus (occupancy intervals) dicts for join_tables
+
+    :events:                number of passy events
+    :rooms:                 number of distinct rooms
+    :intervals_per_room:    domus intervals for each room (not overlapping)
+    :interval_days:         length of each domus interval
+    :start:                 first interval start date
+    :seed:                  random seed
+
+    :return:                (passy_data, domus_data)
+    """
+    rng = np.random.default_rng(seed)
+    room_keys = np.array([f"R{room}" for room in range(rooms)])
+
+    starts = pd.Timestamp(start) + pd.to_timedelta(
+        np.tile(np.arange(intervals_per_room) * (interval_days + 1), rooms), unit="D"
+    )
+    domus_data = {
+        "room_key": np.repeat(room_keys, intervals_per_room).tolist(),
+        "start_date": starts.strftime("%Y-%m-%d").tolist(),
+        "end_date": (starts + pd.Timedelta(days=interval_days - 1))
+        .strftime("%Y-%m-%d")
+        .tolist(),
+    }
+
+    span = intervals_per_room * (interval_days + 1)
+    event_dates = pd.Timestamp(start) + pd.to_timedelta(
+        rng.integers(0, span, events), unit="D"
+    )
+    passy_data = {
+        "room_key": room_keys[rng.integers(0, rooms, events)].tolist(),
+        "event_date": event_dates.strftime("%Y-%m-%d").tolist(),
+    }
+
+    return passy_data, domus_data
+
+
+def measure(func, *args, **kwargs) -> dict:
+    """
+    Run func twice: once for the wall time, once under tracemalloc for the
+    peak memory allocated by Python (tracemalloc slows down the run)
+
+    Arguments are copied before each run when they are DataFrames,
+    because the library functions modify them in place.
+
+    :return: dict with seconds and peak_mb
+    """
+
+    def call():
+        copied = [arg.copy() if isinstance(arg, pd.DataFrame) else arg for arg in args]
+        # join_tables prints its intermediate frames
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(*copied, **kwargs)
+
+    start = time.perf_counter()
+    call()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": seconds, "peak_mb": peak / 1024 / 1024}
+
+
+def run_benchmarks(
+    rows: int = 10000,
+    rooms: int = 500,
+    mean_days: float = 120.0,
+    distribution: str = "exponential",
+    events: int = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Run every benchmark and return {function name: measure() result}
+    """
+    results = {}
+    df = make_assignments(rows, rooms, mean_days, distribution, seed=seed)
+
+    results["add_days_for_month"] = measure(
+        pandas_days_for_month.add_days_for_month, df, DATE_IN, DATE_OUT
+    )
+
+    df_days = pandas_days_for_month.add_days_for_month(df.copy(), DATE_IN, DATE_OUT)
+    df_dates = df_days[["date_start", "date_end"]]
+    results["days_of_month"] = measure(
+        lambda: [pandas_days_for_month.days_of_month(x) for x in df_dates.values]
+    )
+
+    first_month_column = df_days.columns.get_loc("date_end") + 1
+    results["price_for_month"] = measure(
+        pandas_days_for_month.price_for_month, df_days, first_month_column
+    )
+    results["replace_char_in_dataframe_columns"] = measure(
+        pandas_days_for_month.replace_char_in_dataframe_columns,
+        df_days,
+        first_month_column,
+        ".",
+        ",",
+    )
+
+    passy_data, domus_data = make_passy_domus(
+        events if events is not None else rows, rooms, seed=seed
+    )
+    results["join_tables"] = measure(
+        pandas_join_tables.join_tables, passy_data, domus_data
+    )
+    room_index = pandas_join_tables.RoomIntervalIndex(domus_data)
+    results["RoomIntervalIndex.join"] = measure(room_index.join, passy_data)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the library hot paths")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--mean-days", type=float, default=120.0)
+    parser.add_argument(
+        "--distribution",
+        choices=["exponential", "uniform", "fixed"],
+        default="exponential",
+    )
+    parser.add_argument("--events", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        args.rows,
+        args.rooms,
+        args.mean_days,
+        args.distribution,
+        args.events,
+        args.seed,
+    )
+
+    print(f"{'function':<36}{'seconds':>12}{'peak MB':>12}")
+    for name, result in results.items():
+        print(f"{name:<36}{result['seconds']:>12.4f}{result['peak_mb']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 from src import csv_validator
 from pathlib import Path
 
+csv_validator.configure_logging(filename="csv_validator.log")
+
 directory = Path("data/gra_alloggi")
 file_list = [f.name for f in directory.iterdir() if f.is_file()]
 print("File presenti nella cartella:", file_list)
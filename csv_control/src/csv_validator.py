@@ -1,58 +1,463 @@
 import csv
+import io
+import itertools
 import logging
+import mmap
+import os
 import chardet
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
-# Configure logging
-logging.basicConfig(
-    filename="csv_validator.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+try:
+    from .dialect import UNICODE_ENCODINGS, detect_dialect
+    from .rejects import RawRecordReader, RejectSink, format_raw_record
+except ImportError:  # run as a script: python src/csv_validator.py
+    from dialect import UNICODE_ENCODINGS, detect_dialect
+    from rejects import RawRecordReader, RejectSink, format_raw_record
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Attribute marking the handlers installed by configure_logging
+HANDLER_MARKER = "_csv_validator_handler"
+
+# Line numbers listed in the per-file summary of the aggregated log mode
+SUMMARY_SAMPLE_LINES = 10
+
+# Columns of the reject file (see rejects.RejectSink)
+REJECT_FILE_HEADERS = ["line_number", "reason", "raw"]
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    filename: Optional[str] = None,
+    fmt: str = "%(asctime)s - %(levelname)s - %(message)s",
+) -> logging.Handler:
+    """
+    Attaches a handler to the module logger: a file handler with filename,
+    a stream handler (stderr) otherwise. Returns the handler, so the caller
+    can remove it. Repeated calls replace the handler installed by the
+    previous call instead of adding another one. Applications can also
+    configure the logger (or the root logger) themselves; the module never
+    configures logging on import.
+    """
+    for previous in list(logger.handlers):
+        if getattr(previous, HANDLER_MARKER, False):
+            logger.removeHandler(previous)
+            previous.close()
+
+    if filename is not None:
+        handler = logging.FileHandler(filename, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(fmt))
+    setattr(handler, HANDLER_MARKER, True)
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return handler
+
+
+def log_inconsistency_summary(
+    file_path: str, expected_field_count: int, count: int, sample_lines: List[int]
+) -> None:
+    """
+    Logs one record for all the inconsistent rows of a file (aggregated log mode).
+    """
+    logger.error(
+        "%d rows with inconsistent field count in %s (expected %d fields), "
+        "first at lines %s.",
+        count,
+        file_path,
+        expected_field_count,
+        ", ".join(map(str, sample_lines)),
+    )
 
 
 def detect_encoding(file_path: str) -> str:
     """
     Detects the encoding of a file using chardet.
     """
-    logging.info(f"Detecting encoding for {file_path}...")
+    logger.info("Detecting encoding for %s...", file_path)
     try:
         with open(file_path, "rb") as f:
             result = chardet.detect(f.read())
             encoding = result["encoding"]
-            logging.info(f"Detected encoding: {encoding}")
+            logger.info("Detected encoding: %s", encoding)
             return encoding if encoding is not None else "utf-8"
     except FileNotFoundError:
-        logging.warning(
-            f"File not found when detecting encoding: {file_path}. Defaulting to utf-8."
+        logger.warning(
+            "File not found when detecting encoding: %s. Defaulting to utf-8.", file_path
         )
         return "utf-8"
 
 
-def check_field_count_consistency(reader: csv.reader, file_path: str) -> bool:
+def check_field_count_consistency(
+    reader: csv.reader,
+    file_path: str,
+    reject_sink: Optional[RejectSink] = None,
+    aggregate_logs: bool = False,
+) -> bool:
     """
     Checks if all rows in the CSV file have the same number of fields.
+    The whole file is scanned: every inconsistent row is logged (or, with
+    aggregate_logs, summarised in one record per file) and, with a
+    reject_sink, written to the reject file with its raw text.
     """
-    logging.info(f"Checking field count consistency for {file_path}...")
+    logger.info("Checking field count consistency for %s...", file_path)
     try:
         first_row_field_count = len(next(reader))
+        inconsistent_count = 0
+        sample_lines = []
         line_number = 2
         for row in reader:
             if len(row) != first_row_field_count:
-                logging.error(
-                    f"Inconsistent field count in {file_path} at line {line_number}. "
-                    f"Expected {first_row_field_count}, found {len(row)}."
-                )
-                return False
+                inconsistent_count += 1
+                if aggregate_logs:
+                    if len(sample_lines) < SUMMARY_SAMPLE_LINES:
+                        sample_lines.append(line_number)
+                else:
+                    logger.error(
+                        "Inconsistent field count in %s at line %d. "
+                        "Expected %d, found %d.",
+                        file_path,
+                        line_number,
+                        first_row_field_count,
+                        len(row),
+                    )
+                if reject_sink is not None:
+                    raw = getattr(reader, "raw", None)
+                    if raw is None:
+                        raw = format_raw_record(
+                            row, reader.dialect.delimiter, reader.dialect.quotechar
+                        )
+                    reject_sink.write(
+                        line_number,
+                        f"expected {first_row_field_count} fields, found {len(row)}",
+                        raw,
+                    )
             line_number += 1
-        logging.info(f"Field count is consistent in {file_path}.")
-        return True
+        if inconsistent_count == 0:
+            logger.info("Field count is consistent in %s.", file_path)
+        elif aggregate_logs:
+            log_inconsistency_summary(
+                file_path, first_row_field_count, inconsistent_count, sample_lines
+            )
+        return inconsistent_count == 0
     except StopIteration:
         # File is empty
-        logging.info(f"{file_path} is empty.")
+        logger.info("%s is empty.", file_path)
         return True
     except Exception as e:
-        logging.error(f"An error occurred during field count consistency check: {e}")
+        logger.error("An error occurred during field count consistency check: %s", e)
+        return False
+
+
+def count_quotes(file_path: str, start: int, stop: int, quotechar: bytes = b'"') -> int:
+    """
+    Counts the quote characters in the byte range [start, stop) of a file.
+    """
+    with open(file_path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        count = 0
+        for chunk_start in range(start, stop, 64 * 1024 * 1024):
+            chunk_stop = min(chunk_start + 64 * 1024 * 1024, stop)
+            count += mm[chunk_start:chunk_stop].count(quotechar)
+        return count
+
+
+def next_record_start(
+    mm, pos: int, stop: int, inside_quotes: bool, quotechar: bytes = b'"'
+) -> int:
+    """
+    Returns the offset after the first newline that is outside quoted fields,
+    starting at pos with the given quote state (stop if there is none).
+    """
+    parity = int(inside_quotes)
+    while pos < stop:
+        line_end = mm.find(b"\n", pos, stop)
+        if line_end == -1:
+            return stop
+        parity ^= mm[pos:line_end].count(quotechar) & 1
+        if parity == 0:
+            return line_end + 1
+        pos = line_end + 1
+    return stop
+
+
+def split_record_ranges(
+    file_path: str, start: int, parts: int, executor, quotechar: bytes = b'"'
+) -> List[Tuple[int, int]]:
+    """
+    Splits the bytes of a CSV file from start (a record start) into about
+    `parts` ranges aligned to record boundaries.
+    Quote counts of the nominal ranges are computed in parallel; their parity
+    tells whether a cut falls inside a quoted field, and the cut is moved to
+    the next newline outside quotes. Quotes in the middle of unquoted fields
+    break the parity: use the sequential check for such files.
+    """
+    stop = os.path.getsize(file_path)
+    cuts = [start + (stop - start) * k // parts for k in range(parts + 1)]
+    quote_counts = list(
+        executor.map(
+            count_quotes, [file_path] * parts, cuts[:-1], cuts[1:], [quotechar] * parts
+        )
+    )
+
+    boundaries = [start]
+    inside_quotes = False
+    with open(file_path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        for k in range(1, parts):
+            inside_quotes ^= bool(quote_counts[k - 1] % 2)
+            boundary = next_record_start(mm, cuts[k], stop, inside_quotes, quotechar)
+            boundaries.append(max(boundary, boundaries[-1]))
+    boundaries.append(stop)
+
+    return [(a, b) for a, b in zip(boundaries[:-1], boundaries[1:]) if a < b]
+
+
+class ByteRangeReader(io.RawIOBase):
+    """
+    Read-only binary stream over the bytes [start, stop) of a file, so a
+    range can be decoded and parsed incrementally instead of read at once.
+    """
+
+    def __init__(self, file_path: str, start: int, stop: int):
+        self._file = open(file_path, "rb")
+        self._file.seek(start)
+        self._remaining = stop - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: self._remaining]
+        size = self._file.readinto(view)
+        self._remaining -= size
+        return size
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def open_byte_range(file_path: str, start: int, stop: int, encoding: str):
+    """
+    Opens the bytes [start, stop) of a file as a buffered text stream
+    (newline='' as required by csv.reader).
+    """
+    return io.TextIOWrapper(
+        io.BufferedReader(ByteRangeReader(file_path, start, stop)),
+        encoding=encoding,
+        errors="replace",
+        newline="",
+    )
+
+
+def supports_byte_ranges(encoding: str, delimiter: str, quotechar: str) -> bool:
+    """
+    Checks that the encoding is compatible with splitting the file in byte
+    ranges (delimiter, quotechar and newline encoded as a single byte).
+    """
+    try:
+        return all(
+            len(char.encode(encoding)) == 1 for char in (delimiter, quotechar, "\n")
+        )
+    except (LookupError, UnicodeEncodeError):
+        return False
+
+
+def check_range_field_count(
+    file_path: str,
+    start: int,
+    stop: int,
+    encoding: str,
+    delimiter: str,
+    expected_field_count: int,
+    keep_raw: bool = False,
+    quotechar: str = '"',
+) -> Tuple[int, List[Tuple], bool]:
+    """
+    Checks the field count of the records in a byte range of a CSV file,
+    streamed through a buffered reader (memory does not grow with the range).
+    Returns the number of records and the (record index in the range, field
+    count) of the inconsistent ones, plus their raw text with keep_raw, and
+    whether the range ends on a record boundary.
+    An empty line is appended to the range: it comes back as an empty row of
+    its own only if the range does not end inside a quoted field.
+    """
+    num_records = 0
+    inconsistent = []
+    with open_byte_range(file_path, start, stop, encoding) as source:
+        lines = itertools.chain(source, ["\n"])
+        if keep_raw:
+            reader = RawRecordReader(lines, delimiter=delimiter, quotechar=quotechar)
+        else:
+            reader = csv.reader(lines, delimiter=delimiter, quotechar=quotechar)
+        previous = None
+        for row in reader:
+            if previous is not None:
+                if len(previous[0]) != expected_field_count:
+                    inconsistent.append((num_records, len(previous[0])) + previous[1:])
+                num_records += 1
+            previous = (row, reader.raw) if keep_raw else (row,)
+    aligned = previous is not None and previous[0] == []
+    if previous is not None and not aligned:
+        # The range does not end with a newline (end of file) or ends inside
+        # a quoted field: the sentinel belongs to the last record
+        if len(previous[0]) != expected_field_count:
+            inconsistent.append((num_records, len(previous[0])) + previous[1:])
+        num_records += 1
+    return num_records, inconsistent, aligned
+
+
+def check_file_field_count(
+    file_path: str,
+    delimiter: str,
+    encoding: str,
+    reject_sink: Optional[RejectSink] = None,
+    aggregate_logs: bool = False,
+    quotechar: str = '"',
+) -> bool:
+    """
+    Opens a CSV file and checks its field count sequentially
+    (see check_field_count_consistency).
+    """
+    with open(file_path, "r", encoding=encoding, errors="replace", newline="") as csvfile:
+        if reject_sink is not None:
+            reader = RawRecordReader(csvfile, delimiter=delimiter, quotechar=quotechar)
+        else:
+            reader = csv.reader(csvfile, delimiter=delimiter, quotechar=quotechar)
+        return check_field_count_consistency(
+            reader, file_path, reject_sink, aggregate_logs
+        )
+
+
+def check_field_count_consistency_parallel(
+    file_path: str,
+    delimiter: str = ";",
+    workers: Optional[int] = None,
+    encoding: Optional[str] = None,
+    reject_sink: Optional[RejectSink] = None,
+    aggregate_logs: bool = False,
+    quotechar: str = '"',
+) -> bool:
+    """
+    Checks if all rows in the CSV file have the same number of fields,
+    splitting the file in byte ranges checked by a pool of processes.
+    Every inconsistent row is logged with its line number (or, with
+    aggregate_logs, summarised in one record per file) and, with a
+    reject_sink, written to the reject file with its raw text.
+    Falls back to the sequential check when the encoding is not compatible
+    with byte ranges (see supports_byte_ranges) or when a range does not end
+    on a record boundary (a stray quote in an unquoted field breaks the quote
+    parity used to split the file).
+    """
+    logger.info("Checking field count consistency in parallel for %s...", file_path)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if encoding is None:
+        encoding = detect_encoding(file_path)
+    if not supports_byte_ranges(encoding, delimiter, quotechar):
+        logger.info(
+            "Encoding %s is not compatible with byte ranges, checking %s sequentially.",
+            encoding,
+            file_path,
+        )
+        return check_file_field_count(
+            file_path, delimiter, encoding, reject_sink, aggregate_logs, quotechar
+        )
+
+    try:
+        if os.path.getsize(file_path) == 0:
+            logger.info("%s is empty.", file_path)
+            return True
+
+        with open(file_path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            header_end = next_record_start(
+                mm, 0, len(mm), False, quotechar.encode(encoding)
+            )
+            header_text = mm[:header_end].decode(encoding, errors="replace")
+        header = next(
+            csv.reader(
+                io.StringIO(header_text, newline=""),
+                delimiter=delimiter,
+                quotechar=quotechar,
+            ),
+            [],
+        )
+        first_row_field_count = len(header)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            ranges = split_record_ranges(
+                file_path, header_end, workers, executor, quotechar.encode(encoding)
+            )
+            results = list(
+                executor.map(
+                    check_range_field_count,
+                    [file_path] * len(ranges),
+                    [start for start, _ in ranges],
+                    [stop for _, stop in ranges],
+                    [encoding] * len(ranges),
+                    [delimiter] * len(ranges),
+                    [first_row_field_count] * len(ranges),
+                    [reject_sink is not None] * len(ranges),
+                    [quotechar] * len(ranges),
+                )
+            )
+
+        for (_, range_stop), (_, _, aligned) in zip(ranges[:-1], results):
+            if not aligned:
+                logger.warning(
+                    "Byte ranges of %s are not aligned to records "
+                    "(stray quote?), checking sequentially.",
+                    file_path,
+                )
+                return check_file_field_count(
+                    file_path, delimiter, encoding, reject_sink, aggregate_logs, quotechar
+                )
+
+        inconsistent_count = 0
+        sample_lines = []
+        line_number = 2
+        for num_records, inconsistent, _ in results:
+            for index, field_count, *raw in inconsistent:
+                inconsistent_count += 1
+                if aggregate_logs:
+                    if len(sample_lines) < SUMMARY_SAMPLE_LINES:
+                        sample_lines.append(line_number + index)
+                else:
+                    logger.error(
+                        "Inconsistent field count in %s at line %d. "
+                        "Expected %d, found %d.",
+                        file_path,
+                        line_number + index,
+                        first_row_field_count,
+                        field_count,
+                    )
+                if reject_sink is not None:
+                    reject_sink.write(
+                        line_number + index,
+                        f"expected {first_row_field_count} fields, found {field_count}",
+                        raw[0],
+                    )
+            line_number += num_records
+
+        if inconsistent_count == 0:
+            logger.info("Field count is consistent in %s.", file_path)
+        elif aggregate_logs:
+            log_inconsistency_summary(
+                file_path, first_row_field_count, inconsistent_count, sample_lines
+            )
+        return inconsistent_count == 0
+    except Exception as e:
+        logger.error("An error occurred during field count consistency check: %s", e)
         return False
 
 
@@ -62,7 +467,7 @@ def extract_record_info(
     """
     Extracts information (field count and a specific field's value) from each record.
     """
-    logging.info(f"Extracting record info from {file_path}...")
+    logger.info("Extracting record info from %s...", file_path)
     record_info = []
     encoding = detect_encoding(file_path)
     try:
@@ -79,29 +484,69 @@ def extract_record_info(
                 }
                 record_info.append(info)
                 line_number += 1
-        logging.info(f"Successfully extracted info from {len(record_info)} records.")
+        logger.info("Successfully extracted info from %d records.", len(record_info))
         return record_info
     except FileNotFoundError:
-        logging.error(f"File not found: {file_path}")
+        logger.error("File not found: %s", file_path)
         return []
     except Exception as e:
-        logging.error(f"An error occurred during record info extraction: {e}")
+        logger.error("An error occurred during record info extraction: %s", e)
         return []
 
 
 def validate_csv(
-    file_path: str, delimiter: str = ";", rules: Optional[List[str]] = None
+    file_path: str,
+    delimiter: str = ";",
+    rules: Optional[List[str]] = None,
+    workers: int = 1,
+    reject_file: Optional[str] = None,
+    aggregate_logs: bool = False,
+    auto_dialect: bool = False,
 ) -> bool:
     """
     Validates a CSV file based on a set of rules.
+    With workers > 1 the field count check scans byte ranges of the file in parallel.
+    With reject_file the rejected records are written to that CSV file as
+    (line number, reason, raw text) during the scan (see RejectSink).
+    With aggregate_logs the inconsistent rows of the file are logged as one
+    summary record instead of one record per row.
+    With auto_dialect the delimiter and quotechar are detected from the first
+    KB of the file (see dialect.detect_dialect) instead of using `delimiter`;
+    the sample encoding replaces running chardet on the whole file only when
+    the sample gives evidence for it (a BOM or non-ASCII UTF-8 bytes).
     """
     if rules is None:
         rules = ["check_field_count_consistency"]
 
-    logging.info(
-        f"Starting validation for {file_path} with delimiter '{delimiter}' and rules {rules}."
+    quotechar = '"'
+    if auto_dialect:
+        try:
+            dialect = detect_dialect(file_path)
+        except FileNotFoundError:
+            logger.error("File not found: %s", file_path)
+            return False
+        delimiter = dialect.delimiter
+        quotechar = dialect.quotechar
+        logger.info(
+            "Detected dialect for %s: delimiter '%s', quotechar '%s', encoding %s.",
+            file_path,
+            delimiter,
+            quotechar,
+            dialect.encoding,
+        )
+
+    logger.info(
+        "Starting validation for %s with delimiter '%s' and rules %s.",
+        file_path,
+        delimiter,
+        rules,
     )
-    encoding = detect_encoding(file_path)
+    # The sample encoding is used only with evidence (BOM, non-ASCII UTF-8):
+    # a pure ASCII sample says nothing about the rest of the file
+    if auto_dialect and dialect.encoding in UNICODE_ENCODINGS:
+        encoding = dialect.encoding
+    else:
+        encoding = detect_encoding(file_path)
 
     try:
         with open(file_path, "r", encoding=encoding, errors="replace") as csvfile:
@@ -115,25 +560,50 @@ def validate_csv(
                 pass  # For now, we will call it separately.
 
     except FileNotFoundError:
-        logging.error(f"File not found: {file_path}")
+        logger.error("File not found: %s", file_path)
         return False
     except Exception as e:
-        logging.error(f"An error occurred during validation: {e}")
+        logger.error("An error occurred during validation: %s", e)
         return False
 
     # Since the reader is consumed, we need to re-open for each check or read once.
     # Let's re-open for simplicity here.
     all_checks_passed = True
-    if "check_field_count_consistency" in rules:
-        with open(file_path, "r", encoding=encoding, errors="replace") as csvfile:
-            reader = csv.reader(csvfile, delimiter=delimiter)
-            if not check_field_count_consistency(reader, file_path):
+    reject_sink = None
+    if reject_file is not None:
+        reject_sink = RejectSink(
+            reject_file, delimiter, encoding, headers=REJECT_FILE_HEADERS
+        )
+
+    try:
+        if "check_field_count_consistency" in rules and workers > 1:
+            if not check_field_count_consistency_parallel(
+                file_path,
+                delimiter,
+                workers,
+                encoding,
+                reject_sink,
+                aggregate_logs,
+                quotechar,
+            ):
                 all_checks_passed = False
+        elif "check_field_count_consistency" in rules:
+            if not check_file_field_count(
+                file_path, delimiter, encoding, reject_sink, aggregate_logs, quotechar
+            ):
+                all_checks_passed = False
+    finally:
+        if reject_sink is not None:
+            reject_sink.close()
+            if reject_sink.count:
+                logger.info(
+                    "%d rejected records written to %s.", reject_sink.count, reject_file
+                )
 
     if all_checks_passed:
-        logging.info(f"All validation checks passed for {file_path}.")
+        logger.info("All validation checks passed for %s.", file_path)
     else:
-        logging.warning(f"Some validation checks failed for {file_path}.")
+        logger.warning("Some validation checks failed for %s.", file_path)
 
     return all_checks_passed
 
@@ -142,6 +612,8 @@ if __name__ == "__main__":
     # Example usage:
     # This part is for demonstration and will be replaced by a proper CLI or test cases.
 
+    configure_logging(filename="csv_validator.log")
+
     # Create a dummy CSV for testing
     with open("test.csv", "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f, delimiter=";")
@@ -0,0 +1,154 @@
+"""
+Rejects - Scrittura in streaming dei record scartati
+
+Ogni record scartato viene scritto, mentre il file è scansionato, con il
+numero di riga, il motivo e il testo originale: il file degli scarti può
+essere rielaborato senza rileggere il file di partenza.
+
+Modulo condiviso: allo_gra_py/src e csv_control/src ne contengono copie
+identiche, per lo stesso motivo di dialect.py (progetti installati ed
+eseguiti ognuno dalla propria cartella). Modificare entrambe le copie
+insieme: tests/test_shared_modules.py nella radice del repository verifica
+che siano identiche.
+"""
+
+import csv
+import io
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+# Colonne del file degli scarti
+REJECT_HEADERS = ["LINE", "REASON", "RAW"]
+
+
+class RejectSink:
+    """Classe per scrivere i record scartati in un file CSV laterale"""
+
+    def __init__(
+        self,
+        path: Path,
+        delimiter: str = ";",
+        encoding: str = "utf-8",
+        headers: Optional[List[str]] = None,
+    ):
+        """
+        Inizializza il file degli scarti (creato al primo record scartato)
+
+        Args:
+            path: Percorso del file degli scarti
+            delimiter: Delimitatore del file degli scarti
+            encoding: Codifica del file degli scarti
+            headers: Colonne del file degli scarti (default: REJECT_HEADERS)
+        """
+        self.path = Path(path)
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.headers = REJECT_HEADERS if headers is None else headers
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, line_number: int, reason: str, raw: str) -> None:
+        """
+        Scrive un record scartato
+
+        Args:
+            line_number: Numero di riga del record (1 = header)
+            reason: Motivo dello scarto
+            raw: Testo originale del record
+        """
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "w", encoding=self.encoding, newline="")
+            self._writer = csv.writer(self._file, delimiter=self.delimiter)
+            self._writer.writerow(self.headers)
+        self._writer.writerow([line_number, reason, raw.rstrip("\r\n")])
+        self.count += 1
+
+    def close(self) -> None:
+        """Chiude il file degli scarti"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RawRecordReader:
+    """
+    csv.reader che conserva anche il testo originale dell'ultimo record letto
+    (tutte le sue righe fisiche) nell'attributo `raw`
+    """
+
+    def __init__(self, csvfile, **fmtparams):
+        """
+        Args:
+            csvfile: Righe da leggere (file aperto con newline='')
+            fmtparams: Parametri di formato di csv.reader
+        """
+        self._lines: List[str] = []
+        self._reader = csv.reader(self._tee(csvfile), **fmtparams)
+        self.dialect = self._reader.dialect
+        self.raw = ""
+
+    def _tee(self, csvfile):
+        for line in csvfile:
+            self._lines.append(line)
+            yield line
+
+    @property
+    def line_num(self) -> int:
+        return self._reader.line_num
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> List[str]:
+        self._lines.clear()
+        row = next(self._reader)
+        self.raw = "".join(self._lines)
+        return row
+
+
+def read_raw_records(
+    infile, delimiter: str = ";", quotechar: str = '"'
+) -> Iterator[Tuple[List[str], str]]:
+    """
+    Legge i record di un file CSV insieme al loro testo originale
+    (vedi RawRecordReader)
+
+    Args:
+        infile: File aperto in lettura (con newline='')
+        delimiter: Delimitatore
+        quotechar: Carattere di quoting
+
+    Yields:
+        Tuple[List[str], str]: (record, testo originale)
+    """
+    reader = RawRecordReader(infile, delimiter=delimiter, quotechar=quotechar)
+    for row in reader:
+        yield row, reader.raw
+
+
+def format_raw_record(row: List[str], delimiter: str = ";", quotechar: str = '"') -> str:
+    """
+    Ricostruisce il testo di un record già letto (per i record di cui non si
+    ha più il testo originale)
+
+    Args:
+        row: Record
+        delimiter: Delimitatore
+        quotechar: Carattere di quoting
+
+    Returns:
+        str: Testo del record senza terminatore di riga
+    """
+    buffer = io.StringIO()
+    csv.writer(
+        buffer, delimiter=delimiter, quotechar=quotechar, lineterminator=""
+    ).writerow(row)
+    return buffer.getvalue()
@@ -1,12 +1,18 @@
 import pytest
 import os
 import csv
+import logging
 from csv_control.src.csv_validator import (
     detect_encoding,
     check_field_count_consistency,
+    check_field_count_consistency_parallel,
+    check_range_field_count,
+    configure_logging,
     extract_record_info,
+    open_byte_range,
     validate_csv,
 )
+from csv_control.src.dialect import detect_dialect, resolve_encoding
 
 
 @pytest.fixture(scope="module")
@@ -110,3 +116,181 @@ def test_validate_csv_inconsistent(test_data_dir):
 def test_validate_csv_file_not_found():
     """Test the main validation function with a non-existent file."""
     assert validate_csv("non_existent_file.csv") is False
+
+
+def test_check_field_count_consistency_parallel(test_data_dir):
+    """Test the parallel field count check on byte ranges."""
+    quoted_csv = test_data_dir.join("quoted.csv")
+    with open(quoted_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["h1", "h2", "h3"])
+        for i in range(200):
+            writer.writerow([str(i), "multi\nline;value", 'with "quotes"'])
+
+    assert check_field_count_consistency_parallel(
+        str(quoted_csv), delimiter=";", workers=4, encoding="utf-8"
+    ) is True
+    assert check_field_count_consistency_parallel(
+        str(test_data_dir.join("inconsistent.csv")), delimiter=";", workers=2
+    ) is False
+    assert validate_csv(str(quoted_csv), delimiter=";", workers=4) is True
+
+
+def test_check_range_field_count_streams_range(test_data_dir):
+    """Test that a byte range is parsed up to its end, not beyond."""
+    range_csv = test_data_dir.join("range.csv")
+    lines = ["h1;h2\n"] + [f"{i};v{i}\n" for i in range(5000)] + ["x;y;z\n"]
+    range_csv.write("".join(lines), mode="w")
+    start = len(lines[0])
+    stop = start + sum(len(line) for line in lines[1:4001])
+
+    with open_byte_range(str(range_csv), start, stop, "utf-8") as source:
+        assert source.read() == "".join(lines[1:4001])
+
+    assert check_range_field_count(str(range_csv), start, stop, "utf-8", ";", 2) == (
+        4000,
+        [],
+        True,
+    )
+    num_records, inconsistent, aligned = check_range_field_count(
+        str(range_csv), stop, stop + sum(len(line) for line in lines[4001:]),
+        "utf-8", ";", 2, keep_raw=True,
+    )
+    assert num_records == 1001
+    assert inconsistent == [(1000, 3, "x;y;z\n")]
+    assert aligned is True
+
+
+def test_check_field_count_consistency_parallel_stray_quote(test_data_dir, caplog):
+    """Test the sequential fallback when a stray quote misaligns the byte ranges."""
+    stray_csv = test_data_dir.join("stray_quote.csv")
+    lines = ["h1;h2;h3\n", '1;ab"c;x\n'] + [f'{i};"multi\nline";z\n' for i in range(200)]
+    stray_csv.write("".join(lines), mode="w")
+
+    with caplog.at_level(logging.WARNING):
+        assert check_field_count_consistency_parallel(
+            str(stray_csv), delimiter=";", workers=2, encoding="utf-8"
+        ) is True
+    assert "not aligned to records" in caplog.text
+
+
+def test_check_field_count_consistency_parallel_utf16(test_data_dir):
+    """Test the sequential fallback for encodings that are not single-byte."""
+    utf16_csv = test_data_dir.join("utf16.csv")
+    with open(utf16_csv, "w", newline="", encoding="utf-16") as f:
+        f.write("h1;h2\n" + "".join(f"{i};v{i}\n" for i in range(200)) + "x;y;z\n")
+
+    for workers in (1, 2):
+        reject_file = test_data_dir.join(f"utf16_rejects_{workers}.csv")
+        assert validate_csv(
+            str(utf16_csv), workers=workers, reject_file=str(reject_file)
+        ) is False
+        with open(reject_file, newline="", encoding="utf-16") as f:
+            rejects = list(csv.reader(f, delimiter=";"))
+        assert rejects[1:] == [["202", "expected 2 fields, found 3", "x;y;z"]]
+
+
+def test_validate_csv_reject_file(test_data_dir):
+    """Test that every inconsistent record goes to the reject file, sequential and parallel."""
+    broken_csv = test_data_dir.join("broken.csv")
+    with open(broken_csv, "w", newline="", encoding="utf-8") as f:
+        f.write('h1;h2\nd1;d2\nd1;d2;d3\nv1;"multi\nline";x\nv1\n')
+
+    for workers in (1, 2):
+        reject_file = test_data_dir.join(f"broken_rejects_{workers}.csv")
+        assert validate_csv(
+            str(broken_csv), delimiter=";", workers=workers, reject_file=str(reject_file)
+        ) is False
+
+        with open(reject_file, newline="", encoding="utf-8") as f:
+            rejects = list(csv.reader(f, delimiter=";"))
+        assert rejects[0] == ["line_number", "reason", "raw"]
+        assert [row[0] for row in rejects[1:]] == ["3", "4", "5"]
+        assert rejects[1][1] == "expected 2 fields, found 3"
+        assert rejects[2][2] == 'v1;"multi\nline";x'
+        assert rejects[3][2] == "v1"
+
+
+def test_validate_csv_no_reject_file_when_valid(test_data_dir):
+    """Test that no reject file is created for a valid CSV."""
+    reject_file = test_data_dir.join("consistent_rejects.csv")
+    assert validate_csv(
+        str(test_data_dir.join("consistent.csv")), reject_file=str(reject_file)
+    ) is True
+    assert not os.path.exists(reject_file)
+
+
+def test_validate_csv_aggregate_logs(test_data_dir, caplog):
+    """Test one summary log record per file instead of one per inconsistent row."""
+    many_errors_csv = test_data_dir.join("many_errors.csv")
+    with open(many_errors_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["h1", "h2"])
+        for i in range(50):
+            writer.writerow([str(i)])
+
+    with caplog.at_level(logging.ERROR):
+        assert validate_csv(str(many_errors_csv), aggregate_logs=True) is False
+    errors = [r for r in caplog.records if r.levelno == logging.ERROR]
+    assert len(errors) == 1
+    assert "50 rows with inconsistent field count" in errors[0].getMessage()
+    assert "first at lines 2, 3, 4" in errors[0].getMessage()
+
+    caplog.clear()
+    with caplog.at_level(logging.ERROR):
+        validate_csv(str(many_errors_csv))
+    assert len([r for r in caplog.records if r.levelno == logging.ERROR]) == 50
+
+
+def test_validate_csv_auto_dialect(test_data_dir):
+    """Test validation of a comma separated file with dialect detection."""
+    comma_csv = test_data_dir.join("comma.csv")
+    with open(comma_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=",")
+        writer.writerow(["h1", "h2", "h3"])
+        writer.writerow(["d1", "a;b", "d3"])
+        writer.writerow(["v1", "v2", "v3"])
+
+    assert validate_csv(str(comma_csv), delimiter=";") is False
+    assert validate_csv(str(comma_csv), auto_dialect=True) is True
+
+    dialect = detect_dialect(str(comma_csv))
+    assert (dialect.delimiter, dialect.quotechar, dialect.has_header) == (",", '"', True)
+    assert detect_dialect(str(comma_csv)) is dialect
+
+
+def test_resolve_encoding():
+    """Test that the sample encoding is used only with evidence."""
+    assert resolve_encoding(None, "windows-1252") == "windows-1252"
+    assert resolve_encoding("utf-8", "windows-1252") == "utf-8"
+    assert resolve_encoding("utf-8-sig", "latin-1") == "utf-8-sig"
+    assert resolve_encoding("windows-1252", "utf-8") == "windows-1252"
+    assert resolve_encoding("iso-8859-9", "latin-1") == "latin-1"
+
+
+def test_validate_csv_auto_dialect_parallel(test_data_dir):
+    """Test that the parallel check uses the detected quotechar."""
+    quoted_csv = test_data_dir.join("single_quoted.csv")
+    rows = ["h1,h2,h3"] + [f"{i},'a,b',c" for i in range(200)]
+    quoted_csv.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+    assert validate_csv(str(quoted_csv), auto_dialect=True, workers=2) is True
+    assert validate_csv(str(quoted_csv), delimiter=",", workers=2) is False
+
+
+def test_configure_logging_idempotent(tmp_path):
+    """Test that repeated calls keep a single handler."""
+    from csv_control.src.csv_validator import logger
+
+    log_file = tmp_path / "validator.log"
+    try:
+        configure_logging(filename=str(log_file))
+        handler = configure_logging(filename=str(log_file))
+        logger.info("once")
+
+        installed = [h for h in logger.handlers if not isinstance(h, logging.NullHandler)]
+        assert installed == [handler]
+        assert log_file.read_text(encoding="utf-8").count("once") == 1
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
@@ -5,11 +5,13 @@ Supporta separatori personalizzabili, encoding multipli e validazione struttura.
 """
 
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterator, Optional, List
 import pandas as pd
 import logging
 
 from src.exceptions import ValidationError
+from src.dialect import detect_dialect, resolve_encoding
+from src.profiler import CSVProfile, DEFAULT_CHUNKSIZE, profile_csv
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,11 @@ class CSVReader:
                 - encoding: Encoding file (default: 'utf-8')
                 - has_header: Se CSV ha intestazioni (default: True)
                 - decimal: Carattere decimale (default: '.')
+                - auto_dialect: Rileva separator, quotechar, has_header ed
+                  encoding dai primi KB del file prima della lettura
+                  (default: False, vedi src.dialect)
+                - dtype: dtype per colonna passati a pandas (default: None,
+                  vedi profile())
 
         Raises:
             FileNotFoundError: Se file non esiste
@@ -47,6 +54,9 @@ class CSVReader:
             "encoding": "utf-8",
             "has_header": True,
             "decimal": ".",
+            "quotechar": '"',
+            "auto_dialect": False,
+            "dtype": None,
         }
 
         # Aggiorna con config fornita
@@ -71,6 +81,9 @@ class CSVReader:
             >>> print(len(df))
             100
         """
+        if self.config["auto_dialect"]:
+            self.apply_detected_dialect()
+
         try:
             header = 0 if self.config["has_header"] else None
 
@@ -80,6 +93,8 @@ class CSVReader:
                 encoding=self.config["encoding"],
                 header=header,
                 decimal=self.config["decimal"],
+                quotechar=self.config["quotechar"],
+                dtype=self.config["dtype"],
                 keep_default_na=True,
                 na_values=["", "NA", "N/A", "null", "NULL"],
             )
@@ -100,6 +115,103 @@ class CSVReader:
         except Exception as e:
             raise ValidationError(f"Errore nella lettura CSV: {str(e)}")
 
+    def read_chunks(self, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+        """
+        Legge il CSV a blocchi, con le stesse opzioni di read(), senza
+        caricarlo interamente in memoria.
+
+        Args:
+            chunksize: Righe per blocco
+
+        Yields:
+            DataFrame di al più chunksize righe (indice progressivo sul file)
+
+        Raises:
+            ValidationError: Se CSV malformato o non leggibile
+
+        Example:
+            >>> for chunk in reader.read_chunks(100_000):
+            ...     adapter.insert_dataframe(chunk, 'users')
+        """
+        if self.config["auto_dialect"]:
+            self.apply_detected_dialect()
+
+        try:
+            chunks = pd.read_csv(
+                self.file_path,
+                sep=self.config["separator"],
+                encoding=self.config["encoding"],
+                header=0 if self.config["has_header"] else None,
+                decimal=self.config["decimal"],
+                quotechar=self.config["quotechar"],
+                dtype=self.config["dtype"],
+                keep_default_na=True,
+                na_values=["", "NA", "N/A", "null", "NULL"],
+                chunksize=chunksize,
+            )
+            yield from chunks
+
+        except pd.errors.ParserError as e:
+            raise ValidationError(f"Errore nel parsing CSV: {str(e)}")
+        except UnicodeDecodeError:
+            raise ValidationError(
+                f"Errore di encoding. Provare con encoding diverso. "
+                f"Encoding attuale: {self.config['encoding']}"
+            )
+
+    def apply_detected_dialect(self) -> dict:
+        """
+        Rileva il formato dal campione iniziale del file e aggiorna la
+        configurazione (separator, quotechar, has_header, encoding).
+        L'encoding configurato cambia solo se il campione ne dà evidenza
+        (vedi src.dialect.resolve_encoding).
+
+        Returns:
+            Configurazione aggiornata
+
+        Example:
+            >>> reader = CSVReader('export.csv', {'auto_dialect': True})
+            >>> reader.apply_detected_dialect()['separator']
+            ','
+        """
+        dialect = detect_dialect(str(self.file_path))
+
+        if dialect.delimiter != self.config["separator"]:
+            logger.warning(
+                f"Separatore rilevato '{dialect.delimiter}' diverso da "
+                f"'{self.config['separator']}' in {self.file_path.name}"
+            )
+
+        self.config.update(
+            {
+                "separator": dialect.delimiter,
+                "quotechar": dialect.quotechar,
+                "has_header": dialect.has_header,
+                "encoding": resolve_encoding(
+                    dialect.encoding, self.config["encoding"]
+                ),
+            }
+        )
+        return self.config
+
+    def profile(self, chunksize: int = DEFAULT_CHUNKSIZE) -> CSVProfile:
+        """
+        Profila le colonne del file in un solo passaggio a blocchi, senza
+        caricarlo interamente in memoria.
+
+        Args:
+            chunksize: Righe lette per blocco
+
+        Returns:
+            CSVProfile con statistiche per colonna (vedi src.profiler)
+
+        Example:
+            >>> profile = reader.profile()
+            >>> reader.config['dtype'] = profile.dtypes()
+            >>> df = reader.read()
+        """
+        return profile_csv(str(self.file_path), self.config, chunksize=chunksize)
+
     def get_metadata(self) -> dict:
         """
         Restituisce metadata del CSV (colonne, tipi, righe).
@@ -66,10 +66,11 @@ class DatabaseAdapter(ABC):
         Args:
             df: DataFrame pandas da inserire
             table_name: Nome tabella destinazione
-            if_exists: Comportamento se tabella esiste ('fail', 'replace', 'append')
+            if_exists: Comportamento se tabella esiste ('fail', 'replace', 'append',
+                'upsert' se supportato, vedi upsert_dataframe)
 
         Returns:
-            Numero di righe inserite
+            Numero di righe inserite (con 'upsert': inserite o aggiornate)
 
         Raises:
             DatabaseConnectionError: Se non connesso
@@ -77,6 +78,29 @@ class DatabaseAdapter(ABC):
         """
         pass
 
+    def upsert_dataframe(
+        self, df: pd.DataFrame, table_name: str, batch_size: int = 10_000
+    ) -> dict:
+        """
+        Inserisce le righe nuove e aggiorna quelle esistenti (per chiave primaria).
+
+        Da implementare nelle sottoclassi se supportato.
+
+        Args:
+            df: DataFrame pandas da importare
+            table_name: Nome tabella destinazione (con chiave primaria)
+            batch_size: Righe per lotto
+
+        Returns:
+            Dizionario con chiavi 'inserted', 'updated', 'unchanged'
+
+        Raises:
+            NotImplementedError: Se l'adapter non supporta l'upsert
+        """
+        raise NotImplementedError(
+            f"Upsert non supportato da {type(self).__name__}"
+        )
+
     @abstractmethod
     def execute_query(self, query: str, params: Optional[tuple] = None) -> pd.DataFrame:
         """
@@ -4,8 +4,9 @@ Adapter per database SQLite.
 Implementa DatabaseAdapter per SQLite usando sqlite3 standard library.
 """
 
+import re
 import sqlite3
-from typing import Optional
+from typing import List, Optional
 import pandas as pd
 import logging
 
@@ -14,6 +15,28 @@ from src.exceptions import DatabaseConnectionError
 
 logger = logging.getLogger(__name__)
 
+# Suffisso della tabella di appoggio usata da reload_dataframe
+STAGING_SUFFIX = "__staging"
+
+# Nome tabella dopo CREATE TABLE [IF NOT EXISTS], anche tra virgolette o parentesi
+_CREATE_TABLE_NAME = re.compile(
+    r'^(CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?)("[^"]+"|\[[^\]]+\]|`[^`]+`|[^\s(]+)',
+    re.IGNORECASE,
+)
+
+
+def _dataframe_rows(df: pd.DataFrame) -> List[tuple]:
+    """
+    Righe del DataFrame come tuple di valori nativi Python per executemany:
+    NULL per NaN/NaT, date come testo (come pandas to_sql).
+    """
+    values = df.copy()
+    for name in values.columns:
+        if pd.api.types.is_datetime64_any_dtype(values[name]):
+            values[name] = values[name].dt.strftime("%Y-%m-%d %H:%M:%S")
+    values = values.astype(object).where(values.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
 
 class SQLiteAdapter(DatabaseAdapter):
     """Adapter per database SQLite."""
@@ -81,7 +104,8 @@ class SQLiteAdapter(DatabaseAdapter):
                 col_name = col[1]
                 col_type = col[2].upper()
                 is_nullable = col[3] == 0
-                is_pk = col[5] == 1
+                # pk è la posizione nella chiave primaria (0 se non ne fa parte)
+                is_pk = col[5] > 0
 
                 # Estrai lunghezza massima dal tipo (es. VARCHAR(50))
                 max_length = None
@@ -119,10 +143,11 @@ class SQLiteAdapter(DatabaseAdapter):
         Args:
             df: DataFrame pandas da inserire
             table_name: Nome tabella destinazione
-            if_exists: Comportamento se tabella esiste ('fail', 'replace', 'append')
+            if_exists: Comportamento se tabella esiste ('fail', 'replace', 'append',
+                'upsert': vedi upsert_dataframe, 'reload': vedi reload_dataframe)
 
         Returns:
-            Numero di righe inserite
+            Numero di righe inserite (con 'upsert': inserite o aggiornate)
 
         Raises:
             DatabaseConnectionError: Se non connesso
@@ -136,11 +161,19 @@ class SQLiteAdapter(DatabaseAdapter):
         if not self.is_connected():
             raise DatabaseConnectionError("Non connesso al database")
 
-        if if_exists not in ["fail", "replace", "append"]:
+        if if_exists not in ["fail", "replace", "append", "upsert", "reload"]:
             raise ValueError(
-                f"if_exists deve essere 'fail', 'replace' o 'append', ricevuto: {if_exists}"
+                f"if_exists deve essere 'fail', 'replace', 'append', 'upsert' o "
+                f"'reload', ricevuto: {if_exists}"
             )
 
+        if if_exists == "reload":
+            return self.reload_dataframe(df, table_name)
+
+        if if_exists == "upsert":
+            counts = self.upsert_dataframe(df, table_name)
+            return counts["inserted"] + counts["updated"]
+
         try:
             rows_inserted = len(df)
             df.to_sql(table_name, self.connection, if_exists=if_exists, index=False)
@@ -150,6 +183,211 @@ class SQLiteAdapter(DatabaseAdapter):
         except Exception as e:
             raise DatabaseConnectionError(f"Errore nell'inserimento dati: {str(e)}")
 
+    def upsert_dataframe(
+        self, df: pd.DataFrame, table_name: str, batch_size: int = 10_000
+    ) -> dict:
+        """
+        Inserisce le righe nuove e aggiorna quelle esistenti, per chiave primaria.
+
+        Usa INSERT ... ON CONFLICT (chiave) DO UPDATE con executemany a lotti
+        di batch_size righe, in un'unica transazione (o in quella già aperta
+        con begin_transaction). Le righe identiche a quelle in tabella non
+        vengono riscritte. Richiede SQLite 3.24+.
+
+        Args:
+            df: DataFrame pandas da importare (deve contenere la chiave primaria)
+            table_name: Nome tabella destinazione
+            batch_size: Righe per executemany
+
+        Returns:
+            Dizionario {'inserted': int, 'updated': int, 'unchanged': int}
+
+        Raises:
+            DatabaseConnectionError: Se non connesso o errore durante l'import
+            ValueError: Se tabella senza chiave primaria, chiave assente nel
+                DataFrame o colonne non presenti nella tabella
+
+        Example:
+            >>> counts = adapter.upsert_dataframe(df, 'users')
+            >>> print(counts)
+            {'inserted': 120, 'updated': 35, 'unchanged': 9845}
+        """
+        if not self.is_connected():
+            raise DatabaseConnectionError("Non connesso al database")
+
+        if sqlite3.sqlite_version_info < (3, 24, 0):
+            raise DatabaseConnectionError(
+                f"Upsert richiede SQLite 3.24+, disponibile: {sqlite3.sqlite_version}"
+            )
+
+        schema = self.get_table_schema(table_name)
+        primary_key = [name for name, spec in schema.items() if spec["primary_key"]]
+        if not primary_key:
+            raise ValueError(f"Tabella '{table_name}' senza chiave primaria")
+
+        missing_keys = [name for name in primary_key if name not in df.columns]
+        if missing_keys:
+            raise ValueError(
+                f"Colonne chiave mancanti nel DataFrame: {', '.join(missing_keys)}"
+            )
+        unknown = [name for name in df.columns if name not in schema]
+        if unknown:
+            raise ValueError(
+                f"Colonne non presenti nella tabella '{table_name}': {', '.join(unknown)}"
+            )
+
+        columns = list(df.columns)
+        updates = [name for name in columns if name not in primary_key]
+        quoted = ", ".join(f'"{name}"' for name in columns)
+        placeholders = ", ".join("?" * len(columns))
+        conflict = ", ".join(f'"{name}"' for name in primary_key)
+        if updates:
+            assignments = ", ".join(f'"{name}" = excluded."{name}"' for name in updates)
+            changed = " OR ".join(
+                f'"{table_name}"."{name}" IS NOT excluded."{name}"' for name in updates
+            )
+            action = f"DO UPDATE SET {assignments} WHERE {changed}"
+        else:
+            action = "DO NOTHING"
+        query = (
+            f'INSERT INTO "{table_name}" ({quoted}) VALUES ({placeholders}) '
+            f"ON CONFLICT ({conflict}) {action}"
+        )
+
+        rows = _dataframe_rows(df)
+
+        count_query = f'SELECT COUNT(*) FROM "{table_name}"'
+        owns_transaction = not self.connection.in_transaction
+        try:
+            if owns_transaction:
+                self.connection.execute("BEGIN")
+            rows_before = self.connection.execute(count_query).fetchone()[0]
+            changes = 0
+            cursor = self.connection.cursor()
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(query, rows[start : start + batch_size])
+                changes += cursor.rowcount
+            inserted = self.connection.execute(count_query).fetchone()[0] - rows_before
+            if owns_transaction:
+                self.connection.commit()
+        except sqlite3.Error as e:
+            if owns_transaction:
+                self.connection.rollback()
+            raise DatabaseConnectionError(f"Errore nell'upsert dati: {str(e)}")
+
+        counts = {
+            "inserted": inserted,
+            "updated": changes - inserted,
+            "unchanged": len(rows) - changes,
+        }
+        logger.info(
+            f"Upsert nella tabella '{table_name}': {counts['inserted']} inserite, "
+            f"{counts['updated']} aggiornate, {counts['unchanged']} invariate"
+        )
+        return counts
+
+    def reload_dataframe(
+        self, df: pd.DataFrame, table_name: str, batch_size: int = 10_000
+    ) -> int:
+        """
+        Sostituisce il contenuto della tabella passando da una tabella di appoggio.
+
+        A differenza di if_exists='replace' (che ricrea la tabella con i tipi
+        dedotti da pandas) la tabella conserva definizione, vincoli, indici e
+        trigger, e chi legge non vede mai la tabella vuota o parziale:
+
+        1. crea '<tabella>__staging' con la stessa CREATE TABLE, senza gli indici
+        2. carica le righe con executemany a lotti, senza indici da aggiornare
+        3. in un'unica transazione elimina la tabella originale, rinomina
+           quella di appoggio e ricrea indici e trigger (costruiti una sola
+           volta sui dati già caricati)
+
+        Gli indici impliciti di PRIMARY KEY e UNIQUE fanno parte della tabella
+        e restano attivi durante il caricamento.
+
+        Args:
+            df: DataFrame pandas con il nuovo contenuto
+            table_name: Nome tabella da ricaricare (deve esistere)
+            batch_size: Righe per executemany
+
+        Returns:
+            Numero di righe caricate
+
+        Raises:
+            DatabaseConnectionError: Se non connesso, con una transazione già
+                aperta o errore durante il caricamento (tabella originale invariata)
+            ValueError: Se tabella non esiste o colonne non presenti nella tabella
+
+        Example:
+            >>> rows = adapter.reload_dataframe(df, 'users')
+            >>> print(f"Ricaricate {rows} righe")
+        """
+        if not self.is_connected():
+            raise DatabaseConnectionError("Non connesso al database")
+        if self.connection.in_transaction:
+            raise DatabaseConnectionError(
+                "Ricaricamento non possibile con una transazione già aperta"
+            )
+
+        schema = self.get_table_schema(table_name)
+        unknown = [name for name in df.columns if name not in schema]
+        if unknown:
+            raise ValueError(
+                f"Colonne non presenti nella tabella '{table_name}': {', '.join(unknown)}"
+            )
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "SELECT type, sql FROM sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL",
+            (table_name,),
+        )
+        objects = cursor.fetchall()
+        create_table = next(sql for kind, sql in objects if kind == "table")
+        # Indici espliciti e trigger, ricreati dopo il caricamento
+        deferred = [sql for kind, sql in objects if kind in ("index", "trigger")]
+
+        staging = f"{table_name}{STAGING_SUFFIX}"
+        columns = ", ".join(f'"{name}"' for name in df.columns)
+        placeholders = ", ".join("?" * len(df.columns))
+        insert = f'INSERT INTO "{staging}" ({columns}) VALUES ({placeholders})'
+        rows = _dataframe_rows(df)
+
+        try:
+            cursor.execute(f'DROP TABLE IF EXISTS "{staging}"')
+            cursor.execute(_CREATE_TABLE_NAME.sub(rf'\g<1>"{staging}"', create_table, 1))
+            cursor.execute("BEGIN")
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany(insert, rows[start : start + batch_size])
+            self.connection.commit()
+        except sqlite3.Error as e:
+            self.connection.rollback()
+            cursor.execute(f'DROP TABLE IF EXISTS "{staging}"')
+            raise DatabaseConnectionError(
+                f"Errore nel caricamento della tabella di appoggio: {str(e)}"
+            )
+
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            # Le viste sulla tabella non vengono riconvalidate durante lo scambio
+            cursor.execute("PRAGMA legacy_alter_table = ON")
+            cursor.execute(f'DROP TABLE "{table_name}"')
+            cursor.execute(f'ALTER TABLE "{staging}" RENAME TO "{table_name}"')
+            for sql in deferred:
+                cursor.execute(sql)
+            self.connection.commit()
+        except sqlite3.Error as e:
+            self.connection.rollback()
+            cursor.execute(f'DROP TABLE IF EXISTS "{staging}"')
+            raise DatabaseConnectionError(f"Errore nello scambio delle tabelle: {str(e)}")
+        finally:
+            cursor.execute("PRAGMA legacy_alter_table = OFF")
+
+        logger.info(
+            f"Tabella '{table_name}' ricaricata: {len(rows)} righe, "
+            f"{len(deferred)} indici/trigger ricreati"
+        )
+        return len(rows)
+
     def execute_query(self, query: str, params: Optional[tuple] = None) -> pd.DataFrame:
         """
         Esegue query SELECT e restituisce risultati come DataFrame.
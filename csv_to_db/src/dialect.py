@@ -0,0 +1,296 @@
+"""
+Rilevamento del formato di un file CSV da un campione iniziale.
+
+Dai primi KB del file ricava in un solo passaggio delimitatore, carattere di
+quoting, presenza delle intestazioni ed encoding, prima della lettura
+completa. Il risultato è memorizzato per file (path, dimensione, data di
+modifica).
+
+Modulo condiviso: allo_gra_py/src, csv_control/src e csv_to_db/src ne
+contengono copie identiche. I tre progetti si installano ed eseguono ognuno
+dalla propria cartella, con il proprio package src e nessuna dipendenza
+comune, quindi non possono importarlo l'uno dall'altro; il modulo non
+importa nulla dai progetti. Modificare tutte le copie insieme:
+tests/test_shared_modules.py nella radice del repository verifica che siano
+identiche.
+"""
+
+import bz2
+import codecs
+import csv
+import gzip
+import io
+import logging
+import os
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Byte letti dall'inizio del file
+DEFAULT_SAMPLE_SIZE = 16 * 1024
+
+# Delimitatori candidati, in ordine di preferenza a parità di punteggio
+DELIMITERS = (";", ",", "\t", "|")
+
+# Encoding usato se il campione non è UTF-8 e chardet non è installato o non è affidabile
+FALLBACK_ENCODING = "windows-1252"
+
+# Sotto questa confidenza (campioni brevi) il risultato di chardet è ignorato
+MIN_CHARDET_CONFIDENCE = 0.5
+
+# Codifiche rilevate con certezza (BOM o byte non ASCII validi in UTF-8)
+UNICODE_ENCODINGS = ("utf-8", "utf-8-sig", "utf-16")
+
+
+@dataclass(frozen=True)
+class CSVDialect:
+    """Formato rilevato di un file CSV."""
+
+    delimiter: str
+    quotechar: str
+    has_header: bool
+    encoding: Optional[str]
+
+
+def read_sample(file_path: str, sample_size: int = DEFAULT_SAMPLE_SIZE) -> bytes:
+    """
+    Legge i primi sample_size byte (decompressi per .gz, .bz2 e .zst).
+
+    Args:
+        file_path: Path al file
+        sample_size: Byte da leggere
+
+    Returns:
+        Campione
+    """
+    suffix = os.path.splitext(file_path)[1].lower()
+    if suffix == ".gz":
+        opener = gzip.open
+    elif suffix == ".bz2":
+        opener = bz2.open
+    elif suffix == ".zst":
+        import zstandard
+
+        with open(file_path, "rb") as f:
+            return zstandard.ZstdDecompressor().stream_reader(f).read(sample_size)
+    else:
+        opener = open
+
+    with opener(file_path, "rb") as f:
+        return f.read(sample_size)
+
+
+def detect_sample_encoding(sample: bytes) -> Optional[str]:
+    """
+    Rileva l'encoding di un campione: BOM, poi UTF-8, poi chardet (opzionale).
+
+    Args:
+        sample: Primi byte del file
+
+    Returns:
+        Nome encoding (es. 'utf-8', 'windows-1252'), None se il campione è
+        solo ASCII (vedi resolve_encoding)
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    if sample.isascii():
+        # Ogni codifica compatibile con ASCII legge il campione: nessuna evidenza
+        return None
+    try:
+        sample.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # Il campione può tagliare a metà un carattere multibyte
+        if e.reason == "unexpected end of data":
+            return "utf-8"
+
+    try:
+        import chardet
+    except ImportError:
+        return FALLBACK_ENCODING
+    result = chardet.detect(sample)
+    if result["encoding"] is None or result["confidence"] < MIN_CHARDET_CONFIDENCE:
+        return FALLBACK_ENCODING
+    return result["encoding"]
+
+
+def resolve_encoding(detected: Optional[str], configured: str) -> str:
+    """
+    Codifica con cui leggere un file: quella rilevata solo se il campione ne
+    dà evidenza, altrimenti quella configurata
+
+    Un campione solo ASCII (detected None) non dice nulla sul resto del file.
+    La stima per un campione non UTF-8 sostituisce solo una codifica
+    configurata UTF, che non potrebbe leggerlo.
+
+    Args:
+        detected: Codifica rilevata dal campione (CSVDialect.encoding)
+        configured: Codifica configurata
+
+    Returns:
+        str: Codifica da usare
+    """
+    if detected is None:
+        return configured
+    if detected in UNICODE_ENCODINGS:
+        return detected
+    if codecs.lookup(configured).name.startswith("utf"):
+        return detected
+    return configured
+
+
+def score_delimiter(text: str, delimiter: str) -> Tuple[float, int]:
+    """
+    Punteggio di un delimitatore: quota di righe con il numero di campi più
+    frequente e quel numero di campi ((0, 0) se le righe hanno un solo campo).
+
+    Args:
+        text: Righe complete del campione
+        delimiter: Delimitatore candidato
+
+    Returns:
+        Tupla (coerenza, numero campi)
+    """
+    counts = Counter(
+        len(row)
+        for row in csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+        if row
+    )
+    if not counts:
+        return 0.0, 0
+    num_fields, frequency = counts.most_common(1)[0]
+    if num_fields < 2:
+        return 0.0, 0
+    return frequency / sum(counts.values()), num_fields
+
+
+def detect_quotechar(text: str, delimiter: str) -> str:
+    """
+    Carattere di quoting: apice se ai bordi dei campi è più frequente delle virgolette.
+
+    Args:
+        text: Righe complete del campione
+        delimiter: Delimitatore rilevato
+
+    Returns:
+        '"' oppure "'"
+    """
+
+    def quoting(quotechar: str) -> int:
+        return (
+            text.count(delimiter + quotechar)
+            + text.count(quotechar + delimiter)
+            + text.count("\n" + quotechar)
+            + text.startswith(quotechar)
+        )
+
+    return "'" if quoting("'") > quoting('"') else '"'
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value.replace(",", "."))
+    except ValueError:
+        return False
+    return True
+
+
+def detect_header(rows: List[List[str]]) -> bool:
+    """
+    La prima riga è un'intestazione se i campi sono non vuoti, non numerici e distinti.
+
+    Args:
+        rows: Prime righe del file
+
+    Returns:
+        True se la prima riga è un'intestazione
+    """
+    if not rows:
+        return False
+    header = rows[0]
+    if any(not value.strip() or _is_number(value) for value in header):
+        return False
+    return len(set(header)) == len(header)
+
+
+def sniff_sample(sample: bytes, truncated: bool = True) -> CSVDialect:
+    """
+    Rileva il formato da un campione di byte.
+
+    Args:
+        sample: Primi byte del file
+        truncated: True se il campione non arriva a fine file (l'ultima riga,
+            forse incompleta, viene ignorata)
+
+    Returns:
+        CSVDialect rilevato
+
+    Example:
+        >>> sniff_sample(b"id,nome\\n1,Mario\\n", truncated=False).delimiter
+        ','
+    """
+    encoding = detect_sample_encoding(sample)
+    text = sample.decode(encoding or "ascii", errors="replace")
+    if truncated and "\n" in text:
+        text = text[: text.rindex("\n") + 1]
+
+    delimiter = max(
+        DELIMITERS,
+        key=lambda candidate: (
+            score_delimiter(text, candidate),
+            -DELIMITERS.index(candidate),
+        ),
+    )
+    quotechar = detect_quotechar(text, delimiter)
+    rows = list(
+        csv.reader(
+            io.StringIO(text, newline=""), delimiter=delimiter, quotechar=quotechar
+        )
+    )
+
+    return CSVDialect(
+        delimiter=delimiter,
+        quotechar=quotechar,
+        has_header=detect_header(rows),
+        encoding=encoding,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _detect_dialect(
+    file_path: str, size: int, mtime_ns: int, sample_size: int
+) -> CSVDialect:
+    sample = read_sample(file_path, sample_size)
+    dialect = sniff_sample(sample, truncated=len(sample) >= sample_size)
+    logger.info("Formato rilevato per %s: %s", file_path, dialect)
+    return dialect
+
+
+def detect_dialect(file_path: str, sample_size: int = DEFAULT_SAMPLE_SIZE) -> CSVDialect:
+    """
+    Rileva il formato di un file CSV dai primi sample_size byte.
+
+    Il risultato è memorizzato per (path, dimensione, data di modifica):
+    chiamate successive sullo stesso file non lo rileggono.
+
+    Args:
+        file_path: Path al file CSV
+        sample_size: Byte esaminati (default: 16 KB)
+
+    Returns:
+        CSVDialect rilevato
+
+    Example:
+        >>> dialect = detect_dialect('data.csv')
+        >>> print(dialect.delimiter, dialect.encoding)
+        ; utf-8
+    """
+    stat = os.stat(file_path)
+    return _detect_dialect(
+        os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, sample_size
+    )
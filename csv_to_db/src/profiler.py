@@ -0,0 +1,543 @@
+"""
+Profilazione delle colonne di un file CSV in un solo passaggio.
+
+Il file è letto a blocchi (chunksize) come testo e per ogni colonna vengono
+calcolati, con memoria limitata indipendente dal numero di righe:
+
+- conteggio valori e NULL
+- lunghezza minima/massima e istogramma delle lunghezze (classi potenze di 2)
+- stima dei valori distinti (HyperLogLog)
+- campione casuale uniforme dei valori (reservoir sampling)
+- quanti valori sono interi, numerici o date nei formati supportati
+
+Tutte le operazioni sono vettoriali sui blocchi (pandas/NumPy). Il risultato
+suggerisce i dtype per la lettura e lo schema della tabella di destinazione.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.dialect import detect_dialect, resolve_encoding
+from src.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Valori trattati come NULL (coerenti con CSVReader.read)
+NULL_VALUES = ("", "NA", "N/A", "null", "NULL")
+
+# Formati data riconosciuti, con il tipo SQL corrispondente
+DATE_FORMATS = {
+    "%Y-%m-%d": "DATE",
+    "%d/%m/%Y": "DATE",
+    "%Y-%m-%d %H:%M:%S": "DATETIME",
+    "%d/%m/%Y %H:%M:%S": "DATETIME",
+}
+
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_SAMPLE_SIZE = 20
+
+# Precisione HyperLogLog: 2^12 registri, errore standard ~1.6%
+DEFAULT_HLL_PRECISION = 12
+
+# Interi con segno opzionale, senza zeri iniziali (codici come '00123' restano testo)
+_INTEGER_PATTERN = r"[+-]?(?:0|[1-9]\d*)"
+_LEADING_ZERO_PATTERN = r"[+-]?0\d.*"
+
+
+def _hash_values(values: pd.Series) -> np.ndarray:
+    """Hash a 64 bit (uint64) dei valori, calcolato in modo vettoriale."""
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Numero di bit significativi di ogni elemento di un array uint64."""
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = values >= np.uint64(1 << shift)
+        lengths[mask] += shift
+        values[mask] >>= np.uint64(shift)
+    lengths += (values > 0).astype(np.int64)
+    return lengths
+
+
+class HyperLogLog:
+    """Stima della cardinalità con memoria fissa (2^precision byte)."""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        """
+        Inizializza i registri.
+
+        Args:
+            precision: Bit dell'hash usati per scegliere il registro (4-18)
+
+        Raises:
+            ValueError: Se precision fuori intervallo
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision deve essere tra 4 e 18, ricevuto: {precision}")
+
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """
+        Aggiunge un blocco di hash a 64 bit.
+
+        Args:
+            hashes: Array uint64 (vedi _hash_values)
+        """
+        if len(hashes) == 0:
+            return
+        remaining_bits = 64 - self.precision
+        index = (hashes >> np.uint64(remaining_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << remaining_bits) - 1)
+        # Posizione del primo bit a 1 nei bit restanti (remaining_bits + 1 se sono tutti 0)
+        rank = (remaining_bits - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def add(self, values: pd.Series) -> None:
+        """
+        Aggiunge un blocco di valori.
+
+        Args:
+            values: Serie di valori (NULL esclusi)
+        """
+        self.add_hashes(_hash_values(values))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Unisce i registri di un'altra stima con la stessa precisione.
+
+        Raises:
+            ValueError: Se le precisioni sono diverse
+        """
+        if other.precision != self.precision:
+            raise ValueError("Impossibile unire HyperLogLog con precisione diversa")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """
+        Stima del numero di valori distinti.
+
+        Returns:
+            Cardinalità stimata
+
+        Example:
+            >>> hll = HyperLogLog()
+            >>> hll.add(pd.Series(['a', 'b', 'a']))
+            >>> hll.estimate()
+            2
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Correzione per cardinalità piccole (linear counting)
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class Reservoir:
+    """Campione casuale uniforme di dimensione fissa (algoritmo R, vettoriale)."""
+
+    def __init__(self, size: int = DEFAULT_SAMPLE_SIZE, seed: Optional[int] = None):
+        """
+        Inizializza il campione.
+
+        Args:
+            size: Numero massimo di valori conservati
+            seed: Seme del generatore casuale (per risultati ripetibili)
+        """
+        self.size = size
+        self.values = np.empty(size, dtype=object)
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, values: pd.Series) -> None:
+        """
+        Aggiunge un blocco di valori.
+
+        Args:
+            values: Serie di valori (NULL esclusi)
+        """
+        array = values.to_numpy(dtype=object)
+        count = len(array)
+        if count == 0 or self.size == 0:
+            return
+
+        # I primi valori riempiono il campione
+        filled = min(self.seen, self.size)
+        take = min(self.size - filled, count)
+        self.values[filled : filled + take] = array[:take]
+
+        # I successivi sostituiscono una posizione casuale con probabilità size/i
+        positions = np.arange(self.seen + take, self.seen + count, dtype=np.int64)
+        if len(positions):
+            slots = (self._rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+            keep = slots < self.size
+            # Con indici ripetuti vince l'ultimo, come nell'algoritmo sequenziale
+            self.values[slots[keep]] = array[take:][keep]
+
+        self.seen += count
+
+    def sample(self) -> List[str]:
+        """Valori campionati."""
+        return list(self.values[: min(self.seen, self.size)])
+
+
+@dataclass
+class ColumnProfile:
+    """Statistiche di una colonna CSV."""
+
+    name: str
+    count: int = 0
+    null_count: int = 0
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+    length_histogram: Dict[str, int] = field(default_factory=dict)
+    distinct_estimate: int = 0
+    integer_count: int = 0
+    numeric_count: int = 0
+    date_counts: Dict[str, int] = field(default_factory=dict)
+    sample: List[str] = field(default_factory=list)
+
+    @property
+    def non_null_count(self) -> int:
+        """Numero di valori non NULL."""
+        return self.count - self.null_count
+
+    @property
+    def nullable(self) -> bool:
+        """True se la colonna contiene NULL."""
+        return self.null_count > 0
+
+    @property
+    def date_format(self) -> Optional[str]:
+        """Formato data valido per tutti i valori non NULL (None se nessuno)."""
+        if not self.non_null_count:
+            return None
+        for date_format, parsed in self.date_counts.items():
+            if parsed == self.non_null_count:
+                return date_format
+        return None
+
+    @property
+    def inferred_type(self) -> str:
+        """
+        Tipo SQL dedotto: INTEGER, REAL, DATE, DATETIME o VARCHAR (TEXT se la
+        colonna è vuota).
+        """
+        non_null = self.non_null_count
+        if not non_null:
+            return "TEXT"
+        if self.integer_count == non_null:
+            return "INTEGER"
+        if self.numeric_count == non_null:
+            return "REAL"
+        if self.date_format:
+            return DATE_FORMATS[self.date_format]
+        return "VARCHAR"
+
+    @property
+    def dtype(self) -> str:
+        """dtype pandas suggerito per la lettura (date lette come testo)."""
+        return {"INTEGER": "Int64", "REAL": "float64"}.get(self.inferred_type, "string")
+
+    def to_schema(self) -> dict:
+        """
+        Descrizione della colonna nel formato di DatabaseAdapter.get_table_schema.
+
+        Returns:
+            Dizionario con type, max_length, nullable, primary_key
+        """
+        inferred_type = self.inferred_type
+        return {
+            "type": inferred_type,
+            "max_length": self.max_length if inferred_type == "VARCHAR" else None,
+            "nullable": self.nullable,
+            "primary_key": False,
+        }
+
+
+class ColumnProfiler:
+    """Accumulatore delle statistiche di una colonna, aggiornato a blocchi."""
+
+    def __init__(
+        self,
+        name: str,
+        decimal: str = ".",
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        precision: int = DEFAULT_HLL_PRECISION,
+        seed: Optional[int] = None,
+    ):
+        """
+        Inizializza l'accumulatore.
+
+        Args:
+            name: Nome colonna
+            decimal: Carattere decimale dei valori numerici
+            sample_size: Dimensione del campione di valori
+            precision: Precisione HyperLogLog
+            seed: Seme per il campionamento
+        """
+        self.name = name
+        self.decimal = decimal
+        self.count = 0
+        self.null_count = 0
+        self.min_length: Optional[int] = None
+        self.max_length: Optional[int] = None
+        self.length_buckets = np.zeros(65, dtype=np.int64)
+        self.integer_count = 0
+        self.numeric_count = 0
+        self.date_counts = {date_format: 0 for date_format in DATE_FORMATS}
+        self.hll = HyperLogLog(precision)
+        self.reservoir = Reservoir(sample_size, seed)
+
+    def update(self, values: pd.Series) -> None:
+        """
+        Aggiorna le statistiche con un blocco di valori testuali.
+
+        Args:
+            values: Serie di stringhe (NaN per i campi mancanti)
+        """
+        not_null = values.notna() & ~values.isin(NULL_VALUES)
+        self.count += len(values)
+        self.null_count += int((~not_null).sum())
+        values = values[not_null]
+        if values.empty:
+            return
+
+        lengths = values.str.len().to_numpy(dtype=np.int64)
+        chunk_min, chunk_max = int(lengths.min()), int(lengths.max())
+        self.min_length = chunk_min if self.min_length is None else min(self.min_length, chunk_min)
+        self.max_length = chunk_max if self.max_length is None else max(self.max_length, chunk_max)
+        self.length_buckets += np.bincount(
+            _bit_length(lengths.astype(np.uint64)), minlength=65
+        )[:65]
+
+        self.hll.add(values)
+        self.reservoir.add(values)
+
+        stripped = values.str.strip()
+        self.integer_count += int(stripped.str.fullmatch(_INTEGER_PATTERN).sum())
+        numeric_text = stripped if self.decimal == "." else stripped.str.replace(
+            self.decimal, ".", regex=False
+        )
+        numeric = pd.to_numeric(numeric_text, errors="coerce").notna()
+        numeric &= ~stripped.str.fullmatch(_LEADING_ZERO_PATTERN)
+        self.numeric_count += int(numeric.sum())
+
+        for date_format in DATE_FORMATS:
+            parsed = pd.to_datetime(stripped, format=date_format, errors="coerce")
+            self.date_counts[date_format] += int(parsed.notna().sum())
+
+    def result(self) -> ColumnProfile:
+        """
+        Statistiche accumulate.
+
+        Returns:
+            ColumnProfile della colonna
+        """
+        histogram = {}
+        for bucket in np.flatnonzero(self.length_buckets):
+            low = 1 << bucket >> 1
+            label = str(low) if bucket <= 1 else f"{low}-{2 * low - 1}"
+            histogram[label] = int(self.length_buckets[bucket])
+
+        return ColumnProfile(
+            name=self.name,
+            count=self.count,
+            null_count=self.null_count,
+            min_length=self.min_length,
+            max_length=self.max_length,
+            length_histogram=histogram,
+            distinct_estimate=self.hll.estimate(),
+            integer_count=self.integer_count,
+            numeric_count=self.numeric_count,
+            date_counts=dict(self.date_counts),
+            sample=self.reservoir.sample(),
+        )
+
+
+@dataclass
+class CSVProfile:
+    """Profilo di un file CSV: statistiche per colonna."""
+
+    num_rows: int
+    columns: Dict[str, ColumnProfile]
+
+    def dtypes(self) -> Dict[str, str]:
+        """
+        dtype suggeriti, da passare a CSVReader (config 'dtype') o pd.read_csv.
+
+        Returns:
+            Dizionario colonna -> dtype
+        """
+        return {name: profile.dtype for name, profile in self.columns.items()}
+
+    def date_columns(self) -> List[str]:
+        """Colonne i cui valori sono tutti date in un formato riconosciuto."""
+        return [
+            name
+            for name, profile in self.columns.items()
+            if profile.inferred_type in ("DATE", "DATETIME")
+        ]
+
+    def to_schema(self, primary_key: Optional[List[str]] = None) -> dict:
+        """
+        Schema dedotto nel formato di DatabaseAdapter.get_table_schema.
+
+        Args:
+            primary_key: Colonne della chiave primaria (opzionale)
+
+        Returns:
+            Dizionario colonna -> {type, max_length, nullable, primary_key}
+        """
+        schema = {name: profile.to_schema() for name, profile in self.columns.items()}
+        for name in primary_key or []:
+            schema[name]["primary_key"] = True
+            schema[name]["nullable"] = False
+        return schema
+
+    def create_table_sql(
+        self, table_name: str, primary_key: Optional[List[str]] = None
+    ) -> str:
+        """
+        Genera CREATE TABLE per la tabella di destinazione.
+
+        Args:
+            table_name: Nome tabella
+            primary_key: Colonne della chiave primaria (opzionale)
+
+        Returns:
+            Istruzione SQL
+
+        Example:
+            >>> print(profile.create_table_sql('clienti', primary_key=['id']))
+            CREATE TABLE "clienti" (
+                "id" INTEGER NOT NULL,
+                "nome" VARCHAR(30),
+                PRIMARY KEY ("id")
+            )
+        """
+        definitions = []
+        for name, column in self.to_schema(primary_key).items():
+            sql_type = column["type"]
+            if column["max_length"]:
+                sql_type += f"({column['max_length']})"
+            not_null = "" if column["nullable"] else " NOT NULL"
+            definitions.append(f'"{name}" {sql_type}{not_null}')
+        if primary_key:
+            keys = ", ".join(f'"{name}"' for name in primary_key)
+            definitions.append(f"PRIMARY KEY ({keys})")
+
+        body = ",\n    ".join(definitions)
+        return f'CREATE TABLE "{table_name}" (\n    {body}\n)'
+
+
+def profile_csv(
+    file_path: str,
+    config: Optional[dict] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    precision: int = DEFAULT_HLL_PRECISION,
+    seed: Optional[int] = None,
+) -> CSVProfile:
+    """
+    Profila le colonne di un file CSV in un solo passaggio a blocchi.
+
+    La memoria usata dipende da chunksize e dal numero di colonne, non dal
+    numero di righe del file.
+
+    Args:
+        file_path: Path al file CSV
+        config: Configurazione come per CSVReader (separator, encoding,
+            has_header, decimal, quotechar, auto_dialect)
+        chunksize: Righe lette per blocco
+        sample_size: Valori campionati per colonna
+        precision: Precisione HyperLogLog
+        seed: Seme per il campionamento (risultati ripetibili)
+
+    Returns:
+        CSVProfile con le statistiche per colonna
+
+    Raises:
+        FileNotFoundError: Se file non esiste
+        ValidationError: Se CSV malformato o non leggibile
+
+    Example:
+        >>> profile = profile_csv('clienti.csv', {'separator': ';'})
+        >>> profile.columns['nome'].max_length
+        30
+        >>> df = pd.read_csv('clienti.csv', sep=';', dtype=profile.dtypes())
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"File non trovato: {file_path}")
+
+    settings = {
+        "separator": ";",
+        "encoding": "utf-8",
+        "has_header": True,
+        "decimal": ".",
+        "quotechar": '"',
+        "auto_dialect": False,
+    }
+    if config:
+        settings.update(config)
+    if settings["auto_dialect"]:
+        dialect = detect_dialect(str(path))
+        settings.update(
+            {
+                "separator": dialect.delimiter,
+                "quotechar": dialect.quotechar,
+                "has_header": dialect.has_header,
+                "encoding": resolve_encoding(dialect.encoding, settings["encoding"]),
+            }
+        )
+
+    profilers: Dict[str, ColumnProfiler] = {}
+    num_rows = 0
+    try:
+        chunks = pd.read_csv(
+            path,
+            sep=settings["separator"],
+            encoding=settings["encoding"],
+            header=0 if settings["has_header"] else None,
+            quotechar=settings["quotechar"],
+            dtype=str,
+            keep_default_na=False,
+            chunksize=chunksize,
+        )
+        for chunk in chunks:
+            num_rows += len(chunk)
+            for name in chunk.columns:
+                if name not in profilers:
+                    profilers[name] = ColumnProfiler(
+                        name, settings["decimal"], sample_size, precision, seed
+                    )
+                profilers[name].update(chunk[name])
+    except pd.errors.ParserError as e:
+        raise ValidationError(f"Errore nel parsing CSV: {str(e)}")
+    except UnicodeDecodeError:
+        raise ValidationError(
+            f"Errore di encoding. Provare con encoding diverso. "
+            f"Encoding attuale: {settings['encoding']}"
+        )
+
+    profile = CSVProfile(
+        num_rows=num_rows,
+        columns={name: profiler.result() for name, profiler in profilers.items()},
+    )
+    logger.info(
+        f"Profilo calcolato per {path.name}: {num_rows} righe, "
+        f"{len(profile.columns)} colonne"
+    )
+    return profile
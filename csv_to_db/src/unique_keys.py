@@ -0,0 +1,229 @@
+"""
+Rilevamento in streaming di chiavi duplicate (PRIMARY KEY / UNIQUE).
+
+Per ogni riga viene calcolata un'impronta a 64 bit delle colonne chiave; le
+impronte già viste sono conservate in array NumPy ordinati (8 byte per
+chiave) e interrogate con ricerca binaria vettoriale. Oltre max_memory_keys
+impronte gli array vengono scritti su disco e interrogati tramite memory map,
+così la memoria resta limitata anche per file più grandi della RAM.
+
+Le chiavi già presenti nella tabella di destinazione si verificano con una
+query per lotto (WHERE chiave IN (...)), che usa l'indice della chiave.
+
+Due chiavi diverse con la stessa impronta (probabilità ~n²/2^65) vengono
+segnalate come duplicate: il controllo può dare falsi positivi, mai falsi
+negativi.
+"""
+
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.database.base import DatabaseAdapter
+
+logger = logging.getLogger(__name__)
+
+# Impronte conservate in memoria prima di scrivere su disco (~8 byte l'una)
+DEFAULT_MAX_MEMORY_KEYS = 5_000_000
+
+# Array ordinati in memoria oltre i quali vengono fusi in uno solo
+MAX_MEMORY_RUNS = 8
+
+# Chiavi per query nel controllo sulla tabella (sotto il limite di parametri SQLite)
+DEFAULT_QUERY_BATCH_SIZE = 500
+
+
+def key_fingerprints(df: pd.DataFrame, key_columns: List[str]) -> np.ndarray:
+    """
+    Impronte a 64 bit delle chiavi di ogni riga.
+
+    Le colonne numeriche sono confrontate come float64 e le altre come
+    testo, così la stessa chiave ha la stessa impronta indipendentemente dal
+    dtype dedotto da pandas per il blocco o restituito dal database.
+
+    Args:
+        df: DataFrame
+        key_columns: Colonne della chiave
+
+    Returns:
+        Array uint64 con un'impronta per riga
+    """
+    normalized = pd.DataFrame(index=df.index)
+    for name in key_columns:
+        values = df[name]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            normalized[name] = values.astype("float64")
+        else:
+            normalized[name] = values.astype("string")
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy(dtype=np.uint64)
+
+
+class DuplicateKeyDetector:
+    """Insieme compatto di impronte delle chiavi viste, aggiornato a blocchi."""
+
+    def __init__(
+        self,
+        key_columns: List[str],
+        max_memory_keys: int = DEFAULT_MAX_MEMORY_KEYS,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Inizializza il rilevatore.
+
+        Args:
+            key_columns: Colonne della chiave (es. chiave primaria da get_table_schema)
+            max_memory_keys: Impronte in memoria oltre le quali si scrive su disco
+            spill_dir: Cartella per i file temporanei (default: cartella temporanea
+                di sistema)
+
+        Example:
+            >>> with DuplicateKeyDetector(['id']) as detector:
+            ...     for chunk in reader.read_chunks(100_000):
+            ...         duplicated = detector.find_duplicates(chunk)
+        """
+        self.key_columns = list(key_columns)
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = spill_dir
+        self.key_count = 0
+        self._memory_runs: List[np.ndarray] = []
+        self._disk_runs: List[np.ndarray] = []
+        self._temp_dir: Optional[Path] = None
+
+    @property
+    def memory_key_count(self) -> int:
+        """Impronte conservate in memoria."""
+        return sum(len(run) for run in self._memory_runs)
+
+    def _contains(self, fingerprints: np.ndarray) -> np.ndarray:
+        """Maschera delle impronte già viste (ricerca binaria su ogni array)."""
+        found = np.zeros(len(fingerprints), dtype=bool)
+        for run in self._memory_runs + self._disk_runs:
+            positions = np.searchsorted(run, fingerprints)
+            positions[positions == len(run)] = 0
+            found |= run[positions] == fingerprints
+        return found
+
+    def _add(self, fingerprints: np.ndarray) -> None:
+        """Aggiunge impronte nuove e distinte."""
+        if not len(fingerprints):
+            return
+        self._memory_runs.append(np.sort(fingerprints))
+        self.key_count += len(fingerprints)
+
+        if self.memory_key_count > self.max_memory_keys:
+            self._spill()
+        elif len(self._memory_runs) > MAX_MEMORY_RUNS:
+            self._memory_runs = [np.sort(np.concatenate(self._memory_runs))]
+
+    def _spill(self) -> None:
+        """Scrive le impronte in memoria su disco come unico array ordinato."""
+        if self._temp_dir is None:
+            self._temp_dir = Path(tempfile.mkdtemp(prefix="csv_to_db_keys_", dir=self.spill_dir))
+        run = np.sort(np.concatenate(self._memory_runs))
+        path = self._temp_dir / f"run_{len(self._disk_runs):05d}.npy"
+        np.save(path, run)
+        self._disk_runs.append(np.load(path, mmap_mode="r"))
+        self._memory_runs = []
+        logger.debug(f"Scritte su disco {len(run)} impronte di chiave: {path}")
+
+    def find_duplicates(self, chunk: pd.DataFrame) -> pd.Series:
+        """
+        Righe del blocco con chiave già vista (nel blocco stesso o nei
+        precedenti) e registra le chiavi nuove. Le righe con chiave NULL sono
+        ignorate.
+
+        Args:
+            chunk: Blocco di righe
+
+        Returns:
+            Maschera booleana (stesso indice del blocco): True per i duplicati
+
+        Example:
+            >>> detector.find_duplicates(pd.DataFrame({'id': [1, 2, 1]})).tolist()
+            [False, False, True]
+        """
+        has_key = chunk[self.key_columns].notna().all(axis=1).to_numpy()
+        fingerprints = key_fingerprints(chunk, self.key_columns)
+
+        duplicated = np.zeros(len(chunk), dtype=bool)
+        duplicated[has_key] = pd.Series(fingerprints[has_key]).duplicated().to_numpy()
+        candidates = has_key & ~duplicated
+        duplicated[candidates] = self._contains(fingerprints[candidates])
+
+        self._add(fingerprints[has_key & ~duplicated])
+        return pd.Series(duplicated, index=chunk.index)
+
+    def find_existing(
+        self,
+        adapter: DatabaseAdapter,
+        table_name: str,
+        chunk: pd.DataFrame,
+        batch_size: int = DEFAULT_QUERY_BATCH_SIZE,
+    ) -> pd.Series:
+        """
+        Righe del blocco la cui chiave è già presente nella tabella.
+
+        Per ogni lotto di batch_size chiavi distinte viene eseguita una sola
+        query SELECT ... WHERE chiave IN (...), risolta con l'indice della
+        chiave primaria.
+
+        Args:
+            adapter: Adapter connesso al database
+            table_name: Tabella di destinazione
+            chunk: Blocco di righe
+            batch_size: Chiavi per query
+
+        Returns:
+            Maschera booleana (stesso indice del blocco): True per le chiavi esistenti
+
+        Example:
+            >>> detector.find_existing(adapter, 'users', chunk).sum()
+            2
+        """
+        keys = chunk[self.key_columns].dropna().drop_duplicates()
+        fingerprints = key_fingerprints(chunk, self.key_columns)
+        existing: List[np.ndarray] = []
+
+        columns = ", ".join(f'"{name}"' for name in self.key_columns)
+        for start in range(0, len(keys), batch_size):
+            batch = keys.iloc[start : start + batch_size]
+            if len(self.key_columns) == 1:
+                placeholders = ", ".join("?" * len(batch))
+                condition = f"{columns} IN ({placeholders})"
+            else:
+                row = "(" + ", ".join("?" * len(self.key_columns)) + ")"
+                condition = f"({columns}) IN (VALUES {', '.join([row] * len(batch))})"
+            params = tuple(
+                value.item() if isinstance(value, np.generic) else value
+                for value in batch.to_numpy(dtype=object).ravel()
+            )
+            found = adapter.execute_query(
+                f'SELECT {columns} FROM "{table_name}" WHERE {condition}', params
+            )
+            if len(found):
+                existing.append(key_fingerprints(found, self.key_columns))
+
+        if not existing:
+            return pd.Series(False, index=chunk.index)
+        mask = np.isin(fingerprints, np.concatenate(existing))
+        mask &= chunk[self.key_columns].notna().all(axis=1).to_numpy()
+        return pd.Series(mask, index=chunk.index)
+
+    def close(self) -> None:
+        """Rilascia le impronte e cancella i file temporanei."""
+        self._memory_runs = []
+        self._disk_runs = []
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
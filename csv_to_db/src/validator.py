@@ -0,0 +1,443 @@
+"""
+Validazione dei dati CSV rispetto allo schema della tabella di destinazione.
+
+Lo schema è quello restituito da DatabaseAdapter.get_table_schema. Ogni
+controllo (lunghezza VARCHAR, tipi numerici e date, NOT NULL, chiave primaria)
+è un'operazione vettoriale pandas/NumPy sull'intera colonna, senza cicli per
+riga. I DataFrame grandi si validano a blocchi con validate_chunks: per ogni
+colonna e controllo il risultato conserva il numero di righe non valide e gli
+indici delle prime max_examples.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.database.base import DatabaseAdapter
+from src.profiler import DATE_FORMATS
+from src.unique_keys import DEFAULT_MAX_MEMORY_KEYS, DuplicateKeyDetector
+
+logger = logging.getLogger(__name__)
+
+# Tipi SQL (senza lunghezza) per famiglia
+INTEGER_TYPES = {"INTEGER", "INT", "BIGINT", "SMALLINT", "TINYINT", "MEDIUMINT"}
+DECIMAL_TYPES = {"REAL", "FLOAT", "DOUBLE", "NUMERIC", "DECIMAL", "MONEY"}
+DATE_TYPES = {"DATE", "DATETIME", "TIMESTAMP", "DATETIME2", "SMALLDATETIME"}
+
+# Indici di esempio conservati per ogni problema
+DEFAULT_MAX_EXAMPLES = 10
+
+# Nomi dei controlli
+CHECK_LENGTH = "length"
+CHECK_TYPE = "type"
+CHECK_NOT_NULL = "not_null"
+CHECK_UNIQUE = "unique"
+CHECK_EXISTING = "existing_key"
+CHECK_MISSING = "missing_column"
+CHECK_EXTRA = "extra_column"
+
+
+@dataclass
+class ValidationIssue:
+    """Problema rilevato su una colonna: conteggio e prime righe coinvolte."""
+
+    column: str
+    check: str
+    message: str
+    count: int = 0
+    rows: List[int] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        if not self.count:
+            return f"[{self.column}] {self.message}"
+        rows = ", ".join(str(row) for row in self.rows)
+        more = ", ..." if self.count > len(self.rows) else ""
+        examples = f" (righe: {rows}{more})" if rows else ""
+        return f"[{self.column}] {self.message}: {self.count}{examples}"
+
+
+@dataclass
+class ValidationResult:
+    """Esito di una validazione: errori (bloccanti) e avvisi."""
+
+    errors: List[ValidationIssue] = field(default_factory=list)
+    warnings: List[ValidationIssue] = field(default_factory=list)
+    rows_checked: int = 0
+
+    @property
+    def is_valid(self) -> bool:
+        """True se non ci sono errori."""
+        return not self.errors
+
+    def merge(
+        self, other: "ValidationResult", max_examples: int = DEFAULT_MAX_EXAMPLES
+    ) -> None:
+        """
+        Somma l'esito di un altro blocco (stessa colonna e controllo: conteggi
+        sommati, righe di esempio accodate fino a max_examples).
+
+        Args:
+            other: Esito da unire
+            max_examples: Righe di esempio conservate per problema
+        """
+        self.rows_checked += other.rows_checked
+        for mine, theirs in ((self.errors, other.errors), (self.warnings, other.warnings)):
+            by_key = {(issue.column, issue.check): issue for issue in mine}
+            for issue in theirs:
+                existing = by_key.get((issue.column, issue.check))
+                if existing is None:
+                    issue = ValidationIssue(
+                        issue.column, issue.check, issue.message, issue.count, list(issue.rows)
+                    )
+                    mine.append(issue)
+                    by_key[(issue.column, issue.check)] = issue
+                else:
+                    existing.count += issue.count
+                    free = max_examples - len(existing.rows)
+                    existing.rows.extend(issue.rows[:free])
+
+
+class DataValidator:
+    """Validatore vettoriale di DataFrame rispetto a uno schema database."""
+
+    def __init__(
+        self,
+        schema: dict,
+        max_examples: int = DEFAULT_MAX_EXAMPLES,
+        decimal: str = ".",
+        date_formats: Optional[List[str]] = None,
+    ):
+        """
+        Inizializza con schema database.
+
+        Args:
+            schema: Schema nel formato di DatabaseAdapter.get_table_schema
+                ({colonna: {type, max_length, nullable, primary_key}})
+            max_examples: Indici di riga conservati per ogni problema
+            decimal: Carattere decimale dei valori numerici letti come testo
+            date_formats: Formati data accettati (default: src.profiler.DATE_FORMATS)
+
+        Example:
+            >>> validator = DataValidator(adapter.get_table_schema('users'))
+            >>> result = validator.validate(df)
+            >>> print(validator.generate_report([result]))
+        """
+        self.schema = schema
+        self.max_examples = max_examples
+        self.decimal = decimal
+        self.date_formats = list(date_formats or DATE_FORMATS)
+
+    def _issue(
+        self, column: str, check: str, message: str, invalid: pd.Series
+    ) -> Optional[ValidationIssue]:
+        """Crea il problema dalla maschera delle righe non valide (None se nessuna)."""
+        count = int(invalid.sum())
+        if not count:
+            return None
+        rows = invalid.index[invalid.to_numpy()][: self.max_examples]
+        return ValidationIssue(column, check, message, count, [int(row) for row in rows])
+
+    @property
+    def primary_key(self) -> List[str]:
+        """Colonne della chiave primaria nello schema."""
+        return [name for name, spec in self.schema.items() if spec.get("primary_key")]
+
+    def _columns(self, df: pd.DataFrame) -> List[Tuple[str, dict]]:
+        """Colonne dello schema presenti nel DataFrame."""
+        return [(name, spec) for name, spec in self.schema.items() if name in df.columns]
+
+    def validate_field_lengths(self, df: pd.DataFrame) -> ValidationResult:
+        """
+        Valida lunghezza dei campi con max_length (es. VARCHAR(50)).
+
+        Args:
+            df: DataFrame da validare
+
+        Returns:
+            ValidationResult con un errore per colonna con valori troppo lunghi
+
+        Example:
+            >>> result = validator.validate_field_lengths(df)
+            >>> print(result.errors[0])
+            [nome] Valori oltre 50 caratteri: 2 (righe: 4, 17)
+        """
+        result = ValidationResult(rows_checked=len(df))
+        for name, spec in self._columns(df):
+            max_length = spec.get("max_length")
+            if not max_length:
+                continue
+            values = df[name]
+            lengths = values.astype("string").str.len()
+            invalid = (lengths > max_length).fillna(False).astype(bool)
+            issue = self._issue(
+                name, CHECK_LENGTH, f"Valori oltre {max_length} caratteri", invalid
+            )
+            if issue:
+                result.errors.append(issue)
+        return result
+
+    def _numeric(self, values: pd.Series) -> pd.Series:
+        """Valori convertiti in numero (NaN se non numerici)."""
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            return values.astype("float64")
+        text = values.astype("string").str.strip()
+        if self.decimal != ".":
+            text = text.str.replace(self.decimal, ".", regex=False)
+        return pd.to_numeric(text, errors="coerce").astype("float64")
+
+    def _dates(self, values: pd.Series) -> pd.Series:
+        """Valori convertiti in data con il primo formato valido (NaT se nessuno)."""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        text = values.astype("string").str.strip()
+        parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+        for date_format in self.date_formats:
+            missing = parsed.isna()
+            if not missing.any():
+                break
+            parsed[missing] = pd.to_datetime(
+                text[missing], format=date_format, errors="coerce"
+            )
+        return parsed
+
+    def validate_data_types(self, df: pd.DataFrame) -> ValidationResult:
+        """
+        Valida tipi di dati: interi, numeri decimali e date.
+
+        I valori NULL non sono errori di tipo (vedi validate_constraints).
+
+        Args:
+            df: DataFrame da validare
+
+        Returns:
+            ValidationResult con un errore per colonna con valori non convertibili
+
+        Example:
+            >>> result = validator.validate_data_types(df)
+            >>> result.errors[0].check, result.errors[0].count
+            ('type', 3)
+        """
+        result = ValidationResult(rows_checked=len(df))
+        for name, spec in self._columns(df):
+            sql_type = spec.get("type", "").upper()
+            values = df[name]
+            present = values.notna()
+
+            if sql_type in INTEGER_TYPES:
+                numbers = self._numeric(values)
+                invalid = present & (numbers.isna() | (np.floor(numbers) != numbers))
+                message = "Valori non interi"
+            elif sql_type in DECIMAL_TYPES:
+                invalid = present & self._numeric(values).isna()
+                message = "Valori non numerici"
+            elif sql_type in DATE_TYPES:
+                invalid = present & self._dates(values).isna()
+                message = "Date non valide"
+            else:
+                continue
+
+            issue = self._issue(name, CHECK_TYPE, message, invalid.astype(bool))
+            if issue:
+                result.errors.append(issue)
+        return result
+
+    def validate_constraints(
+        self, df: pd.DataFrame, check_unique: bool = True
+    ) -> ValidationResult:
+        """
+        Valida vincoli: colonne NOT NULL presenti e valorizzate, chiave
+        primaria senza duplicati nel DataFrame. Le colonne non presenti
+        nello schema sono segnalate come avvisi.
+
+        Args:
+            df: DataFrame da validare
+            check_unique: Controlla i duplicati della chiave primaria nel
+                DataFrame (validate_chunks li controlla tra tutti i blocchi)
+
+        Returns:
+            ValidationResult con errori e avvisi
+
+        Example:
+            >>> result = validator.validate_constraints(df)
+            >>> print(result.errors[0])
+            [cognome] Valori NULL in colonna NOT NULL: 1 (righe: 3)
+        """
+        result = ValidationResult(rows_checked=len(df))
+
+        for name, spec in self.schema.items():
+            if spec.get("nullable", True):
+                continue
+            if name not in df.columns:
+                result.errors.append(
+                    ValidationIssue(
+                        name, CHECK_MISSING, "Colonna NOT NULL assente nel CSV", len(df)
+                    )
+                )
+                continue
+            issue = self._issue(
+                name, CHECK_NOT_NULL, "Valori NULL in colonna NOT NULL", df[name].isna()
+            )
+            if issue:
+                result.errors.append(issue)
+
+        primary_key = self.primary_key
+        if (
+            check_unique
+            and primary_key
+            and all(name in df.columns for name in primary_key)
+        ):
+            duplicated = df.duplicated(subset=primary_key, keep="first")
+            issue = self._issue(
+                ", ".join(primary_key),
+                CHECK_UNIQUE,
+                "Chiave primaria duplicata",
+                duplicated,
+            )
+            if issue:
+                result.errors.append(issue)
+
+        for name in df.columns:
+            if name not in self.schema:
+                result.warnings.append(
+                    ValidationIssue(name, CHECK_EXTRA, "Colonna non presente nella tabella")
+                )
+
+        return result
+
+    def validate_unique_keys(
+        self,
+        chunk: pd.DataFrame,
+        detector: DuplicateKeyDetector,
+        adapter: Optional[DatabaseAdapter] = None,
+        table_name: Optional[str] = None,
+    ) -> ValidationResult:
+        """
+        Valida la chiave primaria di un blocco rispetto ai blocchi precedenti
+        e, se indicata, alle righe già presenti nella tabella.
+
+        Args:
+            chunk: Blocco da validare
+            detector: Impronte delle chiavi dei blocchi precedenti (aggiornate)
+            adapter: Adapter connesso (opzionale)
+            table_name: Tabella in cui cercare le chiavi esistenti (con adapter)
+
+        Returns:
+            ValidationResult con chiavi duplicate e chiavi già presenti
+        """
+        result = ValidationResult(rows_checked=len(chunk))
+        if not all(name in chunk.columns for name in detector.key_columns):
+            return result
+
+        column = ", ".join(detector.key_columns)
+        issue = self._issue(
+            column, CHECK_UNIQUE, "Chiave primaria duplicata", detector.find_duplicates(chunk)
+        )
+        if issue:
+            result.errors.append(issue)
+
+        if adapter is not None and table_name:
+            issue = self._issue(
+                column,
+                CHECK_EXISTING,
+                "Chiave primaria già presente nella tabella",
+                detector.find_existing(adapter, table_name, chunk),
+            )
+            if issue:
+                result.errors.append(issue)
+        return result
+
+    def validate(self, df: pd.DataFrame, check_unique: bool = True) -> ValidationResult:
+        """
+        Esegue tutti i controlli su un DataFrame.
+
+        Args:
+            df: DataFrame da validare
+            check_unique: Controlla i duplicati della chiave primaria
+
+        Returns:
+            ValidationResult complessivo
+        """
+        result = ValidationResult()
+        for partial in (
+            self.validate_field_lengths(df),
+            self.validate_data_types(df),
+            self.validate_constraints(df, check_unique),
+        ):
+            result.merge(partial, self.max_examples)
+        result.rows_checked = len(df)
+
+        logger.info(
+            f"Validate {len(df)} righe: {len(result.errors)} errori, "
+            f"{len(result.warnings)} avvisi"
+        )
+        return result
+
+    def validate_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        adapter: Optional[DatabaseAdapter] = None,
+        table_name: Optional[str] = None,
+        max_memory_keys: int = DEFAULT_MAX_MEMORY_KEYS,
+    ) -> ValidationResult:
+        """
+        Valida un DataFrame letto a blocchi (es. CSVReader.read_chunks).
+
+        Gli indici di riga sono quelli dei blocchi: con pd.read_csv(chunksize=...)
+        proseguono da un blocco all'altro. I duplicati della chiave primaria
+        sono cercati tra tutti i blocchi (vedi src.unique_keys) e, con adapter
+        e table_name, anche tra le righe già presenti nella tabella.
+
+        Args:
+            chunks: Blocchi da validare
+            adapter: Adapter connesso (opzionale)
+            table_name: Tabella in cui cercare le chiavi esistenti (con adapter)
+            max_memory_keys: Impronte di chiave in memoria prima di usare il disco
+
+        Returns:
+            ValidationResult complessivo
+
+        Example:
+            >>> result = validator.validate_chunks(reader.read_chunks(100_000))
+            >>> result.is_valid
+            True
+        """
+        result = ValidationResult()
+        primary_key = self.primary_key
+        with DuplicateKeyDetector(primary_key, max_memory_keys) as detector:
+            for chunk in chunks:
+                result.merge(self.validate(chunk, check_unique=False), self.max_examples)
+                if primary_key:
+                    unique = self.validate_unique_keys(chunk, detector, adapter, table_name)
+                    unique.rows_checked = 0
+                    result.merge(unique, self.max_examples)
+        return result
+
+    def generate_report(self, results: List[ValidationResult]) -> str:
+        """
+        Genera report testuale delle validazioni.
+
+        Args:
+            results: Esiti da riportare (es. uno per file)
+
+        Returns:
+            Report su più righe
+
+        Example:
+            >>> print(validator.generate_report([result]))
+            Righe validate: 1000
+            Errori: 1
+              [nome] Valori oltre 50 caratteri: 2 (righe: 4, 17)
+            Avvisi: 0
+        """
+        total = ValidationResult()
+        for result in results:
+            total.merge(result, self.max_examples)
+
+        lines = [f"Righe validate: {total.rows_checked}", f"Errori: {len(total.errors)}"]
+        lines.extend(f"  {issue}" for issue in total.errors)
+        lines.append(f"Avvisi: {len(total.warnings)}")
+        lines.extend(f"  {issue}" for issue in total.warnings)
+        return "\n".join(lines)
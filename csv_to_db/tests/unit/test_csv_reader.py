@@ -214,3 +214,47 @@ class TestCSVReaderDetectEncoding:
         with patch("builtins.__import__", side_effect=ImportError):
             encoding = reader.detect_encoding()
             assert encoding == "utf-8"  # Fallback a config default
+
+
+class TestCSVReaderAutoDialect:
+    """Test per rilevamento automatico del formato."""
+
+    def test_read_comma_with_auto_dialect(self, temp_csv_comma):
+        """Test lettura CSV con virgola senza indicare il separatore."""
+        reader = CSVReader(temp_csv_comma, {"auto_dialect": True})
+        df = reader.read()
+
+        assert list(df.columns) == ["col1", "col2", "col3"]
+        assert reader.config["separator"] == ","
+
+    def test_auto_dialect_keeps_encoding_for_ascii_sample(self, tmp_path):
+        """Test encoding configurato mantenuto se il campione è solo ASCII."""
+        rows = ["id;nome"] + [f"{i};Mario" for i in range(2000)] + ["2000;Niccolò"]
+        csv_file = tmp_path / "ascii_head.csv"
+        csv_file.write_bytes("\n".join(rows).encode("windows-1252") + b"\n")
+
+        reader = CSVReader(
+            str(csv_file), {"auto_dialect": True, "encoding": "windows-1252"}
+        )
+        df = reader.read()
+
+        assert reader.config["encoding"] == "windows-1252"
+        assert df.iloc[-1]["nome"] == "Niccolò"
+
+    def test_auto_dialect_windows1252(self, temp_csv_windows1252):
+        """Test rilevamento encoding non UTF-8 dal campione."""
+        reader = CSVReader(temp_csv_windows1252, {"auto_dialect": True})
+        df = reader.read()
+
+        assert df.iloc[0]["città"] == "Città con àccenti"
+
+    def test_auto_dialect_without_header(self, tmp_path):
+        """Test CSV senza intestazioni."""
+        csv_file = tmp_path / "no_header.csv"
+        csv_file.write_text("1;10,5\n2;20,0\n", encoding="utf-8")
+
+        reader = CSVReader(str(csv_file), {"auto_dialect": True})
+        df = reader.read()
+
+        assert reader.config["has_header"] is False
+        assert len(df) == 2
@@ -222,6 +222,160 @@ class TestSQLiteAdapterInsert:
         adapter.close()
 
 
+class TestSQLiteAdapterUpsert:
+    """Test per import in modalità upsert."""
+
+    def test_upsert_counts_inserted_updated_unchanged(self, test_database_with_table):
+        """Test conteggi righe inserite, aggiornate e invariate."""
+        adapter = SQLiteAdapter()
+        adapter.connect(test_database_with_table)
+
+        df = pd.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "nome": ["Mario", "Luigi", "Anna"],
+                "cognome": ["Rossi", "Verdi", "Bianchi"],
+                "eta": [30, 26, None],
+                "email": ["mario@test.it", "luigi@test.it", None],
+            }
+        )
+
+        counts = adapter.upsert_dataframe(df, "users", batch_size=2)
+
+        assert counts == {"inserted": 1, "updated": 1, "unchanged": 1}
+        result = adapter.execute_query("SELECT id, eta, email FROM users ORDER BY id")
+        assert result["eta"].tolist()[:2] == [30, 26]
+        assert result["email"].isna().tolist() == [False, False, True]
+
+        adapter.close()
+
+    def test_upsert_mode_in_insert_dataframe(self, test_database_with_table):
+        """Test if_exists='upsert' restituisce righe inserite o aggiornate."""
+        adapter = SQLiteAdapter()
+        adapter.connect(test_database_with_table)
+        df = pd.DataFrame({"id": [1, 5], "nome": ["Mario2", "Eva"], "cognome": ["R", "N"]})
+
+        rows = adapter.insert_dataframe(df, "users", if_exists="upsert")
+
+        assert rows == 2
+        result = adapter.execute_query("SELECT nome, eta FROM users WHERE id = 1")
+        assert result.iloc[0]["nome"] == "Mario2"
+        # Colonne assenti nel DataFrame non vengono modificate
+        assert result.iloc[0]["eta"] == 30
+
+        adapter.close()
+
+    def test_upsert_composite_primary_key(self, temp_db):
+        """Test upsert su chiave primaria composta."""
+        adapter = SQLiteAdapter()
+        adapter.connect(temp_db)
+        adapter.connection.execute(
+            "CREATE TABLE righe (serie TEXT, numero INTEGER, importo REAL, "
+            "PRIMARY KEY (serie, numero))"
+        )
+        adapter.connection.execute("INSERT INTO righe VALUES ('A', 1, 10.0)")
+        adapter.connection.commit()
+
+        assert adapter.get_table_schema("righe")["numero"]["primary_key"] is True
+
+        df = pd.DataFrame(
+            {"serie": ["A", "A", "B"], "numero": [1, 2, 1], "importo": [11.5, 2.0, 3.0]}
+        )
+        counts = adapter.upsert_dataframe(df, "righe")
+
+        assert counts == {"inserted": 2, "updated": 1, "unchanged": 0}
+
+        adapter.close()
+
+    def test_upsert_rolls_back_on_error(self, test_database_with_table):
+        """Test nessuna modifica se un lotto fallisce."""
+        adapter = SQLiteAdapter()
+        adapter.connect(test_database_with_table)
+        df = pd.DataFrame(
+            {"id": [3, 4], "nome": ["Anna", None], "cognome": ["Bianchi", "Neri"]}
+        )
+
+        with pytest.raises(DatabaseConnectionError, match="upsert"):
+            adapter.upsert_dataframe(df, "users", batch_size=1)
+
+        assert len(adapter.execute_query("SELECT * FROM users")) == 2
+
+        adapter.close()
+
+    def test_upsert_without_primary_key_in_dataframe(self, test_database_with_table):
+        """Test errore se il DataFrame non contiene la chiave primaria."""
+        adapter = SQLiteAdapter()
+        adapter.connect(test_database_with_table)
+        df = pd.DataFrame({"nome": ["Test"], "cognome": ["Test"]})
+
+        with pytest.raises(ValueError, match="chiave"):
+            adapter.upsert_dataframe(df, "users")
+
+        adapter.close()
+
+
+class TestSQLiteAdapterReload:
+    """Test per ricaricamento tramite tabella di appoggio."""
+
+    def test_reload_preserves_types_and_indexes(self, test_database_with_table):
+        """Test contenuto sostituito con definizione e indici conservati."""
+        adapter = SQLiteAdapter()
+        adapter.connect(test_database_with_table)
+        adapter.connection.execute("CREATE INDEX idx_users_email ON users (email)")
+        adapter.connection.commit()
+
+        df = pd.DataFrame(
+            {
+                "nome": ["Anna", "Paolo", "Eva"],
+                "cognome": ["Bianchi", "Neri", "Verdi"],
+                "eta": [28, None, 41],
+            }
+        )
+        rows = adapter.reload_dataframe(df, "users", batch_size=2)
+
+        assert rows == 3
+        result = adapter.execute_query("SELECT * FROM users ORDER BY id")
+        assert result["nome"].tolist() == ["Anna", "Paolo", "Eva"]
+        schema = adapter.get_table_schema("users")
+        assert schema["nome"]["type"] == "VARCHAR"
+        assert schema["nome"]["max_length"] == 50
+        assert schema["nome"]["nullable"] is False
+        indexes = adapter.execute_query(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'users'"
+        )
+        assert "idx_users_email" in indexes["name"].tolist()
+        tables = adapter.execute_query("SELECT name FROM sqlite_master WHERE type = 'table'")
+        assert "users__staging" not in tables["name"].tolist()
+
+        adapter.close()
+
+    def test_reload_failure_keeps_original_table(self, test_database_with_table):
+        """Test tabella originale invariata se il caricamento fallisce."""
+        adapter = SQLiteAdapter()
+        adapter.connect(test_database_with_table)
+        df = pd.DataFrame({"nome": ["Anna", None], "cognome": ["Bianchi", "Neri"]})
+
+        with pytest.raises(DatabaseConnectionError, match="appoggio"):
+            adapter.insert_dataframe(df, "users", if_exists="reload")
+
+        result = adapter.execute_query("SELECT nome FROM users ORDER BY id")
+        assert result["nome"].tolist() == ["Mario", "Luigi"]
+        tables = adapter.execute_query("SELECT name FROM sqlite_master WHERE type = 'table'")
+        assert "users__staging" not in tables["name"].tolist()
+
+        adapter.close()
+
+    def test_reload_unknown_columns(self, test_database_with_table):
+        """Test errore con colonne non presenti nella tabella."""
+        adapter = SQLiteAdapter()
+        adapter.connect(test_database_with_table)
+
+        with pytest.raises(ValueError, match="non presenti"):
+            adapter.reload_dataframe(pd.DataFrame({"altro": [1]}), "users")
+
+        adapter.close()
+
+
 class TestSQLiteAdapterQuery:
     """Test per esecuzione query."""
 
@@ -0,0 +1,121 @@
+"""
+Unit tests per il profiler delle colonne CSV.
+
+Tests per HyperLogLog, reservoir sampling, deduzione tipi e schema.
+"""
+
+import pytest
+from pathlib import Path
+import pandas as pd
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.csv_reader import CSVReader
+from src.profiler import HyperLogLog, Reservoir, profile_csv
+
+
+@pytest.fixture
+def temp_csv_clienti(tmp_path):
+    """Crea CSV temporaneo con colonne di tipo diverso."""
+    csv_file = tmp_path / "clienti.csv"
+    content = (
+        "id;nome;saldo;nascita;cap;note\n"
+        "1;Mario;10,5;1980-01-31;00123;\n"
+        "2;Luigi;-3;1975-12-01;20100;NULL\n"
+        "3;Anna Maria;7,25;2001-06-15;30100;cliente storico\n"
+        "4;Eva;0;1999-02-28;40100;\n"
+    )
+    csv_file.write_text(content, encoding="utf-8")
+    return str(csv_file)
+
+
+def test_hyperloglog_estimate_small_cardinality():
+    """Test stima entro il 3% per pochi valori distinti (linear counting)."""
+    hll = HyperLogLog()
+    values = pd.Series([str(i) for i in range(1000)])
+    hll.add(values)
+    hll.add(values)
+
+    assert abs(hll.estimate() - 1000) <= 30
+
+
+def test_hyperloglog_estimate_large_cardinality():
+    """Test errore entro il 5% oltre la soglia del linear counting."""
+    hll = HyperLogLog(precision=10)
+    hll.add(pd.Series([f"valore-{i}" for i in range(50_000)]))
+
+    assert abs(hll.estimate() - 50_000) / 50_000 < 0.05
+
+
+def test_hyperloglog_merge():
+    """Test unione di due stime."""
+    first, second = HyperLogLog(), HyperLogLog()
+    first.add(pd.Series([str(i) for i in range(500)]))
+    second.add(pd.Series([str(i) for i in range(250, 750)]))
+    first.merge(second)
+
+    assert abs(first.estimate() - 750) <= 25
+
+
+def test_reservoir_keeps_fixed_size_uniform_sample():
+    """Test campione di dimensione fissa con valori da tutti i blocchi."""
+    reservoir = Reservoir(size=100, seed=1)
+    for start in range(0, 10_000, 1000):
+        reservoir.add(pd.Series(range(start, start + 1000)))
+
+    sample = reservoir.sample()
+    assert len(sample) == 100
+    assert len(set(sample)) == 100
+    assert max(sample) >= 5000
+
+
+def test_profile_infers_types_and_lengths(temp_csv_clienti):
+    """Test tipi dedotti, lunghezze e NULL per colonna."""
+    profile = profile_csv(temp_csv_clienti, {"decimal": ","}, chunksize=2)
+    columns = profile.columns
+
+    assert profile.num_rows == 4
+    assert columns["id"].inferred_type == "INTEGER"
+    assert columns["saldo"].inferred_type == "REAL"
+    assert columns["nascita"].inferred_type == "DATE"
+    assert columns["cap"].inferred_type == "VARCHAR"
+    assert columns["nome"].min_length == 3
+    assert columns["nome"].max_length == 10
+    assert columns["nome"].length_histogram == {"2-3": 1, "4-7": 2, "8-15": 1}
+    assert columns["note"].null_count == 3
+    assert columns["note"].nullable
+    assert columns["id"].distinct_estimate == 4
+
+
+def test_profile_dtypes_and_schema(temp_csv_clienti):
+    """Test dtype suggeriti e CREATE TABLE generato."""
+    profile = profile_csv(temp_csv_clienti, {"decimal": ","})
+
+    assert profile.dtypes()["id"] == "Int64"
+    assert profile.dtypes()["cap"] == "string"
+    assert profile.date_columns() == ["nascita"]
+
+    schema = profile.to_schema(primary_key=["id"])
+    assert schema["id"]["primary_key"] is True
+    assert schema["nome"] == {
+        "type": "VARCHAR",
+        "max_length": 10,
+        "nullable": False,
+        "primary_key": False,
+    }
+
+    sql = profile.create_table_sql("clienti", primary_key=["id"])
+    assert '"id" INTEGER NOT NULL' in sql
+    assert '"note" VARCHAR(15)' in sql
+    assert 'PRIMARY KEY ("id")' in sql
+
+
+def test_reader_profile_drives_dtypes(temp_csv_clienti):
+    """Test lettura con i dtype suggeriti dal profilo."""
+    reader = CSVReader(temp_csv_clienti, {"decimal": ","})
+    reader.config["dtype"] = reader.profile().dtypes()
+    df = reader.read()
+
+    assert str(df["id"].dtype) == "Int64"
+    assert df["cap"].iloc[0] == "00123"
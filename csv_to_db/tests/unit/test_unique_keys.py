@@ -0,0 +1,118 @@
+"""
+Unit tests per il rilevamento in streaming di chiavi duplicate.
+
+Tests per duplicati tra blocchi, scrittura su disco e chiavi già in tabella.
+"""
+
+import pytest
+import sqlite3
+from pathlib import Path
+import pandas as pd
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.database.sqlite_adapter import SQLiteAdapter
+from src.unique_keys import DuplicateKeyDetector, key_fingerprints
+from src.validator import DataValidator
+
+
+@pytest.fixture
+def adapter_with_keys(tmp_path):
+    """Adapter connesso a un database con chiavi 1..3 e ('A', 1)."""
+    db_file = tmp_path / "keys.db"
+    conn = sqlite3.connect(str(db_file))
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, nome VARCHAR(20))")
+    conn.execute(
+        "CREATE TABLE righe (serie TEXT, numero INTEGER, PRIMARY KEY (serie, numero))"
+    )
+    conn.executemany("INSERT INTO users VALUES (?, ?)", [(1, "a"), (2, "b"), (3, "c")])
+    conn.execute("INSERT INTO righe VALUES ('A', 1)")
+    conn.commit()
+    conn.close()
+
+    adapter = SQLiteAdapter()
+    adapter.connect(str(db_file))
+    yield adapter
+    adapter.close()
+
+
+def test_fingerprints_ignore_numeric_dtype():
+    """Test stessa impronta per la stessa chiave letta come int o float."""
+    as_int = pd.DataFrame({"id": [1, 2]})
+    as_float = pd.DataFrame({"id": [1.0, 2.0]})
+
+    assert (key_fingerprints(as_int, ["id"]) == key_fingerprints(as_float, ["id"])).all()
+
+
+def test_find_duplicates_across_chunks():
+    """Test duplicati nel blocco e tra blocchi, NULL ignorati."""
+    with DuplicateKeyDetector(["id"]) as detector:
+        first = detector.find_duplicates(pd.DataFrame({"id": [1, 2, 2, None]}))
+        second = detector.find_duplicates(
+            pd.DataFrame({"id": [3, 1, None]}, index=[4, 5, 6])
+        )
+
+    assert first.tolist() == [False, False, True, False]
+    assert second.tolist() == [False, True, False]
+    assert second.index.tolist() == [4, 5, 6]
+
+
+def test_find_duplicates_composite_key():
+    """Test chiave su più colonne."""
+    detector = DuplicateKeyDetector(["serie", "numero"])
+    df = pd.DataFrame({"serie": ["A", "A", "B", "A"], "numero": [1, 2, 1, 1]})
+
+    assert detector.find_duplicates(df).tolist() == [False, False, False, True]
+
+
+def test_find_duplicates_spills_to_disk(tmp_path):
+    """Test impronte scritte su disco oltre max_memory_keys e ancora interrogate."""
+    detector = DuplicateKeyDetector(["id"], max_memory_keys=100, spill_dir=str(tmp_path))
+    for start in range(0, 1000, 50):
+        assert not detector.find_duplicates(pd.DataFrame({"id": range(start, start + 50)})).any()
+
+    assert detector.key_count == 1000
+    assert detector.memory_key_count <= 100
+    assert list(tmp_path.glob("*/run_*.npy"))
+
+    duplicated = detector.find_duplicates(pd.DataFrame({"id": [5, 999, 1000]}))
+    assert duplicated.tolist() == [True, True, False]
+
+    detector.close()
+    assert not list(tmp_path.glob("*/run_*.npy"))
+
+
+def test_find_existing_keys_in_table(adapter_with_keys):
+    """Test chiavi già presenti nella tabella, a lotti."""
+    detector = DuplicateKeyDetector(["id"])
+    chunk = pd.DataFrame({"id": [2, 4, 3, 3, None]})
+
+    existing = detector.find_existing(adapter_with_keys, "users", chunk, batch_size=2)
+
+    assert existing.tolist() == [True, False, True, True, False]
+
+
+def test_find_existing_composite_keys(adapter_with_keys):
+    """Test chiavi composte già presenti nella tabella."""
+    detector = DuplicateKeyDetector(["serie", "numero"])
+    chunk = pd.DataFrame({"serie": ["A", "A", "B"], "numero": [1, 2, 1]})
+
+    existing = detector.find_existing(adapter_with_keys, "righe", chunk)
+
+    assert existing.tolist() == [True, False, False]
+
+
+def test_validate_chunks_checks_keys_across_chunks_and_table(adapter_with_keys):
+    """Test validazione a blocchi con duplicati tra blocchi e chiavi esistenti."""
+    validator = DataValidator(adapter_with_keys.get_table_schema("users"))
+    chunks = [
+        pd.DataFrame({"id": [3, 4, 5], "nome": ["c", "d", "e"]}),
+        pd.DataFrame({"id": [5, 6], "nome": ["e", "f"]}, index=[3, 4]),
+    ]
+
+    result = validator.validate_chunks(chunks, adapter_with_keys, "users")
+
+    checks = {issue.check: (issue.count, issue.rows) for issue in result.errors}
+    assert checks == {"unique": (1, [3]), "existing_key": (1, [0])}
+    assert result.rows_checked == 5
@@ -0,0 +1,153 @@
+"""
+Unit tests per DataValidator.
+
+Tests per lunghezze, tipi, vincoli NOT NULL/chiave primaria e report.
+"""
+
+import pytest
+from pathlib import Path
+import pandas as pd
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.csv_reader import CSVReader
+from src.validator import DataValidator, ValidationResult
+
+
+@pytest.fixture
+def schema():
+    """Schema nel formato di get_table_schema."""
+    return {
+        "id": {"type": "INTEGER", "max_length": None, "nullable": False, "primary_key": True},
+        "nome": {"type": "VARCHAR", "max_length": 5, "nullable": False, "primary_key": False},
+        "saldo": {"type": "REAL", "max_length": None, "nullable": True, "primary_key": False},
+        "nascita": {"type": "DATE", "max_length": None, "nullable": True, "primary_key": False},
+    }
+
+
+@pytest.fixture
+def validator(schema):
+    """Validatore con al più 2 righe di esempio per problema."""
+    return DataValidator(schema, max_examples=2)
+
+
+def test_validate_field_length_within_limit(validator):
+    """Test nessun errore con valori entro max_length."""
+    df = pd.DataFrame({"id": [1, 2], "nome": ["Mario", "Eva"]})
+
+    result = validator.validate_field_lengths(df)
+
+    assert result.is_valid
+    assert result.rows_checked == 2
+
+
+def test_validate_field_length_exceeds_limit(validator):
+    """Test conteggio e prime righe dei valori troppo lunghi."""
+    df = pd.DataFrame({"nome": ["Mario", "Giuseppe", "Eva", "Antonella", "Carlotta"]})
+
+    result = validator.validate_field_lengths(df)
+
+    assert not result.is_valid
+    issue = result.errors[0]
+    assert (issue.column, issue.check, issue.count) == ("nome", "length", 3)
+    assert issue.rows == [1, 3]
+
+
+def test_validate_numeric_fields(validator):
+    """Test interi e decimali non convertibili (NULL ammessi)."""
+    df = pd.DataFrame(
+        {"id": ["1", "2.5", "x", None], "saldo": ["10.5", "abc", None, "-3"]}
+    )
+
+    result = validator.validate_data_types(df)
+
+    counts = {issue.column: (issue.count, issue.rows) for issue in result.errors}
+    assert counts == {"id": (2, [1, 2]), "saldo": (1, [1])}
+
+
+def test_validate_numeric_fields_with_decimal_comma(schema):
+    """Test decimali con virgola."""
+    validator = DataValidator(schema, decimal=",")
+    df = pd.DataFrame({"saldo": ["10,5", "3"]})
+
+    assert validator.validate_data_types(df).is_valid
+
+
+def test_validate_date_fields(validator):
+    """Test date in formati diversi e date non valide."""
+    df = pd.DataFrame({"nascita": ["1980-01-31", "31/12/1999", "2001-02-30", "ieri"]})
+
+    result = validator.validate_data_types(df)
+
+    assert result.errors[0].count == 2
+    assert result.errors[0].rows == [2, 3]
+
+
+def test_validate_not_null_constraints(validator):
+    """Test NULL in colonne NOT NULL e colonne NOT NULL assenti."""
+    df = pd.DataFrame({"id": [1, 2, 3], "saldo": [None, 1.0, 2.0]})
+    df.loc[1, "id"] = None
+
+    result = validator.validate_constraints(df)
+
+    checks = {(issue.column, issue.check): issue.count for issue in result.errors}
+    assert checks == {("id", "not_null"): 1, ("nome", "missing_column"): 3}
+
+
+def test_validate_primary_key_duplicates(validator):
+    """Test duplicati della chiave primaria nel DataFrame."""
+    df = pd.DataFrame({"id": [1, 2, 1, 1], "nome": ["a", "b", "c", "d"]})
+
+    result = validator.validate_constraints(df)
+
+    assert result.errors[0].check == "unique"
+    assert result.errors[0].rows == [2, 3]
+
+
+def test_multiple_validation_errors_per_row(validator):
+    """Test più errori sulla stessa riga riportati per colonna."""
+    df = pd.DataFrame(
+        {"id": [1, None], "nome": ["Mario", "Giuseppe"], "saldo": ["1", "abc"]}
+    )
+
+    result = validator.validate(df)
+
+    assert {issue.column for issue in result.errors} == {"id", "nome", "saldo"}
+    assert all(issue.rows == [1] for issue in result.errors)
+
+
+def test_validate_chunks_merges_counts(tmp_path, validator):
+    """Test validazione a blocchi: conteggi sommati, indici progressivi."""
+    csv_file = tmp_path / "clienti.csv"
+    rows = "\n".join(f"{i};{'nome' if i % 3 else 'troppo lungo'}" for i in range(10))
+    csv_file.write_text("id;nome\n" + rows, encoding="utf-8")
+    reader = CSVReader(str(csv_file))
+
+    result = validator.validate_chunks(reader.read_chunks(chunksize=4))
+
+    assert result.rows_checked == 10
+    assert result.errors[0].count == 4
+    assert result.errors[0].rows == [0, 3]
+
+
+def test_generate_report_with_errors(validator):
+    """Test report con errori e righe di esempio."""
+    df = pd.DataFrame({"id": [1, 2, 3], "nome": ["Giuseppe", "Antonella", "Carlotta"]})
+
+    report = validator.generate_report([validator.validate(df)])
+
+    assert "Righe validate: 3" in report
+    assert "Errori: 1" in report
+    assert "[nome] Valori oltre 5 caratteri: 3 (righe: 0, 1, ...)" in report
+
+
+def test_generate_report_with_warnings(validator):
+    """Test report con colonne extra come avvisi."""
+    df = pd.DataFrame({"id": [1], "nome": ["Eva"], "extra": ["x"]})
+
+    report = validator.generate_report([validator.validate(df), ValidationResult()])
+
+    assert "Errori: 0" in report
+    assert "Avvisi: 1" in report
+    assert "[extra] Colonna non presente nella tabella" in report
@@ -1,5 +1,5 @@
 from flask import (
-    Blueprint, flash, redirect, render_template, request, make_response
+    Blueprint, current_app, flash, redirect, render_template, request, make_response
 )
 from library import pandas_days_for_month
 
@@ -26,8 +26,11 @@ def assegnazioni():
             flash('Nessun file selezionato')
             return redirect(request.url)
         if file and allowed_file(file.filename):
-            result = pandas_days_for_month.main(file)
+            metrics = []
+            result = pandas_days_for_month.main(file, metrics=metrics)
+            current_app.logger.info('%s stages: %s', file.filename, metrics)
             response = make_response(result)
+            response.headers["Server-Timing"] = pandas_days_for_month.server_timing(metrics)
             response.headers["Content-Disposition"] = "attachment; filename=CALCOLATO_" + file.filename + ""
             return response
 
@@ -1,28 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
-def main(file_in, file_out=None):
+logger = logging.getLogger(__name__)
+
+
+def main(
+    file_in,
+    file_out=None,
+    state_file=None,
+    id_column=None,
+    workers=None,
+    metrics: list = None,
+):
     # FILE_OUT = 'data/assegnazioni_calc.csv'
     # TODO calculate index from DataFrame
     START_COLUMN_INDEX = 48
+    DATE_IN = "ASSE. DATA_ING"
+    DATE_OUT = "ASSE. DATA_UN"
+
+    if metrics is None:
+        metrics = []
 
     # print("Debug - Elaborazione dei dati contenuti su:", file_in.filename,  "iniziata")
 
     # .stream.read().decode("windows-1252")
-    ass = pd.read_csv(file_in, sep=";")
+    with stage(metrics, "read_csv") as record:
+        ass = pd.read_csv(file_in, sep=";")
+        record["rows"] = len(ass)
+
+    if state_file is not None:
+        with stage(metrics, "fingerprints", len(ass)):
+            fingerprints = row_fingerprints(ass, DATE_IN, DATE_OUT, id_column)
+
+    with stage(metrics, "parse_dates", len(ass)):
+        ass = parse_dates(ass, DATE_IN, DATE_OUT)
+
+    with stage(metrics, "month_days", len(ass)):
+        if state_file is not None:
+            # rows missing from the state store are computed with the workers too
+            df_final = join_days_for_month_incremental(
+                ass, fingerprints, state_file, workers
+            )
+        elif workers is not None and workers > 1:
+            df_final = join_days_for_month_parallel(ass, workers)
+        else:
+            df_final = join_days_for_month(ass)
+
+    with stage(metrics, "format", len(df_final)):
+        # df_final = price_for_month(df_final, START_COLUMN_INDEX)
+        df_final = replace_char_in_dataframe_columns(
+            df_final, START_COLUMN_INDEX, ".", ","
+        )
 
-    df_final = add_days_for_month(ass, "ASSE. DATA_ING", "ASSE. DATA_UN")
+    # df_final.to_csv(FILE_OUT, sep=';')
 
-    # df_final = price_for_month(df_final, START_COLUMN_INDEX)
-    df_final = replace_char_in_dataframe_columns(df_final, START_COLUMN_INDEX, ".", ",")
+    with stage(metrics, "to_csv", len(df_final)):
+        result = df_final.to_csv(file_out, sep=";")
 
-    # df_final.to_csv(FILE_OUT, sep=';')
+    logger.info(
+        "Stages: %s",
+        ", ".join(f"{m['stage']}={m['seconds']:.3f}s" for m in metrics),
+        extra={"stages": metrics},
+    )
 
     print(
         "Debug - Elaborazione terminata. I risultati sono disponibili nel nuovo file che è stato scaricato"
     )
 
-    return df_final.to_csv(file_out, sep=";")
+    return result
+
+
+@contextmanager
+def stage(metrics: list, name: str, rows: int = None):
+    """
+    Measure a stage of main and append its record to metrics
+
+    The record holds wall time, rows, the peak RSS of the process (where the
+    resource module exists) and the tracemalloc delta (only when tracemalloc
+    is already tracing: starting it here would slow down the stage).
+    The block can update record["rows"].
+
+    :metrics:   list of stage records
+    :name:      name of the stage
+    :rows:      number of rows processed by the stage
+
+    :return:    the record of the stage
+    """
+    record = {"stage": name, "rows": rows}
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        memory_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+
+    yield record
+
+    record["seconds"] = time.perf_counter() - start
+    if tracing:
+        _, peak = tracemalloc.get_traced_memory()
+        record["tracemalloc_delta_mb"] = (peak - memory_start) / 1024 / 1024
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux
+        record["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    metrics.append(record)
+
+
+def server_timing(metrics: list) -> str:
+    """
+    Format stage records as a Server-Timing HTTP header value
+
+    :metrics: list of stage records
+
+    :return: header value, e.g. 'read_csv;dur=12.3, to_csv;dur=4.5'
+    """
+    return ", ".join(f"{m['stage']};dur={m['seconds'] * 1000:.1f}" for m in metrics)
+
+
+def parse_dates(df: pd.DataFrame, date_in: str, date_out: str) -> pd.DataFrame:
+    """
+    Add date_start and date_end datetime columns
+
+    :df: original DataFrame
+    :date_in: name of date_in column
+    :date_out: name of dat_out column
+
+    :return: Dataframe modified
+    """
+    df["date_start"] = pd.to_datetime(df[date_in])
+    df["date_end"] = pd.to_datetime(df[date_out])
+
+    return df
 
 
 def add_days_for_month(df: pd.DataFrame, date_in: str, date_out: str) -> pd.DataFrame:
@@ -36,8 +159,19 @@ def add_days_for_month(df: pd.DataFrame, date_in: str, date_out: str) -> pd.Data
     :return: Dataframe modified
     """
 
-    df["date_start"] = pd.to_datetime(df[date_in])
-    df["date_end"] = pd.to_datetime(df[date_out])
+    return join_days_for_month(parse_dates(df, date_in, date_out))
+
+
+def join_days_for_month(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add columns with number of days for each month between date_start and date_end
+
+    :df: DataFrame with date_start and date_end columns
+
+    :return: Dataframe modified
+    """
+    if df.empty:
+        return df.copy()
 
     df_days = df[["date_start", "date_end"]].apply(days_of_month, axis=1).fillna(0)
     df_final = df.join(df_days)
@@ -45,6 +179,215 @@ def add_days_for_month(df: pd.DataFrame, date_in: str, date_out: str) -> pd.Data
     return df_final
 
 
+def add_days_for_month_parallel(
+    df: pd.DataFrame, date_in: str, date_out: str, workers: int = None
+) -> pd.DataFrame:
+    """
+    Same result as add_days_for_month, with the rows split in shards
+    computed by a pool of processes
+
+    :df: original DataFrame
+    :date_in: name of date_in column
+    :date_out: name of dat_out column
+    :workers: number of processes (default: os.cpu_count())
+
+    :return: Dataframe modified
+    """
+
+    return join_days_for_month_parallel(parse_dates(df, date_in, date_out), workers)
+
+
+def join_days_for_month_parallel(df: pd.DataFrame, workers: int = None) -> pd.DataFrame:
+    """
+    Parallel version of join_days_for_month
+    (same as join_days_for_month when there are not enough rows for two shards)
+
+    :df: DataFrame with date_start and date_end columns
+    :workers: number of processes (default: os.cpu_count())
+
+    :return: Dataframe modified
+    """
+    df_days = days_of_month_frame(df[["date_start", "date_end"]], workers)
+    if df_days is None:
+        return join_days_for_month(df)
+
+    # shards cover different months: align on the union of the month columns
+    df_days = df_days.reindex(columns=sorted(df_days.columns)).fillna(0)
+    df_final = df.join(df_days)
+
+    return df_final
+
+
+def days_of_month_frame(df_dates: pd.DataFrame, workers: int = None) -> pd.DataFrame:
+    """
+    Calculate number of days for each month of each row, with the rows split
+    in shards computed by a pool of processes
+
+    :df_dates: DataFrame with date_start and date_end columns
+    :workers: number of processes (default: os.cpu_count())
+
+    :return: DataFrame with a column for each month (NaN for months outside
+        the row interval), or None when the rows do not fill two shards
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    shards = [
+        df_dates.iloc[positions]
+        for positions in np.array_split(np.arange(len(df_dates)), workers)
+        if len(positions)
+    ]
+    if len(shards) < 2:
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        df_shards = list(executor.map(days_of_month_for_shard, shards))
+
+    return pd.concat(df_shards)
+
+
+def days_of_month_for_shard(df_dates: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate number of days for each month for a shard of rows
+    (worker function of join_days_for_month_parallel)
+
+    :df_dates: DataFrame with date_start and date_end columns
+
+    :return: DataFrame with a column for each month
+    """
+    return df_dates.apply(days_of_month, axis=1)
+
+
+def add_days_for_month_incremental(
+    df: pd.DataFrame,
+    date_in: str,
+    date_out: str,
+    state_file: str,
+    id_column: str = None,
+    workers: int = None,
+) -> pd.DataFrame:
+    """
+    Same result as add_days_for_month, but month vectors of rows already seen
+    in a previous run are read from a local state store instead of being recomputed
+
+    :df: original DataFrame
+    :date_in: name of date_in column
+    :date_out: name of dat_out column
+    :state_file: path of the JSON state store (created if missing)
+    :id_column: name of the assignment id column (optional)
+    :workers: processes computing the rows missing from the state store
+        (default: 1, no process pool)
+
+    :return: Dataframe modified
+    """
+    fingerprints = row_fingerprints(df, date_in, date_out, id_column)
+
+    return join_days_for_month_incremental(
+        parse_dates(df, date_in, date_out), fingerprints, state_file, workers
+    )
+
+
+def join_days_for_month_incremental(
+    df: pd.DataFrame, fingerprints: pd.Series, state_file: str, workers: int = None
+) -> pd.DataFrame:
+    """
+    Incremental version of join_days_for_month
+
+    :df: DataFrame with date_start and date_end columns
+    :fingerprints: row fingerprints (see row_fingerprints), aligned with df
+    :state_file: path of the JSON state store (created if missing)
+    :workers: processes computing the rows missing from the state store
+        (default: 1, no process pool)
+
+    :return: Dataframe modified
+    """
+    if df.empty:
+        return df.copy()
+
+    state = load_month_state(state_file)
+
+    to_compute = ~fingerprints.isin(state.keys())
+    if to_compute.any():
+        df_dates = df.loc[to_compute, ["date_start", "date_end"]]
+        df_new = None
+        if workers is not None and workers > 1:
+            df_new = days_of_month_frame(df_dates, workers)
+        if df_new is None:
+            df_new = df_dates.apply(days_of_month, axis=1)
+        for fingerprint, (_, row) in zip(
+            fingerprints[to_compute], df_new.iterrows()
+        ):
+            state[fingerprint] = {
+                month: int(days) for month, days in row.dropna().items()
+            }
+
+    df_days = pd.DataFrame.from_records(
+        [state[fingerprint] for fingerprint in fingerprints], index=df.index
+    )
+    df_days = df_days.reindex(columns=sorted(df_days.columns)).fillna(0)
+    df_final = df.join(df_days)
+
+    # keep only the rows of the current export
+    save_month_state(
+        state_file, {fingerprint: state[fingerprint] for fingerprint in fingerprints}
+    )
+
+    return df_final
+
+
+def row_fingerprints(
+    df: pd.DataFrame, date_in: str, date_out: str, id_column: str = None
+) -> pd.Series:
+    """
+    Calculate a fingerprint for each row from the assignment id and dates columns
+
+    :df: original DataFrame
+    :date_in: name of date_in column
+    :date_out: name of dat_out column
+    :id_column: name of the assignment id column (optional)
+
+    :return: Series of hex digests, aligned with df
+    """
+    if df.empty:
+        return pd.Series(index=df.index, dtype=object)
+
+    columns = [date_in, date_out] if id_column is None else [id_column, date_in, date_out]
+
+    return (
+        df[columns]
+        .astype(str)
+        .agg("|".join, axis=1)
+        .map(lambda key: hashlib.sha1(key.encode("utf-8")).hexdigest())
+    )
+
+
+def load_month_state(state_file: str) -> dict:
+    """
+    Load the state store {fingerprint: {month: days}}
+
+    :state_file: path of the JSON state store
+
+    :return: dict, empty if the file does not exist
+    """
+    path = Path(state_file)
+    if not path.exists():
+        return {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_month_state(state_file: str, state: dict) -> None:
+    """
+    Save the state store {fingerprint: {month: days}}
+
+    :state_file: path of the JSON state store
+    :state: dict to save
+    """
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
 def days_of_month(x) -> pd.Series:
     """
     Calculate number of days for each month between dates columns
@@ -1,7 +1,25 @@
+import pickle
+
+import numpy as np
 import pandas as pd
 
 
-def join_tables(passy_data, domus_data):
+OVERLAPS_MODES = ("ignore", "raise", "merge")
+INDEX_OVERLAPS_MODES = ("raise", "merge")
+
+
+def join_tables(passy_data, domus_data, overlaps="ignore"):
+    """
+    Join passy events with the domus interval of the same room containing them
+
+    :passy_data:    dict with room_key, event_date
+    :domus_data:    dict with room_key, start_date, end_date
+    :overlaps:      what to do with overlapping domus intervals of a room,
+                    that would duplicate events: 'ignore', 'raise' or 'merge'
+                    (see check_overlapping_intervals)
+
+    :return:        DataFrame
+    """
     # **Import Pandas and Create Sample DataFrames**: First, let's set up the environment and create some sample data to work with.
     passy_df = pd.DataFrame(passy_data)
     domus_df = pd.DataFrame(domus_data)
@@ -11,6 +29,8 @@ def join_tables(passy_data, domus_data):
     domus_df["start_date"] = pd.to_datetime(domus_df["start_date"])
     domus_df["end_date"] = pd.to_datetime(domus_df["end_date"])
 
+    domus_df = check_overlapping_intervals(domus_df, overlaps)
+
     # 2 **Merge the DataFrames on `room_key`**:
     # Use the `pd.merge()` function to perform an inner join on the `room_key`.
     # This will match all `passy` events with all `domus` intervals for the same room.
@@ -48,3 +68,206 @@ def join_tables(passy_data, domus_data):
     """
 
     return final_df
+
+
+def overlap_groups(domus_df: pd.DataFrame) -> pd.Series:
+    """
+    Sort-and-sweep of the domus intervals of each room, O(n log n)
+
+    Intervals are inclusive: an interval starting on or before the latest
+    end_date of the previous intervals of the same room overlaps them.
+
+    :domus_df:  DataFrame with room_key, start_date, end_date (datetime) columns
+
+    :return:    Series aligned with domus_df: intervals with the same value
+                belong to the same chain of overlapping intervals
+    """
+    sorted_df = domus_df.sort_values(["room_key", "start_date"], kind="stable")
+    previous_end = (
+        sorted_df.groupby("room_key", sort=False)["end_date"]
+        .cummax()
+        .groupby(sorted_df["room_key"], sort=False)
+        .shift()
+    )
+    new_group = ~(sorted_df["start_date"] <= previous_end)
+
+    return new_group.cumsum().rename("overlap_group").reindex(domus_df.index)
+
+
+def find_overlapping_intervals(domus_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Find the domus intervals overlapping another interval of the same room
+
+    :domus_df:  DataFrame with room_key, start_date, end_date (datetime) columns
+
+    :return:    overlapping rows with an overlap_group column, sorted by room and start
+    """
+    groups = overlap_groups(domus_df)
+    overlapping = groups.duplicated(keep=False)
+
+    return (
+        domus_df[overlapping]
+        .assign(overlap_group=groups[overlapping])
+        .sort_values(["room_key", "start_date"], kind="stable")
+    )
+
+
+def merge_overlapping_intervals(domus_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge each chain of overlapping intervals of a room in a single interval
+    (min start_date, max end_date, other columns from the first interval)
+
+    :domus_df:  DataFrame with room_key, start_date, end_date (datetime) columns
+
+    :return:    DataFrame with non overlapping intervals
+    """
+    groups = overlap_groups(domus_df)
+    sorted_df = domus_df.sort_values(["room_key", "start_date"], kind="stable")
+    aggregations = {column: "first" for column in domus_df.columns}
+    aggregations["start_date"] = "min"
+    aggregations["end_date"] = "max"
+
+    return (
+        sorted_df.groupby(groups[sorted_df.index], sort=False)
+        .agg(aggregations)
+        .reset_index(drop=True)
+    )
+
+
+def check_overlapping_intervals(domus_df: pd.DataFrame, overlaps: str) -> pd.DataFrame:
+    """
+    Pre-join validation of the domus intervals
+
+    :domus_df:  DataFrame with room_key, start_date, end_date (datetime) columns
+    :overlaps:  'ignore' (no check), 'raise' (ValueError if any interval
+                overlaps) or 'merge' (see merge_overlapping_intervals)
+
+    :return:    domus_df, merged when overlaps is 'merge'
+    """
+    if overlaps not in OVERLAPS_MODES:
+        raise ValueError(f"overlaps must be one of {OVERLAPS_MODES}, got: {overlaps}")
+
+    if overlaps == "ignore":
+        return domus_df
+
+    if overlaps == "merge":
+        return merge_overlapping_intervals(domus_df)
+
+    overlapping = find_overlapping_intervals(domus_df)
+    if not overlapping.empty:
+        raise ValueError(
+            f"{len(overlapping)} overlapping domus intervals in rooms: "
+            f"{', '.join(map(str, overlapping['room_key'].unique()))}"
+        )
+
+    return domus_df
+
+
+class RoomIntervalIndex:
+    """
+    Domus intervals grouped by room_key and sorted by start_date,
+    reusable for many passy event batches.
+
+    The intervals of a room must not overlap (an event is matched with the
+    interval with the latest start_date <= event_date): they are checked when
+    the index is built.
+    """
+
+    def __init__(self, domus_data, overlaps="raise"):
+        """
+        Build the index
+
+        :domus_data:    dict or DataFrame with room_key, start_date, end_date columns
+        :overlaps:      'raise' or 'merge' (see check_overlapping_intervals);
+                        'ignore' is rejected, the lookup needs intervals that
+                        do not overlap
+        """
+        if overlaps not in INDEX_OVERLAPS_MODES:
+            raise ValueError(
+                f"overlaps must be one of {INDEX_OVERLAPS_MODES}, got: {overlaps}"
+            )
+        domus_df = pd.DataFrame(domus_data).reset_index(drop=True)
+        domus_df["start_date"] = pd.to_datetime(domus_df["start_date"])
+        domus_df["end_date"] = pd.to_datetime(domus_df["end_date"])
+        domus_df = check_overlapping_intervals(domus_df, overlaps).reset_index(drop=True)
+        self.domus_df = domus_df
+
+        # room_key -> (starts, ends, domus row positions), sorted by start
+        self.rooms = {}
+        for room_key, positions in domus_df.groupby("room_key", sort=False).indices.items():
+            starts = domus_df["start_date"].to_numpy()[positions]
+            order = np.argsort(starts, kind="stable")
+            self.rooms[room_key] = (
+                starts[order],
+                domus_df["end_date"].to_numpy()[positions][order],
+                positions[order],
+            )
+
+    def lookup(self, room_keys, event_dates) -> np.ndarray:
+        """
+        Find the domus interval containing each event, O(log n) per event
+
+        :room_keys:     room_key of each event
+        :event_dates:   event_date of each event
+
+        :return:        domus row position for each event, -1 if no interval
+        """
+        room_keys = pd.Series(np.asarray(room_keys))
+        event_dates = pd.to_datetime(pd.Series(np.asarray(event_dates))).to_numpy()
+        result = np.full(len(room_keys), -1, dtype=np.int64)
+
+        for room_key, events in room_keys.groupby(room_keys, sort=False).indices.items():
+            if room_key not in self.rooms:
+                continue
+            starts, ends, positions = self.rooms[room_key]
+            dates = event_dates[events]
+            candidates = np.searchsorted(starts, dates, side="right") - 1
+            found = candidates >= 0
+            found[found] = dates[found] <= ends[candidates[found]]
+            result[events[found]] = positions[candidates[found]]
+
+        return result
+
+    def join(self, passy_data) -> pd.DataFrame:
+        """
+        Same rows as join_tables(passy_data, domus_data), with a new index
+
+        :passy_data: dict or DataFrame with room_key, event_date columns
+
+        :return: DataFrame of the events with their domus interval
+        """
+        passy_df = pd.DataFrame(passy_data).reset_index(drop=True)
+        passy_df["event_date"] = pd.to_datetime(passy_df["event_date"])
+
+        positions = self.lookup(passy_df["room_key"], passy_df["event_date"])
+        found = positions >= 0
+
+        domus_matched = self.domus_df.drop(columns="room_key").iloc[positions[found]]
+        return pd.concat(
+            [
+                passy_df[found].reset_index(drop=True),
+                domus_matched.reset_index(drop=True),
+            ],
+            axis=1,
+        )
+
+    def save(self, path) -> None:
+        """
+        Persist the index
+
+        :path: destination file
+        """
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path) -> "RoomIntervalIndex":
+        """
+        Reload an index saved with save()
+
+        :path: source file
+
+        :return: RoomIntervalIndex
+        """
+        with open(path, "rb") as f:
+            return pickle.load(f)
@@ -4,7 +4,10 @@ from library import pandas_days_for_month
 if __name__ == "__main__":
     file = "data/allo_assegnazioni_dal20230901_aa_2023-24.csv"
     FILE_OUT = "data/allo_assegnazioni_dal20230901_aa_2023-24_calc.csv"
-    result = pandas_days_for_month.main(file, FILE_OUT)
+    # serial by default: set to os.cpu_count() for large exports, on small
+    # ones starting the process pool costs more than it saves
+    WORKERS = None
+    result = pandas_days_for_month.main(file, FILE_OUT, workers=WORKERS)
     """
     # Sample passy table data
     passy_data = {
@@ -1,3 +1,4 @@
+import io
 from pathlib import Path
 
 # get the resources folder in the tests folder
@@ -23,3 +24,15 @@ def test_assegnazioni(client):
     })
 
     assert response.status_code == 302
+
+
+def test_assegnazioni_upload(client):
+    csv_in = b"ASSE. DATA_ING;ASSE. DATA_UN\n2023-09-18;2023-09-30\n2023-10-01;2023-10-31\n"
+    response = client.post('/assegnazioni', data={
+        "file": (io.BytesIO(csv_in), "assegnazioni.csv"),
+    })
+
+    assert response.status_code == 200
+    assert b'202309' in response.data
+    assert 'read_csv;dur=' in response.headers["Server-Timing"]
+    assert 'to_csv;dur=' in response.headers["Server-Timing"]
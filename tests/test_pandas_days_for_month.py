@@ -1,3 +1,4 @@
+import io
 from library import pandas_days_for_month
 import pandas as pd
 
@@ -83,3 +84,111 @@ def test_add_days_for_month():
     assert df_result['202309'].iat[0] == df_mock['Expected-days'].iat[0]
     assert df_result['202310'].iat[1] == df_mock['Expected-days'].iat[1]
     assert df_result['202311'].iat[2] == df_mock['Expected-days'].iat[2]
+
+
+def test_add_days_for_month_incremental(tmp_path):
+    state_file = tmp_path / "state.json"
+    data = {
+        'ID': [1, 2, 3, ],
+        'ASSE. DATA_ING': ['2023-09-18', '2023-10-01', '2023-11-01', ],
+        'ASSE. DATA_UN': ['2023-09-30', '2023-11-02', '2023-11-30', ],
+    }
+
+    df_expected = pandas_days_for_month.add_days_for_month(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN')
+    df_result = pandas_days_for_month.add_days_for_month_incremental(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN', state_file, 'ID')
+
+    assert df_expected.equals(df_result)
+    assert state_file.exists()
+
+    # second export: row 2 changed, row 4 added
+    data['ID'].append(4)
+    data['ASSE. DATA_ING'].append('2023-12-01')
+    data['ASSE. DATA_UN'].append('2023-12-10')
+    data['ASSE. DATA_UN'][1] = '2023-10-31'
+
+    df_expected = pandas_days_for_month.add_days_for_month(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN')
+    df_result = pandas_days_for_month.add_days_for_month_incremental(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN', state_file, 'ID')
+
+    assert df_expected.equals(df_result)
+    assert len(pandas_days_for_month.load_month_state(state_file)) == 4
+
+
+def test_add_days_for_month_parallel():
+    data = {
+        'ASSE. DATA_ING': ['2023-09-18', '2023-10-01', '2023-11-01', '2023-12-01', ],
+        'ASSE. DATA_UN': ['2023-09-30', '2023-11-02', '2023-11-30', '2024-01-10', ],
+    }
+
+    df_expected = pandas_days_for_month.add_days_for_month(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN')
+    df_result = pandas_days_for_month.add_days_for_month_parallel(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN', workers=2)
+
+    assert df_expected.equals(df_result)
+
+
+def test_add_days_for_month_parallel_small_frames():
+    columns = ['ASSE. DATA_ING', 'ASSE. DATA_UN']
+    df_empty = pd.DataFrame({column: pd.Series(dtype=str) for column in columns})
+    df_result = pandas_days_for_month.add_days_for_month_parallel(
+        df_empty, 'ASSE. DATA_ING', 'ASSE. DATA_UN', workers=2)
+    assert df_result.empty
+
+    # a single row fills only one shard: no process pool
+    data = {'ASSE. DATA_ING': ['2023-09-18', ], 'ASSE. DATA_UN': ['2023-10-02', ]}
+    df_expected = pandas_days_for_month.add_days_for_month(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN')
+    df_result = pandas_days_for_month.add_days_for_month_parallel(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN', workers=4)
+    assert df_expected.equals(df_result)
+
+
+def test_add_days_for_month_incremental_empty(tmp_path):
+    state_file = tmp_path / "state.json"
+    df = pd.read_csv(io.StringIO("ID;ASSE. DATA_ING;ASSE. DATA_UN\n"), sep=";")
+
+    df_result = pandas_days_for_month.add_days_for_month_incremental(
+        df, 'ASSE. DATA_ING', 'ASSE. DATA_UN', state_file, 'ID')
+
+    df_expected = pandas_days_for_month.add_days_for_month(
+        df, 'ASSE. DATA_ING', 'ASSE. DATA_UN')
+    assert df_result.empty
+    assert list(df_result.columns) == list(df_expected.columns)
+
+
+def test_add_days_for_month_incremental_parallel(tmp_path):
+    state_file = tmp_path / "state.json"
+    data = {
+        'ID': [1, 2, 3, 4, ],
+        'ASSE. DATA_ING': ['2023-09-18', '2023-10-01', '2023-11-01', '2023-12-01', ],
+        'ASSE. DATA_UN': ['2023-09-30', '2023-11-02', '2023-11-30', '2024-01-10', ],
+    }
+
+    df_expected = pandas_days_for_month.add_days_for_month(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN')
+    df_result = pandas_days_for_month.add_days_for_month_incremental(
+        pd.DataFrame(data), 'ASSE. DATA_ING', 'ASSE. DATA_UN', state_file, 'ID',
+        workers=2)
+
+    assert df_expected.equals(df_result)
+    assert len(pandas_days_for_month.load_month_state(state_file)) == 4
+
+
+def test_main_metrics():
+    csv_in = io.StringIO(
+        "ASSE. DATA_ING;ASSE. DATA_UN\n2023-09-18;2023-09-30\n2023-10-01;2023-10-31\n"
+    )
+    metrics = []
+
+    result = pandas_days_for_month.main(csv_in, metrics=metrics)
+
+    assert '202310' in result
+    assert [m['stage'] for m in metrics] == [
+        'read_csv', 'parse_dates', 'month_days', 'format', 'to_csv',
+    ]
+    assert metrics[0]['rows'] == 2
+    assert all(m['seconds'] >= 0 for m in metrics)
@@ -1,4 +1,5 @@
 from library import pandas_join_tables
+import pytest
 import pandas as pd
 
 
@@ -28,3 +29,69 @@ def test_join_tables():
     final_df_expected.index = [0, 5]
 
     assert final_df_actual.equals(final_df_expected)
+
+
+def test_room_interval_index(tmp_path):
+    passy_data = {
+        "room_key": ["A", "A", "B", "C", "D"],
+        "event_date": ["2023-01-15", "2023-02-10", "2023-03-20", "2023-04-05", "2023-04-05"],
+    }
+    domus_data = {
+        "room_key": ["A", "A", "B", "C"],
+        "start_date": ["2023-03-01", "2023-01-01", "2023-03-01", "2023-04-01"],
+        "end_date": ["2023-03-31", "2023-01-31", "2023-03-15", "2023-04-30"],
+    }
+    final_df_expected = pd.DataFrame({
+        "room_key": ["A", "C"],
+        "event_date": pd.to_datetime(["2023-01-15", "2023-04-05"]),
+        "start_date": pd.to_datetime(["2023-01-01", "2023-04-01"]),
+        "end_date": pd.to_datetime(["2023-01-31", "2023-04-30"]),
+    })
+
+    index = pandas_join_tables.RoomIntervalIndex(domus_data)
+
+    assert list(index.lookup(passy_data["room_key"], passy_data["event_date"])) == [1, -1, -1, 3, -1]
+    assert index.join(passy_data).equals(final_df_expected)
+
+    index.save(tmp_path / "domus.idx")
+    index_loaded = pandas_join_tables.RoomIntervalIndex.load(tmp_path / "domus.idx")
+
+    assert index_loaded.join(passy_data).equals(final_df_expected)
+
+
+def test_overlapping_intervals():
+    passy_data = {
+        "room_key": ["A", "B"],
+        "event_date": ["2023-01-15", "2023-03-05"],
+    }
+    domus_data = {
+        "room_key": ["A", "B", "A", "A", "B"],
+        "start_date": ["2023-01-10", "2023-03-01", "2023-01-01", "2023-02-01", "2023-03-16"],
+        "end_date": ["2023-01-20", "2023-03-15", "2023-01-31", "2023-02-28", "2023-03-31"],
+    }
+    domus_df = pd.DataFrame(domus_data)
+    domus_df["start_date"] = pd.to_datetime(domus_df["start_date"])
+    domus_df["end_date"] = pd.to_datetime(domus_df["end_date"])
+
+    overlapping = pandas_join_tables.find_overlapping_intervals(domus_df)
+
+    assert list(overlapping.index) == [2, 0]
+    assert overlapping["overlap_group"].nunique() == 1
+
+    merged = pandas_join_tables.merge_overlapping_intervals(domus_df)
+
+    assert len(merged) == 4
+    assert pandas_join_tables.find_overlapping_intervals(merged).empty
+
+    # the event in room A matches two intervals
+    assert len(pandas_join_tables.join_tables(passy_data, domus_data)) == 3
+    assert len(pandas_join_tables.join_tables(passy_data, domus_data, overlaps="merge")) == 2
+
+    with pytest.raises(ValueError):
+        pandas_join_tables.join_tables(passy_data, domus_data, overlaps="raise")
+    with pytest.raises(ValueError):
+        pandas_join_tables.RoomIntervalIndex(domus_data)
+    assert len(pandas_join_tables.RoomIntervalIndex(domus_data, overlaps="merge").domus_df) == 4
+    for overlaps in ("ignore", "skip"):
+        with pytest.raises(ValueError, match="overlaps must be one of"):
+            pandas_join_tables.RoomIntervalIndex(domus_data, overlaps=overlaps)
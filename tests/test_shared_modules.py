@@ -0,0 +1,21 @@
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules vendored in more than one project (see their module docstring)
+SHARED_MODULES = {
+    "dialect.py": ["allo_gra_py/src", "csv_control/src", "csv_to_db/src"],
+    "rejects.py": ["allo_gra_py/src", "csv_control/src"],
+}
+
+
+@pytest.mark.parametrize("name", sorted(SHARED_MODULES))
+def test_shared_module_copies_are_identical(name):
+    first, *others = SHARED_MODULES[name]
+    expected = (ROOT / first / name).read_bytes()
+    for folder in others:
+        assert (ROOT / folder / name).read_bytes() == expected, (
+            f"{folder}/{name} differs from {first}/{name}"
+        )